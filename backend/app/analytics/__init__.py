@@ -0,0 +1,4 @@
+from .snapshots import write_snapshot
+from .queries import load_prices, load_products, price_over_time, biggest_drops, price_range
+
+__all__ = ["write_snapshot", "load_prices", "load_products", "price_over_time", "biggest_drops", "price_range"]
@@ -0,0 +1,130 @@
+"""Analytics over the Parquet snapshots in ANALYTICS_DIR; never touches the database.
+
+Every function returns a ``pyarrow.Table`` (``.to_pylist()`` for dicts). Only
+the needed columns are read, and ``month=`` directories outside the requested
+range are skipped. A row exported by more than one run counts once, as its
+newest copy.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from app.analytics.snapshots import PRICE_SCHEMA, PRODUCT_SCHEMA, newest_copies, price_version, product_version
+from app.config import settings
+from app.models.product import utc_now
+
+MONTH = pa.field("month", pa.string())
+PARTITIONING = ds.partitioning(pa.schema([MONTH]), flavor="hive")
+
+
+def _dataset(directory: str, name: str, schema: pa.Schema) -> Optional[ds.Dataset]:
+    path = os.path.join(directory, name)
+    if not os.path.isdir(path):
+        return None
+    return ds.dataset(path, schema=schema.append(MONTH), format="parquet", partitioning=PARTITIONING)
+
+
+def load_prices(
+    directory: str = settings.ANALYTICS_DIR,
+    product_ids: Optional[Iterable[int]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    columns: Optional[list[str]] = None,
+) -> pa.Table:
+    """Price rows seen at or after ``start`` and created before ``end``."""
+    dataset = _dataset(directory, "prices", PRICE_SCHEMA)
+    columns = list(dict.fromkeys(["price_id", "created_at", "last_seen_at"] + (columns or PRICE_SCHEMA.names)))
+    if dataset is None:
+        return PRICE_SCHEMA.empty_table().select(columns)
+
+    condition = None
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        condition = (
+            ds.field("product_id") == product_ids[0] if len(product_ids) == 1 else ds.field("product_id").isin(product_ids)
+        )
+    if start is not None:
+        seen = pc.coalesce(ds.field("last_seen_at"), ds.field("created_at")) >= pa.scalar(start, pa.timestamp("us"))
+        condition = seen if condition is None else condition & seen
+    if end is not None:
+        created = (ds.field("month") <= end.strftime("%Y-%m")) & (ds.field("created_at") < pa.scalar(end, pa.timestamp("us")))
+        condition = created if condition is None else condition & created
+    table = dataset.to_table(columns=columns, filter=condition)
+    return newest_copies(table, "price_id", price_version(table))
+
+
+def load_products(directory: str = settings.ANALYTICS_DIR) -> pa.Table:
+    dataset = _dataset(directory, "products", PRODUCT_SCHEMA)
+    if dataset is None:
+        return PRODUCT_SCHEMA.empty_table()
+    table = dataset.to_table(columns=PRODUCT_SCHEMA.names)
+    return newest_copies(table, "product_id", product_version(table))
+
+
+def _with_titles(table: pa.Table, directory: str) -> pa.Table:
+    products = load_products(directory).select(["product_id", "title", "url"])
+    return table.join(products, "product_id", join_type="left outer")
+
+
+def price_over_time(
+    product_id: int,
+    directory: str = settings.ANALYTICS_DIR,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> pa.Table:
+    """The product's price rows, oldest first."""
+    table = load_prices(directory, [product_id], start, end, ["site", "price"])
+    table = table.select(["price_id", "site", "price", "created_at", "last_seen_at"])
+    return table.sort_by([("created_at", "ascending"), ("price_id", "ascending")])
+
+
+def _last_price(table: pa.Table, name: str) -> pa.Table:
+    """Price of the last row per product; ``table`` is sorted by (product_id, created_at)."""
+    if table.num_rows == 0:
+        return pa.table({"product_id": table["product_id"], name: table["price"]})
+    keys = table["product_id"].combine_chunks()
+    last = pa.concat_arrays([pc.not_equal(keys[:-1], keys[1:]), pa.array([True])])
+    table = table.filter(last)
+    return pa.table({"product_id": table["product_id"], name: table["price"]})
+
+
+def biggest_drops(
+    directory: str = settings.ANALYTICS_DIR,
+    days: int = 7,
+    limit: int = 10,
+    now: Optional[datetime] = None,
+) -> pa.Table:
+    """Products whose latest price is furthest below their price ``days`` ago, largest relative drop first."""
+    now = now or utc_now().replace(tzinfo=None)
+    since = now - timedelta(days=days)
+    table = load_prices(directory, end=now, columns=["product_id", "price"])
+    table = table.filter(pc.is_valid(table["price"])).sort_by([("product_id", "ascending"), ("created_at", "ascending")])
+
+    before = _last_price(table.filter(pc.less_equal(table["created_at"], pa.scalar(since, pa.timestamp("us")))), "price_before")
+    drops = before.join(_last_price(table, "price_now"), "product_id")
+    drop = pc.subtract(drops["price_before"], drops["price_now"])
+    drops = drops.append_column("drop", drop).filter(pc.greater(drop, 0))
+    drops = drops.append_column("drop_pct", pc.round(pc.multiply(
+        pc.divide(pc.cast(drops["drop"], pa.float64()), pc.cast(drops["price_before"], pa.float64())), 100
+    ), 2))
+    drops = drops.sort_by([("drop_pct", "descending"), ("product_id", "ascending")]).slice(0, limit)
+    return _with_titles(drops, directory).sort_by([("drop_pct", "descending"), ("product_id", "ascending")])
+
+
+def price_range(
+    directory: str = settings.ANALYTICS_DIR,
+    product_ids: Optional[Iterable[int]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> pa.Table:
+    """Min and max price per product over the range, with when it was first and last seen."""
+    table = load_prices(directory, product_ids, start, end, ["product_id", "price"])
+    table = table.append_column("seen_at", price_version(table))
+    ranges = table.group_by("product_id").aggregate([
+        ("price", "min"), ("price", "max"), ("created_at", "min"), ("seen_at", "max"),
+    ]).rename_columns(["product_id", "min_price", "max_price", "first_seen", "last_seen"])
+    return _with_titles(ranges, directory).sort_by("product_id")
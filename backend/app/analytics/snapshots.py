@@ -0,0 +1,199 @@
+"""Incremental, date-partitioned Parquet snapshots of products and prices.
+
+Layout under ANALYTICS_DIR::
+
+    prices/month=YYYY-MM/part-<run>.parquet      price rows, by created_at month
+    products/month=YYYY-MM/part-<run>.parquet    products, by updated_at month
+    _state.json                                   where the next run starts
+
+Each run exports the rows created or changed since the previous run started
+(minus SNAPSHOT_OVERLAP, to catch rows committed late), so a row can appear in
+more than one file; readers keep its newest copy. Once a month directory holds
+more than MAX_PARTS files they are merged into one.
+
+Rows are read from the read database on a server-side cursor and buffered one
+month at a time. Each file is sorted by (product_id, created_at) in row groups
+of ROW_GROUP_SIZE, so the row-group statistics let a single-product query skip
+most of the file.
+
+Run from backend/:  python -m app.analytics.snapshots
+"""
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import or_, select
+
+from app.config import settings
+from app.core.price_storage import price_history_table
+from app.models.product import Product, utc_now
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10_000
+MAX_PARTS = 8
+ROW_GROUP_SIZE = 64_000
+SORT_KEYS = [("product_id", "ascending"), ("created_at", "ascending")]
+SNAPSHOT_OVERLAP = timedelta(minutes=10)
+STATE_FILE = "_state.json"
+
+PRICE_SCHEMA = pa.schema([
+    ("price_id", pa.int64()),
+    ("product_id", pa.int64()),
+    ("site", pa.string()),
+    ("price", pa.decimal128(10, 2)),
+    ("created_at", pa.timestamp("us")),
+    ("last_seen_at", pa.timestamp("us")),
+])
+PRODUCT_SCHEMA = pa.schema([
+    ("product_id", pa.int64()),
+    ("title", pa.string()),
+    ("url", pa.string()),
+    ("image_url", pa.string()),
+    ("created_at", pa.timestamp("us")),
+    ("updated_at", pa.timestamp("us")),
+])
+
+
+def newest_copies(table: pa.Table, key: str, version) -> pa.Table:
+    """One row per ``key``: the copy with the greatest ``version``."""
+    if table.num_rows == 0 or pc.count_distinct(table[key]).as_py() == table.num_rows:
+        return table
+    table = table.append_column("_version", version)
+    table = table.take(pc.sort_indices(table, [(key, "ascending"), ("_version", "descending")]))
+    keys = table[key].combine_chunks()
+    first = pa.concat_arrays([pa.array([True]), pc.not_equal(keys[1:], keys[:-1])])
+    return table.filter(first).drop_columns(["_version"])
+
+
+def price_version(table: pa.Table):
+    return pc.coalesce(table["last_seen_at"], table["created_at"])
+
+
+def product_version(table: pa.Table):
+    return table["updated_at"]
+
+
+def _read_state(directory: str) -> Optional[datetime]:
+    try:
+        with open(os.path.join(directory, STATE_FILE)) as f:
+            return datetime.fromisoformat(json.load(f)["since"])
+    except FileNotFoundError:
+        return None
+
+
+def _write_state(directory: str, since: datetime):
+    path = os.path.join(directory, STATE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"since": since.isoformat()}, f)
+    os.replace(path + ".tmp", path)
+
+
+def _write_file(folder: str, name: str, table: pa.Table):
+    """Write under a hidden name, then rename, so readers never see a partial file."""
+    pq.write_table(table.sort_by(SORT_KEYS), os.path.join(folder, "." + name), row_group_size=ROW_GROUP_SIZE)
+    os.replace(os.path.join(folder, "." + name), os.path.join(folder, name))
+
+
+class _PartitionWriter:
+    """Buffers the rows of one month and writes them as one file in that month's directory."""
+
+    def __init__(self, directory: str, schema: pa.Schema, run: str):
+        self.directory = directory
+        self.schema = schema
+        self.name = f"part-{run}.parquet"
+        self.month = None
+        self.batches = []
+        self.months = set()
+
+    def write(self, month: str, rows: list):
+        if month != self.month:
+            self.flush()
+            self.month = month
+        columns = list(zip(*rows))
+        self.batches.append(pa.record_batch(
+            [pa.array(column, type=field.type) for column, field in zip(columns, self.schema)],
+            schema=self.schema,
+        ))
+
+    def folder(self, month: str) -> str:
+        return os.path.join(self.directory, f"month={month}")
+
+    def flush(self):
+        if self.batches:
+            os.makedirs(self.folder(self.month), exist_ok=True)
+            _write_file(self.folder(self.month), self.name, pa.Table.from_batches(self.batches, self.schema))
+            self.months.add(self.month)
+        self.batches = []
+        self.month = None
+
+
+def _merge_parts(folder: str, schema: pa.Schema, key: str, version, run: str):
+    """Rewrite the part files of one month as a single file without duplicate copies."""
+    parts = sorted(name for name in os.listdir(folder) if name.startswith("part-"))
+    if len(parts) <= MAX_PARTS:
+        return
+    paths = [os.path.join(folder, name) for name in parts]
+    table = ds.dataset(paths, schema=schema, format="parquet").to_table()
+    table = newest_copies(table, key, version(table))
+    _write_file(folder, f"part-{run}-merged.parquet", table)
+    # a reader listing the folder in between sees duplicates, which it drops anyway
+    for path in paths:
+        os.remove(path)
+
+
+def _export(conn, query, schema: pa.Schema, date_column: int, directory: str, run: str, key: str, version) -> int:
+    writer = _PartitionWriter(directory, schema, run)
+    count = 0
+    result = conn.execution_options(yield_per=BATCH_SIZE).execute(query)
+    for batch in result.partitions():
+        for month, rows in groupby(batch, key=lambda row: row[date_column].strftime("%Y-%m")):
+            rows = list(rows)
+            writer.write(month, rows)
+            count += len(rows)
+    writer.flush()
+    for month in writer.months:
+        _merge_parts(writer.folder(month), schema, key, version, run)
+    return count
+
+
+def write_snapshot(engine, directory: str = settings.ANALYTICS_DIR, now: Optional[datetime] = None) -> dict:
+    """Export rows changed since the last run into ``directory``; returns row counts per table."""
+    now = now or utc_now().replace(tzinfo=None)
+    since = _read_state(directory)
+    run = now.strftime("%Y%m%dT%H%M%S%f")
+    history = price_history_table(engine.dialect.name)
+
+    prices = select(
+        history.c.id, history.c.product_id, history.c.site, history.c.price, history.c.created_at, history.c.last_seen_at,
+    )
+    products = select(Product.id, Product.title, Product.url, Product.image_url, Product.created_at, Product.updated_at)
+    if since is not None:
+        prices = prices.where(or_(history.c.created_at >= since, history.c.last_seen_at >= since))
+        products = products.where(Product.updated_at >= since)
+
+    os.makedirs(directory, exist_ok=True)
+    with engine.connect() as conn:
+        counts = {
+            "prices": _export(conn, prices.order_by(history.c.created_at), PRICE_SCHEMA, 4,
+                              os.path.join(directory, "prices"), run, "price_id", price_version),
+            "products": _export(conn, products.order_by(Product.updated_at), PRODUCT_SCHEMA, 5,
+                                os.path.join(directory, "products"), run, "product_id", product_version),
+        }
+    _write_state(directory, now - SNAPSHOT_OVERLAP)
+    logger.info(f"Wrote analytics snapshot {run}: {counts['prices']} prices, {counts['products']} products")
+    return counts
+
+
+if __name__ == "__main__":
+    from app.db import read_engine
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    write_snapshot(read_engine)
@@ -5,11 +5,84 @@ load_dotenv()
 
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///price_tracker.db")
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+    READ_DATABASE_URL: str = os.getenv("READ_DATABASE_URL", "")  # replica for query endpoints; defaults to DATABASE_URL
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -64000))  # negative = KiB
     SECRET_KEY = os.getenv("SECRET_KEY", "25c33844187486fcc29d482605ebe8695d68767898ef19807536552b1252a699") # openssl rand -hex 32
     ALGORITHM = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+    AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", 30))  # seconds; 0 disables the cache
+    AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", 10000))
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))  # changing it rehashes passwords on next login
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))  # beyond this, answer 503
     
+    PRICE_STORAGE = os.getenv("PRICE_STORAGE", "table")  # "table" or "partitioned"
+    PRICE_PARTITION_MONTHS_AHEAD = int(os.getenv("PRICE_PARTITION_MONTHS_AHEAD", 2))
+    PRICE_HOT_MONTHS = int(os.getenv("PRICE_HOT_MONTHS", 3))
+    PRICE_WRITE_MODE = os.getenv("PRICE_WRITE_MODE", "append")  # "append" or "changes" (skip unchanged prices)
+
+    BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", 2))
+    BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", 50))
+    BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", 1500))
+
+    SCRAPER_PROFILE = os.getenv("SCRAPER_PROFILE", "light")  # "light" or "full"
+    SCRAPER_VIEWPORT = os.getenv("SCRAPER_VIEWPORT", "1920x1080")
+    SCRAPER_BLOCKED_RESOURCE_TYPES = [t for t in os.getenv("SCRAPER_BLOCKED_RESOURCE_TYPES", "image,media,font").split(",") if t]
+    SCRAPER_BLOCKED_DOMAINS = [d for d in os.getenv(
+        "SCRAPER_BLOCKED_DOMAINS",
+        "google-analytics.com,googletagmanager.com,doubleclick.net,amazon-adsystem.com,"
+        "scorecardresearch.com,facebook.net,fls-eu.amazon.co.uk,unagi.amazon.co.uk",
+    ).split(",") if d]
+    SCRAPER_EXTRACTION = os.getenv("SCRAPER_EXTRACTION", "evaluate")  # "evaluate", "locator" or "html"
+    SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "")
+    HTML_PARSER_EXECUTOR = os.getenv("HTML_PARSER_EXECUTOR", "thread")  # "thread" or "process"
+    HTML_PARSER_WORKERS = int(os.getenv("HTML_PARSER_WORKERS", 2))
+
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" or "redis"
+    RATE_MIN_DELAY = float(os.getenv("RATE_MIN_DELAY", 0.5))
+    RATE_MAX_DELAY = float(os.getenv("RATE_MAX_DELAY", 60))
+    RATE_INITIAL_DELAY = float(os.getenv("RATE_INITIAL_DELAY", 2))
+    RATE_DECREASE_STEP = float(os.getenv("RATE_DECREASE_STEP", 0.25))
+    RATE_BACKOFF_FACTOR = float(os.getenv("RATE_BACKOFF_FACTOR", 2))
+
+    HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", 20))
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+
+    REFRESH_BATCH_SIZE = int(os.getenv("REFRESH_BATCH_SIZE", 50))
+    REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", 8))
+
+    SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", 2))  # scrape jobs running at once, across workers
+    SEARCH_RESULT_TTL = int(os.getenv("SEARCH_RESULT_TTL", 900))  # seconds an identical search reuses a finished job
+    SEARCH_JOB_TIMEOUT = int(os.getenv("SEARCH_JOB_TIMEOUT", 1800))
+    SEARCH_RETRY_SECONDS = int(os.getenv("SEARCH_RETRY_SECONDS", 10))
+    SEARCH_RANK_MAX_MATCHES = int(os.getenv("SEARCH_RANK_MAX_MATCHES", 1000))  # broader title searches come back in id order
+
     CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
     CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/1")
+    REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/2")
+
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")  # "memory", "redis" or "off"
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 60))
+
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))  # rows fetched and encoded per chunk
+    ANALYTICS_DIR = os.getenv("ANALYTICS_DIR", "analytics")  # Parquet snapshots of products and prices
+    ANALYTICS_SNAPSHOT_HOURS = float(os.getenv("ANALYTICS_SNAPSHOT_HOURS", 24))
+
+    ALERT_WEBHOOK_URL = os.getenv("ALERT_WEBHOOK_URL", "")  # empty: alerts are only logged
+    ALERT_WEBHOOK_TIMEOUT = float(os.getenv("ALERT_WEBHOOK_TIMEOUT", 10))
+    ALERT_BATCH_SIZE = int(os.getenv("ALERT_BATCH_SIZE", 100))  # outbox events per webhook call
+    ALERT_NOTIFY_SECONDS = float(os.getenv("ALERT_NOTIFY_SECONDS", 60))
+    ALERT_EVENT_RETENTION_DAYS = int(os.getenv("ALERT_EVENT_RETENTION_DAYS", 90))  # sent events kept for /dashboard/alerts/events
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,58 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from app.config import settings
+
+
+class AuthCache:
+    """Short-lived LRU of authenticated users keyed by token subject.
+
+    Per process: an invalidation only reaches the process that made it, and
+    every other worker drops the entry when its TTL runs out.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.AUTH_CACHE_MAX_ENTRIES,
+        ttl: float = settings.AUTH_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires <= self.clock():
+                del self._entries[subject]
+                return None
+            self._entries.move_to_end(subject)
+            return user
+
+    def set(self, subject: str, user: Any):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[subject] = (self.clock() + self.ttl, user)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str):
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+auth_cache = AuthCache()
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_shutdown, worker_shutdown
 import os
 from app.config import settings
 
@@ -13,7 +14,7 @@ celery_app = Celery(
     "price_tracker",
     broker=broker_url,
     backend=result_backend,
-    include=["app.tasks.update_prices"],
+    include=["app.tasks.update_prices", "app.tasks.maintenance", "app.tasks.search", "app.tasks.alerts"],
 )
 
 celery_app.conf.update(
@@ -26,6 +27,14 @@ celery_app.conf.update(
 
 celery_app.autodiscover_tasks(["app.tasks"])
 
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def close_browser_pool(**kwargs):
+    from app.parsers.browser_pool import shutdown_browser_pool
+    shutdown_browser_pool()
+
+
 try:
     from . import celery_beat_schedule
 except Exception:
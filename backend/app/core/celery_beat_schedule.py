@@ -1,4 +1,5 @@
 from datetime import timedelta
+from app.config import settings
 from .celery_app import celery_app
 
 celery_app.conf.beat_schedule = {
@@ -7,4 +8,19 @@ celery_app.conf.beat_schedule = {
         "schedule": timedelta(days=1),
         "args": (),
     },
+    "maintain-price-storage-daily": {
+        "task": "app.tasks.maintenance.maintain_price_storage",
+        "schedule": timedelta(days=1),
+        "args": (),
+    },
+    "write-analytics-snapshot": {
+        "task": "app.tasks.maintenance.write_analytics_snapshot",
+        "schedule": timedelta(hours=settings.ANALYTICS_SNAPSHOT_HOURS),
+        "args": (),
+    },
+    "send-price-alerts": {
+        "task": "app.tasks.alerts.send_price_alerts",
+        "schedule": timedelta(seconds=settings.ALERT_NOTIFY_SECONDS),
+        "args": (),
+    },
 }
@@ -0,0 +1,88 @@
+"""Engine construction for the API, the Celery workers and the read-only query path.
+
+SQLite connections get WAL and the other pragmas below on connect, so the
+worker's writes no longer block API readers. Server databases get a sized
+QueuePool with pre-ping and recycle. Read-only engines set ``query_only`` on
+SQLite and ``default_transaction_read_only`` on Postgres.
+"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.config import settings
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Same database as ``url``, addressed through its asyncio driver."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.drivername in ASYNC_DRIVERS.values() or backend not in ASYNC_DRIVERS:
+        return url
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def sqlite_pragmas(read_only: bool = False) -> list[str]:
+    pragmas = [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def engine_options(url: str, read_only: bool = False) -> dict:
+    """Keyword arguments for create_engine/create_async_engine for ``url``."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        if parsed.get_driver_name() == "aiosqlite":
+            return {}
+        return {"connect_args": {"check_same_thread": False}}
+
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if backend == "postgresql" and read_only:
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"default_transaction_read_only": "on"}}
+        else:
+            options["connect_args"] = {"options": "-c default_transaction_read_only=on"}
+    return options
+
+
+def _install_sqlite_pragmas(engine: Engine, read_only: bool):
+    pragmas = sqlite_pragmas(read_only)
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def build_engine(url: str, read_only: bool = False) -> Engine:
+    engine = create_engine(url, **engine_options(url, read_only))
+    if engine.dialect.name == "sqlite":
+        _install_sqlite_pragmas(engine, read_only)
+    return engine
+
+
+def build_async_engine(url: str, read_only: bool = False) -> AsyncEngine:
+    engine = create_async_engine(url, **engine_options(url, read_only))
+    if engine.dialect.name == "sqlite":
+        _install_sqlite_pragmas(engine.sync_engine, read_only)
+    return engine
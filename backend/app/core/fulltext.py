@@ -0,0 +1,120 @@
+"""Full-text search over product titles.
+
+SQLite keeps an external-content FTS5 table, ``products_fts``, synced by
+triggers on ``products``. Postgres uses a GIN index on
+``to_tsvector('simple', title)``, plus a trigram index for the ILIKE fallback.
+Searches join ``title_matches``, a per-dialect ``(product_id, rank)``
+subquery. Every search term is prefix-matched: "iph" finds "iPhone".
+
+Run from backend/:  python -m app.core.fulltext   (creates the index and rebuilds it)
+"""
+import logging
+import re
+
+from sqlalchemy import and_, event, func, inspect, literal, literal_column, select, table, text
+from sqlalchemy.sql import Select, Subquery
+
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "products_fts"
+
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, content='products', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title) VALUES (new.id, new.title);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title) VALUES ('delete', old.id, old.title);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF title ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO {FTS_TABLE}(rowid, title) VALUES (new.id, new.title);
+    END""",
+]
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_products_title_fts ON products USING gin (to_tsvector('simple', title))",
+    "CREATE INDEX IF NOT EXISTS ix_products_title_trgm ON products USING gin (title gin_trgm_ops)",
+]
+
+
+def search_terms(title: str) -> str:
+    """Lower-cased word tokens of ``title`` joined by single spaces; empty if there are none."""
+    return " ".join(re.findall(r"\w+", title.lower()))
+
+
+def install_fulltext(conn, rebuild: bool = False):
+    """Create the full-text index for ``conn``'s dialect. Idempotent; a new FTS5 table is filled from products."""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        created = not inspect(conn).has_table(FTS_TABLE)
+        for statement in SQLITE_DDL:
+            conn.execute(text(statement))
+        if created or rebuild:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            logger.info(f"Built {FTS_TABLE}")
+    elif dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            conn.execute(text(statement))
+
+
+@event.listens_for(Product.__table__, "after_create")
+def _products_created(target, connection, **kw):
+    install_fulltext(connection)
+
+
+def fts5_query(terms: str) -> str:
+    return " ".join(f'"{term}"*' for term in terms.split())
+
+
+def tsquery(terms: str) -> str:
+    return " & ".join(f"{term}:*" for term in terms.split())
+
+
+def title_match_select(terms: str, dialect: str) -> Select:
+    """``(product_id, rank)`` of every product whose title matches all ``terms`` as
+    prefixes; lower rank is more relevant."""
+    if dialect == "sqlite":
+        fts = literal_column(FTS_TABLE)
+        matches = select(
+            literal_column(f"{FTS_TABLE}.rowid").label("product_id"),
+            func.bm25(fts).label("rank"),
+        ).select_from(table(FTS_TABLE)).where(fts.op("MATCH")(fts5_query(terms)))
+    elif dialect == "postgresql":
+        # inline the config so the expression matches ix_products_title_fts under server-side binds
+        config = literal_column("'simple'")
+        vector = func.to_tsvector(config, Product.title)
+        query = func.to_tsquery(config, tsquery(terms))
+        matches = select(
+            Product.id.label("product_id"),
+            (-func.ts_rank(vector, query)).label("rank"),
+        ).where(vector.op("@@")(query))
+    else:
+        matches = select(Product.id.label("product_id"), literal(0.0).label("rank")).where(
+            and_(*[Product.title.ilike(f"%{term}%") for term in terms.split()])
+        )
+    return matches
+
+
+def title_matches(terms: str, dialect: str) -> Subquery:
+    """``title_match_select`` as a subquery; join it to products to filter and rank."""
+    return title_match_select(terms, dialect).subquery("title_matches")
+
+
+def title_match_count(terms: str, dialect: str, cap: int) -> Select:
+    """Number of titles matching ``terms``, counting no further than ``cap``."""
+    matches = title_match_select(terms, dialect)
+    matches = matches.with_only_columns(matches.selected_columns.product_id).limit(cap).subquery()
+    return select(func.count()).select_from(matches)
+
+
+if __name__ == "__main__":
+    from app.db import engine
+
+    logging.basicConfig(level=logging.INFO)
+    with engine.begin() as conn:
+        install_fulltext(conn, rebuild=True)
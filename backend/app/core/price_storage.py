@@ -0,0 +1,339 @@
+"""Storage maintenance for the prices table.
+
+``PRICE_STORAGE=table`` keeps a single prices table. With ``partitioned``,
+Postgres gets native monthly range partitions and SQLite keeps the last
+``PRICE_HOT_MONTHS`` months in ``prices`` and moves older months into
+``prices_YYYY_MM`` tables that are unioned back by the ``prices_history`` view.
+
+``compact`` collapses runs of identical consecutive prices into one row per
+run whose ``last_seen_at`` is the end of the run.
+
+Run from backend/:  python -m app.core.price_storage {upgrade,partition,rollover,archive,compact}
+"""
+import argparse
+import logging
+from datetime import date, datetime
+from itertools import groupby
+from operator import attrgetter
+from typing import Optional
+
+from sqlalchemy import Column, MetaData, Table, bindparam, delete, inspect, select, text, update
+
+from app.config import settings
+from app.models.product import LatestPrice, Price, utc_now
+
+logger = logging.getLogger(__name__)
+
+HISTORY_VIEW = "prices_history"
+LEGACY_INDEXES = ["ix_prices_product_id"]
+
+
+def _month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _add_months(month: date, months: int) -> date:
+    total = month.year * 12 + month.month - 1 + months
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"prices_{month.year:04d}_{month.month:02d}"
+
+
+def _hot_start(hot_months: int) -> date:
+    return _add_months(_month_start(utc_now()), -(hot_months - 1))
+
+
+def _is_partitioned_mode(dialect: str) -> bool:
+    return settings.PRICE_STORAGE == "partitioned" and dialect in ("sqlite", "postgresql")
+
+
+def _price_table(name: str) -> Table:
+    return Table(name, MetaData(), *[Column(c.name, c.type) for c in Price.__table__.columns])
+
+
+def price_history_table(dialect: str) -> Table:
+    """Selectable holding the full price history for the given dialect."""
+    if settings.PRICE_STORAGE == "partitioned" and dialect == "sqlite":
+        return _price_table(HISTORY_VIEW)
+    return Price.__table__
+
+
+def updatable_since(dialect: str) -> Optional[datetime]:
+    """Oldest created_at whose row is guaranteed to still be in ``prices`` (None: all of them are).
+
+    Archiving moves or detaches months older than PRICE_HOT_MONTHS, so rows
+    before that cannot be updated through the Price model.
+    """
+    if not _is_partitioned_mode(dialect):
+        return None
+    start = _hot_start(settings.PRICE_HOT_MONTHS)
+    return datetime(start.year, start.month, start.day)
+
+
+def upgrade_price_indexes(engine):
+    """Create the (product_id, created_at DESC) index and drop the single-column index it replaces."""
+    with engine.begin() as conn:
+        existing = {ix["name"] for ix in inspect(conn).get_indexes("prices")}
+        for index in Price.__table__.indexes:
+            if index.name not in existing:
+                index.create(conn)
+                logger.info(f"Created index {index.name}")
+        for name in LEGACY_INDEXES:
+            if name in existing:
+                conn.execute(text(f"DROP INDEX {name}"))
+                logger.info(f"Dropped index {name}")
+
+
+def upgrade_price_columns(engine):
+    """Add Price columns missing from prices (and SQLite archive tables), e.g. last_seen_at."""
+    with engine.begin() as conn:
+        tables = ["prices"]
+        if conn.dialect.name == "sqlite":
+            tables += _sqlite_archive_tables(conn)
+        added = False
+        for table in tables:
+            existing = {column["name"] for column in inspect(conn).get_columns(table)}
+            for column in Price.__table__.columns:
+                if column.name not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {column.type.compile(conn.dialect)}"))
+                    logger.info(f"Added column {table}.{column.name}")
+                    added = True
+        if added and HISTORY_VIEW in inspect(conn).get_view_names():
+            _sqlite_create_history_view(conn)
+
+
+def _pg_is_partitioned(conn) -> bool:
+    return conn.execute(text("SELECT relkind FROM pg_class WHERE relname = 'prices'")).scalar() == "p"
+
+
+def _pg_create_partitions(conn, start: date, end: date):
+    month = start
+    while month <= end:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {_partition_name(month)} PARTITION OF prices "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        ))
+        month = _add_months(month, 1)
+
+
+def partition_postgres(engine, months_ahead: int):
+    """Convert prices into a table range-partitioned by month, copying existing rows."""
+    with engine.begin() as conn:
+        if _pg_is_partitioned(conn):
+            logger.info("prices is already partitioned")
+            return
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence('prices', 'id')")).scalar()
+
+        conn.execute(text("ALTER TABLE prices RENAME TO prices_unpartitioned"))
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+        conn.execute(text(
+            "CREATE TABLE prices (LIKE prices_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"
+        ))
+        conn.execute(text("ALTER TABLE prices ADD PRIMARY KEY (id, created_at)"))
+        conn.execute(text(
+            "ALTER TABLE prices ADD FOREIGN KEY (product_id) REFERENCES products (id) ON DELETE CASCADE"
+        ))
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY prices.id"))
+
+        first = conn.execute(text("SELECT min(created_at) FROM prices_unpartitioned")).scalar() or utc_now()
+        _pg_create_partitions(conn, _month_start(first), _add_months(_month_start(utc_now()), months_ahead))
+        conn.execute(text("CREATE TABLE IF NOT EXISTS prices_default PARTITION OF prices DEFAULT"))
+
+        copied = conn.execute(text("INSERT INTO prices SELECT * FROM prices_unpartitioned")).rowcount
+        conn.execute(text("DROP TABLE prices_unpartitioned"))
+        for index in Price.__table__.indexes:
+            index.create(conn)
+        logger.info(f"Partitioned prices by month, copied {copied} rows")
+
+
+def rollover_postgres(engine, months_ahead: int):
+    """Make sure partitions exist for the current month and ``months_ahead`` after it."""
+    with engine.begin() as conn:
+        if not _pg_is_partitioned(conn):
+            return
+        current = _month_start(utc_now())
+        _pg_create_partitions(conn, current, _add_months(current, months_ahead))
+
+
+def archive_postgres(engine, hot_months: int):
+    """Detach partitions older than ``hot_months``; detached tables stay queryable on their own."""
+    cutoff = _hot_start(hot_months)
+    with engine.begin() as conn:
+        partitions = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'prices' AND c.relname LIKE 'prices\\_____\\___'"
+        )).scalars().all()
+        for name in sorted(partitions):
+            if name < _partition_name(cutoff):
+                conn.execute(text(f"ALTER TABLE prices DETACH PARTITION {name}"))
+                logger.info(f"Detached partition {name}")
+
+
+def _sqlite_archive_tables(conn) -> list[str]:
+    return sorted(
+        name for name in inspect(conn).get_table_names()
+        if name.startswith("prices_") and name[7:11].isdigit()
+    )
+
+
+def _sqlite_create_history_view(conn):
+    columns = ", ".join(c.name for c in Price.__table__.columns)
+    selects = [f"SELECT {columns} FROM prices"]
+    selects += [f"SELECT {columns} FROM {name}" for name in _sqlite_archive_tables(conn)]
+    conn.execute(text(f"DROP VIEW IF EXISTS {HISTORY_VIEW}"))
+    conn.execute(text(f"CREATE VIEW {HISTORY_VIEW} AS " + " UNION ALL ".join(selects)))
+
+
+def archive_sqlite(engine, hot_months: int):
+    """Move months older than ``hot_months`` out of prices into per-month tables."""
+    cutoff = _hot_start(hot_months)
+    with engine.begin() as conn:
+        months = conn.execute(
+            text("SELECT DISTINCT strftime('%Y-%m-01', created_at) FROM prices WHERE created_at < :cutoff"),
+            {"cutoff": cutoff.isoformat()},
+        ).scalars().all()
+        for value in months:
+            month = date.fromisoformat(value)
+            name = _partition_name(month)
+            bounds = {"start": month.isoformat(), "end": _add_months(month, 1).isoformat()}
+            conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} AS SELECT * FROM prices WHERE 0"))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{name}_product_id_created_at ON {name} (product_id, created_at DESC)"
+            ))
+            moved = conn.execute(
+                text(f"INSERT INTO {name} SELECT * FROM prices WHERE created_at >= :start AND created_at < :end"),
+                bounds,
+            ).rowcount
+            conn.execute(text("DELETE FROM prices WHERE created_at >= :start AND created_at < :end"), bounds)
+            logger.info(f"Archived {moved} rows into {name}")
+        _sqlite_create_history_view(conn)
+
+
+def _compact_products(conn, table: Table, product_ids: list[int]) -> tuple[int, int]:
+    rows = conn.execute(
+        select(table.c.id, table.c.product_id, table.c.price, table.c.created_at, table.c.last_seen_at)
+        .where(table.c.product_id.in_(product_ids))
+        .order_by(table.c.product_id, table.c.created_at, table.c.id)
+    )
+    extended, dropped, latest = [], [], []
+    for product_id, product_rows in groupby(rows, key=attrgetter("product_id")):
+        runs = [list(run) for _, run in groupby(product_rows, key=attrgetter("price"))]
+        for run in runs:
+            if len(run) == 1:
+                continue
+            first = run[0]
+            last_seen = max(row.last_seen_at or row.created_at for row in run)
+            extended.append({"b_id": first.id, "b_last_seen": last_seen})
+            dropped += [row.id for row in run[1:]]
+        last_run = runs[-1]
+        if len(last_run) > 1:
+            latest.append({
+                "b_product_id": product_id,
+                "b_id": last_run[0].id,
+                "b_start": last_run[0].created_at,
+                "b_end": max(row.created_at for row in last_run),
+            })
+
+    if extended:
+        conn.execute(
+            update(table).where(table.c.id == bindparam("b_id")).values(last_seen_at=bindparam("b_last_seen")),
+            extended,
+        )
+    for i in range(0, len(dropped), 500):
+        conn.execute(delete(table).where(table.c.id.in_(dropped[i:i + 500])))
+    if latest:
+        # latest_prices pointing into a collapsed final run moves to the run's surviving row
+        latest_table = LatestPrice.__table__
+        conn.execute(
+            update(latest_table)
+            .where(
+                latest_table.c.product_id == bindparam("b_product_id"),
+                latest_table.c.created_at >= bindparam("b_start"),
+                latest_table.c.created_at <= bindparam("b_end"),
+            )
+            .values(price_id=bindparam("b_id"), created_at=bindparam("b_start")),
+            latest,
+        )
+    return len(extended), len(dropped)
+
+
+def compact_price_history(engine, batch_products: int = 500) -> tuple[int, int]:
+    """Collapse runs of consecutive rows with the same price into the run's first row.
+
+    The surviving row gets ``last_seen_at`` = the last time the run was seen;
+    the others are deleted. Works through products in batches, one
+    transaction each, and is safe to re-run. Runs are not merged across
+    SQLite archive tables. Returns (runs collapsed, rows deleted).
+    """
+    tables = [Price.__table__]
+    if _is_partitioned_mode(engine.dialect.name) and engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            tables += [_price_table(name) for name in _sqlite_archive_tables(conn)]
+
+    runs = deleted = 0
+    for table in tables:
+        with engine.connect() as conn:
+            product_ids = conn.execute(
+                select(table.c.product_id).distinct().order_by(table.c.product_id)
+            ).scalars().all()
+        table_runs = table_deleted = 0
+        for i in range(0, len(product_ids), batch_products):
+            with engine.begin() as conn:
+                collapsed, removed = _compact_products(conn, table, product_ids[i:i + batch_products])
+            table_runs += collapsed
+            table_deleted += removed
+        logger.info(f"Compacted {table.name}: {table_runs} runs collapsed, {table_deleted} rows deleted")
+        runs += table_runs
+        deleted += table_deleted
+    return runs, deleted
+
+
+def maintain_price_storage(engine):
+    """Periodic job: keep partitions rolling when partitioned storage is enabled."""
+    dialect = engine.dialect.name
+    if not _is_partitioned_mode(dialect):
+        return
+    if dialect == "postgresql":
+        rollover_postgres(engine, settings.PRICE_PARTITION_MONTHS_AHEAD)
+    else:
+        archive_sqlite(engine, settings.PRICE_HOT_MONTHS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain price history storage")
+    parser.add_argument("command", choices=["upgrade", "partition", "rollover", "archive", "compact"])
+    parser.add_argument("--months-ahead", type=int, default=settings.PRICE_PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--hot-months", type=int, default=settings.PRICE_HOT_MONTHS)
+    args = parser.parse_args()
+
+    from app.db import engine, init_db
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    init_db()
+    dialect = engine.dialect.name
+
+    if args.command == "upgrade":
+        upgrade_price_indexes(engine)
+        upgrade_price_columns(engine)
+    elif args.command == "partition":
+        if dialect == "postgresql":
+            partition_postgres(engine, args.months_ahead)
+        else:
+            archive_sqlite(engine, args.hot_months)
+    elif args.command == "rollover":
+        if dialect == "postgresql":
+            rollover_postgres(engine, args.months_ahead)
+    elif args.command == "archive":
+        if dialect == "postgresql":
+            archive_postgres(engine, args.hot_months)
+        else:
+            archive_sqlite(engine, args.hot_months)
+    elif args.command == "compact":
+        compact_price_history(engine)
+
+
+if __name__ == "__main__":
+    main()
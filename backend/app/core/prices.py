@@ -0,0 +1,128 @@
+"""Price strings from scraped pages -> Decimal amount + ISO 4217 currency.
+
+Handles symbols and codes before or after the number ("£1,299.00",
+"1.299,00 €", "USD 99.99", "CHF 1'299.50") and works out the decimal
+separator from the string itself: with both "." and "," present the last
+one is the decimal point, and a separator that repeats groups thousands.
+A lone "," followed by exactly three digits groups thousands; a lone "."
+only does so for currencies written with "." grouping (EUR, BRL), so
+"$1.299" stays 1.299. Otherwise the separator is the decimal point, which
+also covers a leading one ("$.99").
+
+Scraped batches repeat the same strings a lot, so parsing is memoized and
+``parse_prices`` maps a whole batch through the cache.
+"""
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional
+
+CURRENCY_SYMBOLS = {
+    "US$": "USD",
+    "C$": "CAD",
+    "CA$": "CAD",
+    "A$": "AUD",
+    "AU$": "AUD",
+    "R$": "BRL",
+    "$": "USD",
+    "£": "GBP",
+    "€": "EUR",
+    "¥": "JPY",
+    "₹": "INR",
+}
+CURRENCY_CODES = {"USD", "EUR", "GBP", "CAD", "AUD", "JPY", "INR", "BRL", "CHF", "SEK", "PLN", "MXN"}
+MINOR_DIGITS = {"JPY": 0}  # everything else has cents
+DOT_GROUPING = {"EUR", "BRL"}  # "1.299 €" is 1299; for other currencies a lone "." is the decimal point
+
+_CURRENCY_PATTERN = (
+    "|".join(re.escape(s) for s in sorted(CURRENCY_SYMBOLS, key=len, reverse=True))
+    + r"|\b(?:" + "|".join(sorted(CURRENCY_CODES)) + r")\b"
+)
+_CURRENCY = re.compile(_CURRENCY_PATTERN)
+# The number plus a currency right before or after it, in one pass.
+_PRICE = re.compile(rf"({_CURRENCY_PATTERN})?\s*([.,]?\d(?:[\d.,'\s]*\d)?)\s*({_CURRENCY_PATTERN})?")
+_PLAIN_NUMBER = re.compile(r"[.,]?\d[\d.,'\s]*").fullmatch
+_SINGLE_SYMBOLS = {s: code for s, code in CURRENCY_SYMBOLS.items() if len(s) == 1}
+_HAS_GROUPING = re.compile(r"['\s]").search  # spaces and apostrophes only ever group digits
+_ADJACENT_SEPARATORS = re.compile(r"[.,]{2}").search
+_GROUPING = str.maketrans("", "", "' \t\u00a0\u2009\u202f")
+
+
+class ParsedPrice(NamedTuple):
+    amount: Optional[Decimal]
+    currency: Optional[str]
+
+    @property
+    def minor_units(self) -> Optional[int]:
+        """Amount in the currency's smallest unit (cents, pence; yen stay yen)."""
+        if self.amount is None:
+            return None
+        digits = MINOR_DIGITS.get(self.currency, 2)
+        return int(self.amount.scaleb(digits).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _amount(number: str, currency: Optional[str] = None) -> Optional[Decimal]:
+    if _HAS_GROUPING(number):
+        number = number.translate(_GROUPING)
+    if _ADJACENT_SEPARATORS(number):
+        return None  # "89..99" is a broken string, not thousands grouping
+    dot, comma = number.rfind("."), number.rfind(",")
+    grouped = not number.startswith(("0", ".", ","))  # "0.999" / ".999" can't be thousands
+    if comma < 0:
+        if (grouped and len(number) - dot == 4 and currency in DOT_GROUPING) or number.count(".") > 1:
+            number = number.replace(".", "")
+    elif dot < 0:
+        if (grouped and len(number) - comma == 4) or number.count(",") > 1:
+            number = number.replace(",", "")
+        else:
+            number = number.replace(",", ".")
+    elif dot > comma:
+        number = number.replace(",", "")
+    else:
+        number = number.replace(".", "").replace(",", ".")
+    try:
+        return Decimal(number)
+    except InvalidOperation:
+        return None
+
+
+@lru_cache(maxsize=65536)
+def parse_price_text(text: Optional[str], default_currency: Optional[str] = None) -> ParsedPrice:
+    """Amount and currency of one price string; amount is None when there is no number ("N/A", "")."""
+    if not text:
+        return ParsedPrice(None, default_currency)
+    if not isinstance(text, str):
+        text = str(text)
+
+    # Fast path for the usual shape: one symbol right before or after a plain number.
+    stripped = text.strip()
+    currency = _SINGLE_SYMBOLS.get(stripped[:1])
+    if currency is not None:
+        number = stripped[1:].lstrip()
+    else:
+        currency = _SINGLE_SYMBOLS.get(stripped[-1:])
+        number = stripped[:-1].rstrip() if currency is not None else stripped
+    if _PLAIN_NUMBER(number):
+        currency = currency or default_currency
+        return ParsedPrice(_amount(number, currency), currency)
+
+    match = _PRICE.search(text)
+    if match is None:
+        currency = _CURRENCY.search(text)
+        return ParsedPrice(None, CURRENCY_SYMBOLS.get(currency.group(), currency.group()) if currency else default_currency)
+    symbol = match.group(1) or match.group(3)
+    if symbol is None:
+        currency = _CURRENCY.search(text)
+        symbol = currency.group() if currency else None
+    currency = CURRENCY_SYMBOLS.get(symbol, symbol) if symbol else default_currency
+    return ParsedPrice(_amount(match.group(2), currency), currency)
+
+def parse_prices(texts: Iterable[Optional[str]], default_currency: Optional[str] = None) -> List[ParsedPrice]:
+    return [parse_price_text(text, default_currency) for text in texts]
+
+
+if __name__ == "__main__":
+    import sys
+
+    for line in sys.argv[1:] or sys.stdin:
+        print(f"{line.strip()!r}: {parse_price_text(line.strip())}")
@@ -1,5 +1,25 @@
-from .search import search_products
-from .users import get_user_by_id,  get_user_by_email, create_user, update_user_password
-from .search_dashboard import search_dashboard_products
+from .search import search_products, search_products_async, get_all_products, get_all_products_async, page_cursor, search_order, resolve_search_order, resolve_search_order_async, PRODUCT_FIELDS
+from .users import (
+    get_user_by_id,
+    get_user_by_email,
+    create_user,
+    update_user_password,
+    get_user_by_id_async,
+    get_user_by_email_async,
+    create_user_async,
+    update_user_password_async,
+)
+from .search_dashboard import search_dashboard_products, search_dashboard_products_async
+from .price_history import price_history_query, price_buckets_query, RESOLUTIONS
+from .dashboard import get_dashboard_products, get_dashboard_products_async, get_product_with_prices_async
+from .export import product_export_query, price_export_query
 
-__all__ = ["search_products", "get_user_by_id", "get_user_by_email", "create_user", "update_user_password", "search_dashboard_products"]
\ No newline at end of file
+__all__ = [
+    "search_products", "search_products_async", "get_all_products", "get_all_products_async", "page_cursor", "search_order", "resolve_search_order", "resolve_search_order_async", "PRODUCT_FIELDS",
+    "get_user_by_id", "get_user_by_email", "create_user", "update_user_password",
+    "get_user_by_id_async", "get_user_by_email_async", "create_user_async", "update_user_password_async",
+    "search_dashboard_products", "search_dashboard_products_async",
+    "get_dashboard_products", "get_dashboard_products_async", "get_product_with_prices_async",
+    "price_history_query", "price_buckets_query", "RESOLUTIONS",
+    "product_export_query", "price_export_query",
+]
@@ -0,0 +1,33 @@
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from ..models import Product, UserProducts
+
+
+def dashboard_products_query(user_id: int, product_ids: Optional[List[int]] = None) -> Select:
+    """Products on a user's dashboard with their prices: one query for products, one for prices."""
+    query = (
+        select(Product)
+        .join(UserProducts, UserProducts.product_id == Product.id)
+        .where(UserProducts.user_id == user_id)
+        .options(selectinload(Product.prices))
+        .order_by(UserProducts.id)
+    )
+    if product_ids is not None:
+        query = query.where(UserProducts.product_id.in_(product_ids))
+    return query
+
+
+def get_dashboard_products(db: Session, user_id: int, product_ids: Optional[List[int]] = None) -> List[Product]:
+    return list(db.scalars(dashboard_products_query(user_id, product_ids)).all())
+
+
+async def get_dashboard_products_async(db: AsyncSession, user_id: int, product_ids: Optional[List[int]] = None) -> List[Product]:
+    return list((await db.scalars(dashboard_products_query(user_id, product_ids))).all())
+
+
+async def get_product_with_prices_async(db: AsyncSession, product_id: int) -> Optional[Product]:
+    return await db.scalar(
+        select(Product).where(Product.id == product_id).options(selectinload(Product.prices))
+    )
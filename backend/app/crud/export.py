@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Select, Table, or_, select
+
+from app.models.product import Product, UserProducts
+
+
+def _tracked_by(query: Select, product_id, user_id: Optional[int]) -> Select:
+    if user_id is None:
+        return query
+    return query.join(UserProducts, (UserProducts.product_id == product_id) & (UserProducts.user_id == user_id))
+
+
+def product_export_query(since: Optional[datetime] = None, user_id: Optional[int] = None) -> Select:
+    """Products in id order; ``since`` keeps those created or updated at or after it."""
+    query = _tracked_by(
+        select(Product.id, Product.title, Product.url, Product.image_url, Product.created_at, Product.updated_at),
+        Product.id,
+        user_id,
+    )
+    if since is not None:
+        query = query.where(Product.updated_at >= since)
+    return query.order_by(Product.id)
+
+
+def price_export_query(history: Table, since: Optional[datetime] = None, user_id: Optional[int] = None) -> Select:
+    """Price rows with their product's title and url, in id order.
+
+    ``since`` keeps rows created at or after it and rows whose last_seen_at
+    moved past it, so an incremental sync can upsert by ``price_id``.
+    """
+    query = _tracked_by(
+        select(
+            history.c.id.label("price_id"),
+            history.c.product_id,
+            Product.title,
+            Product.url,
+            history.c.site,
+            history.c.price,
+            history.c.created_at,
+            history.c.last_seen_at,
+        ).join(Product, Product.id == history.c.product_id),
+        history.c.product_id,
+        user_id,
+    )
+    if since is not None:
+        query = query.where(or_(history.c.created_at >= since, history.c.last_seen_at >= since))
+    return query.order_by(history.c.id)
@@ -0,0 +1,111 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Select, Table, and_, func, or_, select
+
+
+RESOLUTIONS = ("hour", "day", "week")
+
+SQLITE_BUCKET_FORMATS = {
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
+
+
+def _time_bounds(query: Select, history: Table, start: Optional[datetime], end: Optional[datetime]) -> Select:
+    if start is not None:
+        query = query.where(history.c.created_at >= start)
+    if end is not None:
+        query = query.where(history.c.created_at < end)
+    return query
+
+
+def _overlapping_bounds(
+    query: Select, history: Table, product_id: int, start: Optional[datetime], end: Optional[datetime]
+) -> Select:
+    """Like _time_bounds, but also keeps the row whose [created_at, last_seen_at] interval started
+    before ``start`` and still covers it. That row is the newest one created at or before ``start``,
+    so the lower bound stays a range on created_at."""
+    if start is not None:
+        previous = (
+            select(func.max(history.c.created_at))
+            .where(history.c.product_id == product_id, history.c.created_at <= start)
+            .scalar_subquery()
+        )
+        query = query.where(
+            history.c.created_at >= func.coalesce(previous, start),
+            func.coalesce(history.c.last_seen_at, history.c.created_at) >= start,
+        )
+    return _time_bounds(query, history, None, end)
+
+
+def price_history_query(
+    history: Table,
+    product_id: int,
+    limit: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    after: Optional[tuple[datetime, int]] = None,
+) -> Select:
+    """Newest-first price rows, keyset-paginated on (created_at, id). Fetches one extra row
+    so the caller can tell whether another page exists."""
+    query = select(history).where(history.c.product_id == product_id)
+    query = _overlapping_bounds(query, history, product_id, start, end)
+    if after is not None:
+        created_at, price_id = after
+        query = query.where(or_(
+            history.c.created_at < created_at,
+            and_(history.c.created_at == created_at, history.c.id < price_id),
+        ))
+    return query.order_by(history.c.created_at.desc(), history.c.id.desc()).limit(limit + 1)
+
+
+def bucket_expression(history: Table, dialect: str, resolution: str):
+    if dialect == "postgresql":
+        return func.date_trunc(resolution, history.c.created_at)
+    if resolution == "week":
+        # Monday 00:00 of the row's ISO week
+        return func.strftime("%Y-%m-%d 00:00:00", history.c.created_at, "weekday 0", "-6 days")
+    return func.strftime(SQLITE_BUCKET_FORMATS[resolution], history.c.created_at)
+
+
+def price_buckets_query(
+    history: Table,
+    dialect: str,
+    product_id: int,
+    resolution: str,
+    limit: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    before_bucket=None,
+) -> Select:
+    """Open/high/low/close/avg per time bucket, newest bucket first, computed in SQL.
+
+    Rows count in the bucket they were created in; with change-only writes a
+    bucket without a price change has no row and is left out.
+    """
+    bucket = bucket_expression(history, dialect, resolution).label("bucket")
+    price_type = history.c.price.type
+    ascending = (history.c.created_at.asc(), history.c.id.asc())
+    descending = (history.c.created_at.desc(), history.c.id.desc())
+
+    rows = select(
+        bucket,
+        history.c.price,
+        func.first_value(history.c.price, type_=price_type).over(partition_by=bucket, order_by=ascending).label("open"),
+        func.first_value(history.c.price, type_=price_type).over(partition_by=bucket, order_by=descending).label("close"),
+    ).where(history.c.product_id == product_id, history.c.price.isnot(None))
+    rows = _time_bounds(rows, history, start, end).subquery("price_rows")
+
+    query = select(
+        rows.c.bucket,
+        func.max(rows.c.open).label("open"),
+        func.max(rows.c.price).label("high"),
+        func.min(rows.c.price).label("low"),
+        func.max(rows.c.close).label("close"),
+        func.round(func.avg(rows.c.price), 2, type_=price_type).label("avg"),
+        func.count().label("count"),
+    ).group_by(rows.c.bucket)
+    if before_bucket is not None:
+        query = query.where(rows.c.bucket < before_bucket)
+    return query.order_by(rows.c.bucket.desc()).limit(limit + 1)
@@ -1,46 +1,209 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
+from sqlalchemy import Select, and_, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager, load_only, selectinload, with_expression
+from typing import List, Optional, Sequence
 from decimal import Decimal
-from ..models import Product, Price
+from ..config import settings
+from ..models import Product, LatestPrice
+from ..core.fulltext import search_terms, title_match_count, title_match_select, title_matches
 
-def search_products(
-    db: Session,
-    title: Optional[str] = None,
-    min_price: Optional[Decimal] = None,
-    max_price: Optional[Decimal] = None,
-    sort_by_price: Optional[str] = None
-) -> List[Product]:
+PRODUCT_FIELDS = ("id", "title", "url", "image_url")
+PRICE_INCLUDES = ("all", "latest", "none")
+
+# Products without a price sort first ascending and last descending on every dialect.
+MISSING_PRICE = literal(Decimal("-1"))
+
+
+def price_sort_key():
+    return func.coalesce(LatestPrice.price, MISSING_PRICE)
+
+
+def _project(query: Select, fields: Optional[Sequence[str]], include_prices: str) -> Select:
+    if fields:
+        query = query.options(load_only(*[getattr(Product, f) for f in fields]))
+    if include_prices == "all":
+        query = query.options(selectinload(Product.prices))
+    return query
+
+
+def search_order(sort_by_price: Optional[str] = None, title: Optional[str] = None, matches: Optional[int] = None) -> str:
+    """Sort key of a search: "price", "rank" (full-text relevance) or "id".
+
+    ``matches`` is the title's match count from ``title_match_count_query``; a
+    title matching SEARCH_RANK_MAX_MATCHES or more products is not ranked, since
+    ranking every match costs far more than returning the first page by id.
+    """
+    if sort_by_price in ("asc", "desc"):
+        return "price"
+    if title and search_terms(title):
+        return "rank" if matches is None or matches < settings.SEARCH_RANK_MAX_MATCHES else "id"
+    return "id"
+
+
+def title_match_count_query(title: str, dialect: str) -> Select:
+    return title_match_count(search_terms(title), dialect, settings.SEARCH_RANK_MAX_MATCHES)
+
+
+def resolve_search_order(db: Session, sort_by_price: Optional[str] = None, title: Optional[str] = None) -> str:
+    order = search_order(sort_by_price, title)
+    if order == "rank":
+        order = search_order(sort_by_price, title, db.scalar(title_match_count_query(title, db.get_bind().dialect.name)))
+    return order
+
+
+async def resolve_search_order_async(db: AsyncSession, sort_by_price: Optional[str] = None, title: Optional[str] = None) -> str:
+    order = search_order(sort_by_price, title)
+    if order == "rank":
+        matches = await db.scalar(title_match_count_query(title, db.get_bind().dialect.name))
+        order = search_order(sort_by_price, title, matches)
+    return order
+
+
+def filter_by_title(query: Select, title: Optional[str], dialect: str):
+    """Full-text prefix match on the title. Returns the query and the relevance column
+    (None when there is no full-text search); titles without word characters fall back to ILIKE."""
+    if not title:
+        return query, None
+    terms = search_terms(title)
+    if not terms:
+        return query.where(Product.title.ilike(f"%{title}%")), None
+    matches = title_matches(terms, dialect)
+    return query.join(matches, matches.c.product_id == Product.id), matches.c.rank
 
-    query = db.query(Product)
 
-    if title:
-        query = query.filter(Product.title.ilike(f"%{title}%"))
+def title_match_page(
+    terms: str,
+    dialect: str,
+    order: str,
+    min_price: Optional[Decimal],
+    max_price: Optional[Decimal],
+    after: Optional[list],
+    limit: Optional[int],
+):
+    """One page of matching ``(product_id, rank)`` in ``order`` ("rank" or "id"). The
+    price filter, cursor and LIMIT sit inside the full-text subquery, so only the
+    page's matches are joined to products instead of every one of them."""
+    matches = title_match_select(terms, dialect)
+    product_id, rank = matches.selected_columns.product_id, matches.selected_columns.rank
+    if order == "id":
+        matches = matches.with_only_columns(product_id)  # no relevance to compute
+    priced = select(LatestPrice.product_id).where(LatestPrice.product_id == product_id)
+    if min_price is not None:
+        priced = priced.where(LatestPrice.price >= min_price)
+    if max_price is not None:
+        priced = priced.where(LatestPrice.price <= max_price)
+    matches = matches.where(priced.exists())
+    if order == "rank":
+        if after is not None:
+            matches = matches.where(or_(rank > after[0], and_(rank == after[0], product_id > after[1])))
+        matches = matches.order_by(rank, product_id)
+    else:
+        if after is not None:
+            matches = matches.where(product_id > after[-1])
+        matches = matches.order_by(product_id)
+    if limit is not None:
+        matches = matches.limit(limit)
+    return matches.subquery("title_matches")
+
+
+def _after_id(query: Select, after: Optional[list]) -> Select:
+    if after is not None:
+        query = query.where(Product.id > after[-1])
+    return query
+
 
-    subq = (
-        db.query(
-            Price.product_id,
-            func.max(Price.created_at).label("latest_date")
+def all_products_query(
+    include_prices: str = "all",
+    fields: Optional[Sequence[str]] = None,
+    after: Optional[list] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    """Catalogue page ordered by id; ``after`` is the cursor ``[last_id]``."""
+    query = _project(select(Product), fields, include_prices)
+    if include_prices == "latest":
+        query = query.outerjoin(LatestPrice, LatestPrice.product_id == Product.id).options(
+            contains_eager(Product.latest_price)
         )
-        .group_by(Price.product_id)
-        .subquery()
-    )
+    query = _after_id(query, after).order_by(Product.id)
+    return query.limit(limit) if limit is not None else query
+
 
-    latest_prices = db.query(Price).join(
-        subq,
-        (Price.product_id == subq.c.product_id) & (Price.created_at == subq.c.latest_date)
-    ).subquery()
+def search_products_query(
+    title: Optional[str] = None,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    sort_by_price: Optional[str] = None,
+    include_prices: str = "all",
+    fields: Optional[Sequence[str]] = None,
+    after: Optional[list] = None,
+    limit: Optional[int] = None,
+    dialect: str = "sqlite",
+    order: Optional[str] = None,
+) -> Select:
+    """Filtered products in a stable order: by price when ``sort_by_price`` is set, by
+    relevance for title searches, else by id. ``order`` overrides that choice (see
+    ``resolve_search_order``). ``after`` is the cursor from ``page_cursor``."""
 
-    query = query.join(latest_prices, Product.id == latest_prices.c.product_id)
+    order = order or search_order(sort_by_price, title)
+    query = _project(select(Product), fields, include_prices)
+    terms = search_terms(title) if title else ""
+    if terms and order in ("rank", "id"):
+        matches = title_match_page(terms, dialect, order, min_price, max_price, after, limit)
+        query = query.join(matches, matches.c.product_id == Product.id)
+        rank = matches.c.rank if order == "rank" else None
+        after = None  # the cursor is applied inside the subquery
+    else:
+        query, rank = filter_by_title(query, title, dialect)
+
+    query = query.join(LatestPrice, LatestPrice.product_id == Product.id).options(
+        contains_eager(Product.latest_price)
+    )
 
     if min_price is not None:
-        query = query.filter(latest_prices.c.price >= min_price)
+        query = query.where(LatestPrice.price >= min_price)
     if max_price is not None:
-        query = query.filter(latest_prices.c.price <= max_price)
+        query = query.where(LatestPrice.price <= max_price)
+
+    if order == "price":
+        key = price_sort_key()
+        if after is not None:
+            price, last_id = Decimal(after[0]), after[1]
+            beyond = key > price if sort_by_price == "asc" else key < price
+            query = query.where(or_(beyond, and_(key == price, Product.id > last_id)))
+        query = query.order_by(key.asc() if sort_by_price == "asc" else key.desc(), Product.id.asc())
+    elif order == "rank":
+        query = query.options(with_expression(Product.search_rank, rank))
+        query = query.order_by(rank, Product.id)
+    else:
+        query = _after_id(query, after).order_by(Product.id)
+
+    return query.limit(limit) if limit is not None else query
+
+
+def page_cursor(product: Product, order: str = "id") -> list:
+    """Cursor values for the last product on a page, matching ``search_products_query(after=...)``."""
+    if order == "price":
+        latest = product.latest_price
+        price = latest.price if latest is not None and latest.price is not None else MISSING_PRICE.value
+        return [str(price), product.id]
+    if order == "rank":
+        return [product.search_rank, product.id]
+    return [product.id]
+
+
+def search_products(db: Session, **filters) -> List[Product]:
+    filters.setdefault("order", resolve_search_order(db, filters.get("sort_by_price"), filters.get("title")))
+    query = search_products_query(dialect=db.get_bind().dialect.name, **filters)
+    return list(db.scalars(query).unique().all())
+
+async def search_products_async(db: AsyncSession, **filters) -> List[Product]:
+    if "order" not in filters:
+        filters["order"] = await resolve_search_order_async(db, filters.get("sort_by_price"), filters.get("title"))
+    query = search_products_query(dialect=db.get_bind().dialect.name, **filters)
+    return list((await db.scalars(query)).unique().all())
 
-    if sort_by_price == "asc":
-        query = query.order_by(latest_prices.c.price.asc())
-    elif sort_by_price == "desc":
-        query = query.order_by(latest_prices.c.price.desc())
+def get_all_products(db: Session, **options) -> List[Product]:
+    return list(db.scalars(all_products_query(**options)).unique().all())
 
-    return query.all()
+async def get_all_products_async(db: AsyncSession, **options) -> List[Product]:
+    return list((await db.scalars(all_products_query(**options))).unique().all())
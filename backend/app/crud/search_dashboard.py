@@ -1,55 +1,55 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from decimal import Decimal
-from ..models import Product, Price, UserProducts, User
+from ..models import Product, LatestPrice, UserProducts
+from .search import filter_by_title
 
 
-def search_dashboard_products(
-    db: Session,
+def search_dashboard_products_query(
     user_id: int,
     title: Optional[str] = None,
     min_price: Optional[Decimal] = None,
     max_price: Optional[Decimal] = None,
     sort_by_price: Optional[str] = None,
-    only_favorites: bool = False
-) -> List[Product]:
+    only_favorites: bool = False,
+    dialect: str = "sqlite",
+) -> Select:
     query = (
-        db.query(Product)
+        select(Product)
+        .options(selectinload(Product.prices))
         .join(UserProducts, UserProducts.product_id == Product.id)
-        .filter(UserProducts.user_id == user_id)
+        .where(UserProducts.user_id == user_id)
     )
 
     if only_favorites:
-        query = query.filter(UserProducts.favorite == True)
-
-    if title:
-        query = query.filter(Product.title.ilike(f"%{title}%"))
-
-    subq = (
-        db.query(
-            Price.product_id,
-            func.max(Price.created_at).label("latest_date")
-        )
-        .group_by(Price.product_id)
-        .subquery()
-    )
+        query = query.where(UserProducts.favorite == True)
 
-    latest_prices = db.query(Price).join(
-        subq,
-        (Price.product_id == subq.c.product_id) & (Price.created_at == subq.c.latest_date)
-    ).subquery()
+    query, rank = filter_by_title(query, title, dialect)
 
-    query = query.join(latest_prices, Product.id == latest_prices.c.product_id)
+    query = query.join(LatestPrice, LatestPrice.product_id == Product.id)
 
     if min_price is not None:
-        query = query.filter(latest_prices.c.price >= min_price)
+        query = query.where(LatestPrice.price >= min_price)
     if max_price is not None:
-        query = query.filter(latest_prices.c.price <= max_price)
+        query = query.where(LatestPrice.price <= max_price)
 
     if sort_by_price == "asc":
-        query = query.order_by(latest_prices.c.price.asc())
+        query = query.order_by(LatestPrice.price.asc())
     elif sort_by_price == "desc":
-        query = query.order_by(latest_prices.c.price.desc())
+        query = query.order_by(LatestPrice.price.desc())
+    elif rank is not None:
+        query = query.order_by(rank, Product.id)
+
+    return query
+
+
+def search_dashboard_products(db: Session, user_id: int, **filters) -> List[Product]:
+    query = search_dashboard_products_query(user_id, dialect=db.get_bind().dialect.name, **filters)
+    return list(db.scalars(query).all())
+
 
-    return query.all()
+async def search_dashboard_products_async(db: AsyncSession, user_id: int, **filters) -> List[Product]:
+    query = search_dashboard_products_query(user_id, dialect=db.get_bind().dialect.name, **filters)
+    return list((await db.scalars(query)).all())
@@ -1,5 +1,8 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..models import User
+from ..core.auth_cache import auth_cache
 
 def get_user_by_email(db: Session, user_email: int) -> User:
     return db.query(User).filter(User.email == user_email).first()
@@ -17,5 +20,26 @@ def create_user(db: Session, email: str, password_hash: str):
 def update_user_password(db: Session, user, password_hash: str):
     user.password_hash = password_hash
     db.commit()
+    auth_cache.invalidate(user.email)
     db.refresh(user)
-    return user
\ No newline at end of file
+    return user
+
+async def get_user_by_email_async(db: AsyncSession, user_email: str) -> User:
+    return await db.scalar(select(User).where(User.email == user_email))
+
+async def get_user_by_id_async(db: AsyncSession, user_id: int) -> User:
+    return await db.get(User, user_id)
+
+async def create_user_async(db: AsyncSession, email: str, password_hash: str):
+    user = User(email=email, password_hash=password_hash)
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+async def update_user_password_async(db: AsyncSession, user, password_hash: str):
+    user.password_hash = password_hash
+    await db.commit()
+    auth_cache.invalidate(user.email)
+    await db.refresh(user)
+    return user
@@ -1,23 +1,62 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from app.models.product import Base
+from app.core.database import async_database_url, build_async_engine, build_engine
+from app.core.fulltext import install_fulltext
+from app.core.price_storage import upgrade_price_columns, upgrade_price_indexes
 from .config import Settings
 
 settings = Settings()
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+READ_DATABASE_URL = settings.READ_DATABASE_URL or settings.DATABASE_URL
+
+engine = build_engine(settings.DATABASE_URL)
+read_engine = build_engine(READ_DATABASE_URL, read_only=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+async_engine = build_async_engine(settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL))
+async_read_engine = build_async_engine(async_database_url(READ_DATABASE_URL), read_only=True)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    upgrade_price_columns(engine)
+    upgrade_price_indexes(engine)
+    with engine.begin() as conn:
+        install_fulltext(conn)
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+def get_async_read_sessionmaker():
+    """For streaming responses, which must open their session inside the body generator."""
+    return AsyncReadSessionLocal
+
+async def dispose_engines():
+    await async_engine.dispose()
+    await async_read_engine.dispose()
+    read_engine.dispose()
+    engine.dispose()
@@ -9,10 +9,11 @@ if sys.platform == "win32":
     from asyncio.windows_events import ProactorEventLoop
     import asyncio
 
-from .db import init_db
+from .db import init_db, dispose_engines
 from .routers import products, auth, dashboard
 
 from fastapi.middleware.cors import CORSMiddleware
+from .core.pagination import NEXT_CURSOR_HEADER
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
@@ -24,6 +25,7 @@ async def lifespan(app: FastAPI):
     logger.info("Database initialized")
     yield
     logger.info("Application shutting down...")
+    await dispose_engines()
 
 app = FastAPI(
     lifespan=lifespan,
@@ -38,6 +40,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 @app.get("/", tags=["Root"])
@@ -1,3 +1,3 @@
-from .product import Product, Price, User, UserProducts, Base
+from .product import Product, Price, LatestPrice, User, UserProducts, AlertRule, AlertEvent, Base
 
-__all__ = ['Product', 'Price', 'User', 'UserProducts', 'Base']
\ No newline at end of file
+__all__ = ['Product', 'Price', 'LatestPrice', 'User', 'UserProducts', 'AlertRule', 'AlertEvent', 'Base']
\ No newline at end of file
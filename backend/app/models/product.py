@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, UniqueConstraint, Boolean
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, UniqueConstraint, Boolean, Index
+from sqlalchemy.orm import declarative_base, query_expression, relationship
 from datetime import datetime, timezone
 
 Base = declarative_base()
@@ -33,18 +33,32 @@ class Product(Base):
         passive_deletes=True,
     )
     user_products = relationship("UserProducts", back_populates="product", cascade="all, delete-orphan")
+    latest_price = relationship("LatestPrice", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    search_rank = query_expression()  # full-text relevance, set by title searches
 
 class Price(Base):
     __tablename__ = "prices"
 
     id = Column(Integer, primary_key=True)
-    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
     site = Column(String, nullable=False)
     price = Column(Numeric(10, 2), nullable=True)
     created_at = Column(DateTime, default=utc_now, nullable=False, index=True)
+    last_seen_at = Column(DateTime, nullable=True)  # last scrape that still saw this price; NULL = only at created_at
 
     product = relationship("Product", back_populates="prices")
 
+Index("ix_prices_product_id_created_at", Price.product_id, Price.created_at.desc())
+
+class LatestPrice(Base):
+    __tablename__ = "latest_prices"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    price_id = Column(Integer, nullable=False)
+    site = Column(String, nullable=False)
+    price = Column(Numeric(10, 2), nullable=True, index=True)
+    created_at = Column(DateTime, nullable=False)
+
 class UserProducts(Base):
     __tablename__ = "user_products"
     __table_args__ = (UniqueConstraint('user_id', 'product_id', name='user_product_uc'),)
@@ -57,3 +71,34 @@ class UserProducts(Base):
 
     user = relationship("User", back_populates="user_products")
     product = relationship("Product", back_populates="user_products")
+    alert_rules = relationship("AlertRule", cascade="all, delete-orphan")
+
+class AlertRule(Base):
+    __tablename__ = "alert_rules"
+
+    id = Column(Integer, primary_key=True)
+    user_product_id = Column(Integer, ForeignKey("user_products.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)  # ingest looks rules up by product
+    kind = Column(String, nullable=False)  # "target", "drop_pct" or "all_time_low"
+    threshold = Column(Numeric(10, 2), nullable=True)  # target price, or percent for drop_pct
+    reference_price = Column(Numeric(10, 2), nullable=True)  # drop_pct: price when created; all_time_low: lowest seen
+    triggered = Column(Boolean, default=False, nullable=False)  # fired and the price has not gone back above the level
+    created_at = Column(DateTime, default=utc_now, nullable=False)
+
+# Outbox of fired alerts: written in the ingest transaction, sent by app.tasks.alerts.
+class AlertEvent(Base):
+    __tablename__ = "alert_events"
+
+    id = Column(Integer, primary_key=True)
+    rule_id = Column(Integer, ForeignKey("alert_rules.id", ondelete="SET NULL"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String, nullable=False)
+    price = Column(Numeric(10, 2), nullable=False)
+    previous_price = Column(Numeric(10, 2), nullable=True)
+    created_at = Column(DateTime, default=utc_now, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+Index("ix_alert_events_sent_at_id", AlertEvent.sent_at, AlertEvent.id)
+Index("ix_alert_events_user_id_id", AlertEvent.user_id, AlertEvent.id.desc())
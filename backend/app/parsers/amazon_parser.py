@@ -1,87 +1,215 @@
 import asyncio
 import json
 import logging
-import random
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
 from typing import List, Dict, Optional
 
+import httpx
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Locator
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from app.config import settings
+
+from .load_profile import PageLoadStats, apply_load_profile
+from .rate_control import DomainRateController, domain_of, get_rate_controller
+from .html_extract import (
+    SEARCH_IMAGE_SELECTOR,
+    SEARCH_LINK_SELECTOR,
+    SEARCH_LISTITEM_SELECTOR,
+    SEARCH_PRICE_FRACTION_SELECTOR,
+    SEARCH_PRICE_OFFSCREEN_SELECTOR,
+    SEARCH_PRICE_WHOLE_SELECTOR,
+    SEARCH_TITLE_SELECTOR,
+    build_search_item,
+    extract_product_page,
+    is_captcha_page,
+    parse_search_page,
+)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Runs in the page: one CDP round trip returns the raw values for every result.
+EXTRACT_ITEMS_JS = """
+(items, s) => items.map(item => {
+    const text = sel => { const el = item.querySelector(sel); return el ? el.innerText : null; };
+    const attr = (sel, name) => { const el = item.querySelector(sel); return el ? el.getAttribute(name) : null; };
+    return {
+        title: text(s.title),
+        href: attr(s.link, "href"),
+        image: attr(s.image, "src"),
+        offscreen: text(s.offscreen),
+        whole: text(s.whole),
+        fraction: text(s.fraction),
+    };
+})
+"""
+
+_parse_executor: Optional[Executor] = None
+
+def _get_parse_executor() -> Executor:
+    global _parse_executor
+    if _parse_executor is None:
+        if settings.HTML_PARSER_EXECUTOR == "process":
+            _parse_executor = ProcessPoolExecutor(max_workers=settings.HTML_PARSER_WORKERS)
+        else:
+            _parse_executor = ThreadPoolExecutor(max_workers=settings.HTML_PARSER_WORKERS)
+    return _parse_executor
+
 class AmazonParser:
     BASE_URL = "https://www.amazon.co.uk/"
     SEARCH_BAR_SELECTOR = "input#twotabsearchtextbox"
-    LISTITEM_SELECTOR = 'div.s-main-slot div[data-component-type="s-search-result"]'
+    LISTITEM_SELECTOR = SEARCH_LISTITEM_SELECTOR
     NEXT_BTN_SELECTOR = "a.s-pagination-next:not(.s-pagination-disabled)"
     COOKIES_FILE = "app/data/amazon_cookies.json"
 
-    def __init__(self, search_query: str, max_pages: int = 3, headless: bool = True):        
+    TITLE_SELECTOR = SEARCH_TITLE_SELECTOR
+    LINK_SELECTOR = SEARCH_LINK_SELECTOR
+    IMAGE_SELECTOR = SEARCH_IMAGE_SELECTOR
+    PRICE_OFFSCREEN_SELECTOR = SEARCH_PRICE_OFFSCREEN_SELECTOR
+    PRICE_WHOLE_SELECTOR = SEARCH_PRICE_WHOLE_SELECTOR
+    PRICE_FRACTION_SELECTOR = SEARCH_PRICE_FRACTION_SELECTOR
+
+    CONTEXT_OPTIONS = {
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                      "AppleWebKit/537.36 (KHTML, like Gecko) "
+                      "Chrome/237.84.2.178 Safari/537.36",
+        "locale": "en-US",
+        "java_script_enabled": True,
+        "viewport": {"width": 1920, "height": 1080},
+    }
+
+    HTTP_HEADERS = {
+        "User-Agent": CONTEXT_OPTIONS["user_agent"],
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-GB,en;q=0.9",
+    }
+
+    def __init__(
+        self,
+        search_query: str,
+        max_pages: int = 3,
+        headless: bool = True,
+        pool=None,
+        extraction: str = settings.SCRAPER_EXTRACTION,
+        snapshot_dir: Optional[str] = settings.SNAPSHOT_DIR,
+        profile: str = settings.SCRAPER_PROFILE,
+        rate_controller: Optional[DomainRateController] = None,
+    ):
         self.search_query = search_query
         self.max_pages = max_pages
         self.headless = headless
+        self.extraction = extraction
+        self.snapshot_dir = snapshot_dir
+        self.profile = profile
+        self.rate = rate_controller or get_rate_controller()
+        self.domain = domain_of(self.BASE_URL)
+        self.load_stats: Optional[PageLoadStats] = None
+        self.pool = pool
         self.playwright = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
-    
-    async def __aenter__(self):
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(headless=self.headless)
-        self.context = await self.browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                       "AppleWebKit/537.36 (KHTML, like Gecko) "
-                       "Chrome/237.84.2.178 Safari/537.36",
-            locale="en-US",
-            java_script_enabled=True,
-            viewport={"width": 1920, "height": 1080},
-        )
-        
+        self._lease = None
+
+    @classmethod
+    def context_options(cls) -> dict:
+        width, height = (int(v) for v in settings.SCRAPER_VIEWPORT.lower().split("x"))
+        return {**cls.CONTEXT_OPTIONS, "viewport": {"width": width, "height": height}}
+
+    @classmethod
+    async def load_cookies(cls, context: BrowserContext):
         try:
-            with open(self.COOKIES_FILE, "r") as f:
+            with open(cls.COOKIES_FILE, "r") as f:
                 cookies = json.load(f)
-            await self.context.add_cookies(cookies)
+            await context.add_cookies(cookies)
             logger.info("Cookies uploaded")
         except FileNotFoundError:
             logger.info("Cookies not found, continue without them")
 
+    async def __aenter__(self):
+        if self.pool is not None:
+            self._lease = self.pool.lease()
+            self.context = await self._lease.__aenter__()
+        else:
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(headless=self.headless)
+            self.context = await self.browser.new_context(**self.context_options())
+            await self.load_cookies(self.context)
+
+        self.load_stats = await apply_load_profile(self.context, self.profile)
         self.page = await self.context.new_page()
         return self
     
+    def _build_item(self, raw: Dict[str, Optional[str]]) -> Optional[Dict[str, str]]:
+        return build_search_item(raw, self.BASE_URL)
+
     async def _extract_item(self, item: Locator) -> Optional[Dict[str, str]]:
-        title_el = item.locator("h2.a-size-medium.a-spacing-none.a-color-base.a-text-normal")
+        title_el = item.locator(self.TITLE_SELECTOR)
         title = await title_el.inner_text() if await title_el.count() else ""
         if not title:
             return None
-        
-        link_el = item.locator("a.a-link-normal.s-line-clamp-2.s-link-style.a-text-normal")
-        relative_url = await link_el.get_attribute("href") if await link_el.count() else ""
-        url = f"{self.BASE_URL}{relative_url}" if relative_url else "N/A"
-
-        image_el = item.locator("img.s-image").first
-        image_url = await image_el.get_attribute("src") if await image_el.count() else "N/A"
-        
-        price = "N/A"
-        if await item.locator("span.a-price span.a-offscreen").count():
-            price = await item.locator("span.a-price span.a-offscreen").first.inner_text()
-        elif await item.locator("span.a-price-whole").count():
-            whole = await item.locator("span.a-price-whole").first.inner_text()
-            fraction = await item.locator("span.a-price-fraction").first.inner_text() if await item.locator("span.a-price-fraction").count() else "00"
-            price = f"${whole}.{fraction}"
-
-        return {
-            "title": title.strip(),
-            "image_url": image_url.strip() if image_url else "",
-            "price": price.strip() if price else None,
-            "url": url.strip()
+
+        link_el = item.locator(self.LINK_SELECTOR)
+        image_el = item.locator(self.IMAGE_SELECTOR).first
+        raw = {
+            "title": title,
+            "href": await link_el.get_attribute("href") if await link_el.count() else None,
+            "image": await image_el.get_attribute("src") if await image_el.count() else None,
+            "offscreen": None,
+            "whole": None,
+            "fraction": None,
         }
+        if await item.locator(self.PRICE_OFFSCREEN_SELECTOR).count():
+            raw["offscreen"] = await item.locator(self.PRICE_OFFSCREEN_SELECTOR).first.inner_text()
+        elif await item.locator(self.PRICE_WHOLE_SELECTOR).count():
+            raw["whole"] = await item.locator(self.PRICE_WHOLE_SELECTOR).first.inner_text()
+            if await item.locator(self.PRICE_FRACTION_SELECTOR).count():
+                raw["fraction"] = await item.locator(self.PRICE_FRACTION_SELECTOR).first.inner_text()
+        return self._build_item(raw)
+
+    async def _extract_items(self, items: Locator) -> List[Dict[str, str]]:
+        """Read every result on the page with a single evaluate_all round trip."""
+        raw_items = await items.evaluate_all(EXTRACT_ITEMS_JS, {
+            "title": self.TITLE_SELECTOR,
+            "link": self.LINK_SELECTOR,
+            "image": self.IMAGE_SELECTOR,
+            "offscreen": self.PRICE_OFFSCREEN_SELECTOR,
+            "whole": self.PRICE_WHOLE_SELECTOR,
+            "fraction": self.PRICE_FRACTION_SELECTOR,
+        })
+        return [item for item in map(self._build_item, raw_items) if item]
+
+    def _save_snapshot(self, html: str, page_num: int):
+        if not self.snapshot_dir:
+            return
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        slug = re.sub(r"[^a-z0-9]+", "-", self.search_query.lower()).strip("-") or "search"
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(self.snapshot_dir, f"{slug}_{timestamp}_p{page_num}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        logger.info(f"Saved page snapshot to {path}")
+
+    @classmethod
+    def parse_snapshot(cls, path: str) -> List[Dict[str, str]]:
+        """Re-parse a saved results page, e.g. after selectors changed."""
+        with open(path, encoding="utf-8") as f:
+            return parse_search_page(f.read(), cls.BASE_URL)
 
     async def run(self) -> List[Dict[str, str]]:
         logger.info(f"Start parsing using query: '{self.search_query}'")
         try:
+            await self.rate.wait(self.domain)
+            self.load_stats.reset()
             await self.page.goto(self.BASE_URL, timeout=60000)
             await self.page.wait_for_selector(self.SEARCH_BAR_SELECTOR, timeout=30000)
-        except TimeoutError:
+            self.load_stats.log("home page")
+        except PlaywrightTimeoutError:
+            self.rate.on_failure(self.domain)
             error_file = "error_screenshot.png"
             await self.page.screenshot(path=error_file, full_page=True)
             logger.error(f"Failed to find search bar. Amazon might be showing a CAPTCHA. See {error_file}")
@@ -90,41 +218,111 @@ class AmazonParser:
             return []
 
         await self.page.locator(self.SEARCH_BAR_SELECTOR).fill(self.search_query)
+        await self.rate.wait(self.domain)
+        self.load_stats.reset()
         await self.page.keyboard.press("Enter")
         await self.page.wait_for_load_state('domcontentloaded')
-        await asyncio.sleep(random.uniform(2, 5))
+        self.load_stats.log("results page 1")
 
         all_results = []
+        pending_pages = []
+        loop = asyncio.get_running_loop()
         for page_num in range(1, self.max_pages + 1):
             logger.info(f"Collecting data from page {page_num}...")
             try:
                 await self.page.wait_for_selector(self.LISTITEM_SELECTOR, timeout=30000)
-            except TimeoutError:
+                self.rate.on_success(self.domain)
+            except PlaywrightTimeoutError:
+                self.rate.on_failure(self.domain)
                 error_file = f"error_page_{page_num}.png"
                 await self.page.screenshot(path=error_file, full_page=True)
                 logger.warning(f"Could not find items on page {page_num}. Possibly the end or a CAPTCHA. See {error_file}")
                 break
             
-            count = await self.page.locator(self.LISTITEM_SELECTOR).count()
-            logger.info(f"Items on page: {count}")
-            
-            items = await self.page.locator(self.LISTITEM_SELECTOR).all()
-            tasks = [self._extract_item(item) for item in items]
-            results = [r for r in await asyncio.gather(*tasks) if r]
-            all_results.extend(results)
+            if self.extraction == "html":
+                # Parsing happens off the event loop while the browser moves on to the next page.
+                html = await self.page.content()
+                self._save_snapshot(html, page_num)
+                pending_pages.append(loop.run_in_executor(_get_parse_executor(), parse_search_page, html, self.BASE_URL))
+            else:
+                count = await self.page.locator(self.LISTITEM_SELECTOR).count()
+                logger.info(f"Items on page: {count}")
+
+                if self.extraction == "evaluate":
+                    results = await self._extract_items(self.page.locator(self.LISTITEM_SELECTOR))
+                else:
+                    items = await self.page.locator(self.LISTITEM_SELECTOR).all()
+                    tasks = [self._extract_item(item) for item in items]
+                    results = [r for r in await asyncio.gather(*tasks) if r]
+                all_results.extend(results)
             
             if page_num < self.max_pages:
                 next_button = self.page.locator(self.NEXT_BTN_SELECTOR)
                 if await next_button.count() > 0:
+                    await self.rate.wait(self.domain)
+                    self.load_stats.reset()
                     await next_button.click()
                     await self.page.wait_for_load_state('domcontentloaded')
-                    await asyncio.sleep(random.uniform(2, 5))
+                    self.load_stats.log(f"results page {page_num + 1}")
                 else:
                     logger.info("No next btn found.")
                     break
 
+        for results in await asyncio.gather(*pending_pages):
+            logger.info(f"Items parsed from snapshot: {len(results)}")
+            all_results.extend(results)
+
         return all_results
 
+    @classmethod
+    async def fetch_product_http(
+        cls,
+        url: str,
+        client: httpx.AsyncClient,
+        rate_controller: Optional[DomainRateController] = None,
+    ) -> Optional[Dict[str, str]]:
+        """Fetch a product page without a browser. None means the caller should fall back to run_product."""
+        rate = rate_controller or get_rate_controller()
+        domain = domain_of(url)
+        await rate.wait(domain)
+        try:
+            response = await client.get(url, headers=cls.HTTP_HEADERS, follow_redirects=True)
+        except httpx.HTTPError as e:
+            logger.warning(f"HTTP fetch failed for {url}: {e}")
+            return None
+        if response.status_code in (429, 503):
+            rate.on_failure(domain)
+        if response.status_code != 200:
+            logger.warning(f"HTTP fetch for {url} returned {response.status_code}")
+            return None
+        item = extract_product_page(response.text, url)
+        if item is None:
+            if is_captcha_page(response.text):
+                rate.on_failure(domain)
+            logger.warning(f"No product data in HTTP response for {url}, possibly a CAPTCHA")
+            return None
+        rate.on_success(domain)
+        return item
+
+    async def run_product(self, url: str) -> Optional[Dict[str, str]]:
+        logger.info(f"Opening product page in browser: {url}")
+        try:
+            await self.rate.wait(domain_of(url))
+            self.load_stats.reset()
+            await self.page.goto(url, timeout=60000)
+            await self.page.wait_for_load_state("domcontentloaded")
+            self.load_stats.log("product page")
+        except Exception as e:
+            logger.error(f"Failed to open product page {url}: {e}")
+            return None
+        html = await self.page.content()
+        item = extract_product_page(html, url)
+        if item is None and is_captcha_page(html):
+            self.rate.on_failure(domain_of(url))
+        elif item is not None:
+            self.rate.on_success(domain_of(url))
+        return item
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         try:
             cookies = await self.context.cookies()
@@ -134,6 +332,11 @@ class AmazonParser:
         except Exception as e:
             logger.error(f"Failed to save cookies: {e}")
 
+        if self._lease is not None:
+            await self._lease.__aexit__(exc_type, exc_val, exc_tb)
+            self._lease = None
+            return
+
         if self.browser:
             await self.browser.close()
         if self.playwright:
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import httpx
+from playwright.async_api import async_playwright, Browser, BrowserContext
+
+from app.config import settings
+from .amazon_parser import AmazonParser
+
+logger = logging.getLogger(__name__)
+
+
+def _process_tree_rss_mb(root_pid: int) -> float:
+    """Resident memory of every descendant of ``root_pid`` (Linux only, 0 elsewhere)."""
+    try:
+        children = {}
+        rss_pages = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+            except OSError:
+                continue
+            children.setdefault(int(fields[1]), []).append(int(entry))
+            rss_pages[int(entry)] = int(fields[21])
+    except OSError:
+        return 0.0
+
+    total, stack = 0, list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        total += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class _PooledBrowser:
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.pages_served = 0
+
+
+class BrowserPool:
+    """A fixed number of long-lived Chromium instances handing out fresh contexts.
+
+    Each browser is relaunched after ``max_pages`` leases, or when the browser
+    processes together use more than ``max_rss_mb``.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.BROWSER_POOL_SIZE,
+        max_pages: int = settings.BROWSER_MAX_PAGES,
+        max_rss_mb: int = settings.BROWSER_MAX_RSS_MB,
+        headless: bool = True,
+    ):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.headless = headless
+        self.playwright = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._browsers: list[_PooledBrowser] = []
+
+    async def start(self):
+        self.playwright = await async_playwright().start()
+        self._idle = asyncio.Queue()
+        try:
+            for _ in range(self.size):
+                pooled = _PooledBrowser(await self._launch())
+                self._browsers.append(pooled)
+                self._idle.put_nowait(pooled)
+        except Exception:
+            await self.close()  # don't leak the driver and the browsers already launched
+            raise
+        logger.info(f"Browser pool started with {self.size} browsers")
+        return self
+
+    async def _launch(self) -> Browser:
+        return await self.playwright.chromium.launch(headless=self.headless)
+
+    async def _recycle(self, pooled: _PooledBrowser, reason: str):
+        logger.info(f"Recycling browser after {pooled.pages_served} pages ({reason})")
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            logger.warning(f"Failed to close browser: {e}")
+        pooled.browser = await self._launch()
+        pooled.pages_served = 0
+
+    @asynccontextmanager
+    async def lease(self):
+        pooled = await self._idle.get()
+        context: Optional[BrowserContext] = None
+        try:
+            if not pooled.browser.is_connected():
+                await self._recycle(pooled, "disconnected")
+            context = await pooled.browser.new_context(**AmazonParser.context_options())
+            await AmazonParser.load_cookies(context)
+            yield context
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.warning(f"Failed to close browser context: {e}")
+            pooled.pages_served += 1
+            try:
+                if pooled.pages_served >= self.max_pages:
+                    await self._recycle(pooled, "page limit")
+                elif self.max_rss_mb and _process_tree_rss_mb(os.getpid()) > self.max_rss_mb:
+                    await self._recycle(pooled, "memory limit")
+            finally:
+                self._idle.put_nowait(pooled)
+
+    async def close(self):
+        for pooled in self._browsers:
+            try:
+                await pooled.browser.close()
+            except Exception as e:
+                logger.warning(f"Failed to close browser: {e}")
+        self._browsers.clear()
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+        logger.info("Browser pool stopped.")
+
+
+# Playwright objects are bound to the event loop that created them, so a
+# worker process keeps one loop running in a background thread and every
+# task submits its coroutine there instead of calling asyncio.run().
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_pool_ready: Optional[asyncio.Future] = None
+_http_client: Optional[httpx.AsyncClient] = None
+_lock = threading.Lock()
+
+
+def _worker_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="browser-pool-loop", daemon=True).start()
+        return _loop
+
+
+def run_in_worker_loop(coro):
+    return asyncio.run_coroutine_threadsafe(coro, _worker_loop()).result()
+
+
+async def get_browser_pool() -> BrowserPool:
+    """Worker-wide pool; must be awaited from inside run_in_worker_loop."""
+    global _pool_ready
+    failed = _pool_ready is not None and _pool_ready.done() and (_pool_ready.cancelled() or _pool_ready.exception())
+    if _pool_ready is None or failed:
+        _pool_ready = asyncio.ensure_future(BrowserPool().start())  # a failed launch is retried by the next task
+    return await _pool_ready
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Worker-wide pooled HTTP client; must be used from inside run_in_worker_loop."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=settings.HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=settings.HTTP_MAX_CONNECTIONS),
+        )
+    return _http_client
+
+
+async def _close_pool():
+    global _pool_ready, _http_client
+    ready, _pool_ready = _pool_ready, None
+    client, _http_client = _http_client, None
+    if client is not None:
+        await client.aclose()
+    if ready is not None and ready.done() and not ready.cancelled() and not ready.exception():
+        await ready.result().close()
+
+
+def shutdown_browser_pool():
+    global _loop
+    with _lock:
+        loop, _loop = _loop, None
+    if loop is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_close_pool(), loop).result(timeout=30)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
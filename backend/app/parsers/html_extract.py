@@ -0,0 +1,130 @@
+from typing import Dict, List, Optional
+
+from selectolax.lexbor import LexborHTMLParser
+
+CAPTCHA_SELECTOR = "form[action*='validateCaptcha']"
+
+SEARCH_LISTITEM_SELECTOR = 'div.s-main-slot div[data-component-type="s-search-result"]'
+SEARCH_TITLE_SELECTOR = "h2.a-size-medium.a-spacing-none.a-color-base.a-text-normal"
+SEARCH_LINK_SELECTOR = "a.a-link-normal.s-line-clamp-2.s-link-style.a-text-normal"
+SEARCH_IMAGE_SELECTOR = "img.s-image"
+SEARCH_PRICE_OFFSCREEN_SELECTOR = "span.a-price span.a-offscreen"
+SEARCH_PRICE_WHOLE_SELECTOR = "span.a-price-whole"
+SEARCH_PRICE_FRACTION_SELECTOR = "span.a-price-fraction"
+
+PRODUCT_TITLE_SELECTOR = "#productTitle"
+PRODUCT_IMAGE_SELECTOR = "#landingImage"
+PRODUCT_PRICE_SELECTORS = [
+    "#corePrice_feature_div span.a-price span.a-offscreen",
+    "#corePriceDisplay_desktop_feature_div span.a-price span.a-offscreen",
+    "#apex_desktop span.a-price span.a-offscreen",
+    "#priceblock_ourprice",
+    "#priceblock_dealprice",
+]
+PRODUCT_PRICE_WHOLE_SELECTOR = "#corePriceDisplay_desktop_feature_div span.a-price-whole"
+PRODUCT_PRICE_FRACTION_SELECTOR = "#corePriceDisplay_desktop_feature_div span.a-price-fraction"
+
+
+def _text(tree, selector: str) -> str:
+    node = tree.css_first(selector)
+    return node.text(strip=True) if node is not None else ""
+
+
+def build_search_item(raw: Dict[str, Optional[str]], base_url: str) -> Optional[Dict[str, str]]:
+    """Turn raw text/attribute values of one search result into the item dict; missing values are None."""
+    title = raw.get("title") or ""
+    if not title:
+        return None
+
+    relative_url = raw.get("href") or ""
+    url = f"{base_url}{relative_url}" if relative_url else "N/A"
+
+    image_url = raw.get("image") if raw.get("image") is not None else "N/A"
+
+    price = "N/A"
+    if raw.get("offscreen") is not None:
+        price = raw["offscreen"]
+    elif raw.get("whole") is not None:
+        fraction = raw["fraction"] if raw.get("fraction") is not None else "00"
+        whole = raw["whole"].strip().rstrip(".,")  # the text includes the nested a-price-decimal span
+        price = f"${whole}.{fraction}"
+
+    return {
+        "title": title.strip(),
+        "image_url": image_url.strip() if image_url else "",
+        "price": price.strip() if price else None,
+        "url": url.strip()
+    }
+
+
+def _inner_text(node, selector: str) -> Optional[str]:
+    el = node.css_first(selector)
+    return " ".join(el.text().split()) if el is not None else None
+
+
+def _attribute(node, selector: str, name: str) -> Optional[str]:
+    el = node.css_first(selector)
+    return el.attributes.get(name) if el is not None else None
+
+
+def parse_search_page(html: str, base_url: str) -> List[Dict[str, str]]:
+    """Offline counterpart of AmazonParser._extract_items for a saved results page.
+
+    Module-level so it can run in a process pool.
+    """
+    tree = LexborHTMLParser(html)
+    results = []
+    for node in tree.css(SEARCH_LISTITEM_SELECTOR):
+        item = build_search_item({
+            "title": _inner_text(node, SEARCH_TITLE_SELECTOR),
+            "href": _attribute(node, SEARCH_LINK_SELECTOR, "href"),
+            "image": _attribute(node, SEARCH_IMAGE_SELECTOR, "src"),
+            "offscreen": _inner_text(node, SEARCH_PRICE_OFFSCREEN_SELECTOR),
+            "whole": _inner_text(node, SEARCH_PRICE_WHOLE_SELECTOR),
+            "fraction": _inner_text(node, SEARCH_PRICE_FRACTION_SELECTOR),
+        }, base_url)
+        if item:
+            results.append(item)
+    return results
+
+
+def is_captcha_page(html: str) -> bool:
+    return LexborHTMLParser(html).css_first(CAPTCHA_SELECTOR) is not None
+
+
+def extract_product_page(html: str, url: str) -> Optional[Dict[str, str]]:
+    """Pull title, image and price out of a product detail page.
+
+    Returns None for CAPTCHA pages or pages without a product title.
+    """
+    tree = LexborHTMLParser(html)
+    if tree.css_first(CAPTCHA_SELECTOR) is not None:
+        return None
+
+    title = _text(tree, PRODUCT_TITLE_SELECTOR)
+    if not title:
+        return None
+
+    image_url = ""
+    image_el = tree.css_first(PRODUCT_IMAGE_SELECTOR)
+    if image_el is not None:
+        image_url = image_el.attributes.get("data-old-hires") or image_el.attributes.get("src") or ""
+
+    price = "N/A"
+    for selector in PRODUCT_PRICE_SELECTORS:
+        text = _text(tree, selector)
+        if text:
+            price = text
+            break
+    else:
+        whole = _text(tree, PRODUCT_PRICE_WHOLE_SELECTOR).rstrip(".")
+        if whole:
+            fraction = _text(tree, PRODUCT_PRICE_FRACTION_SELECTOR) or "00"
+            price = f"${whole}.{fraction}"
+
+    return {
+        "title": title,
+        "image_url": image_url.strip(),
+        "price": price,
+        "url": url,
+    }
@@ -0,0 +1,77 @@
+import logging
+import time
+from typing import Iterable
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext, Error, Request, Response, Route
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PageLoadStats:
+    """Requests, bytes and wall time of one page load in a context.
+
+    Bytes are what came over the network: response headers plus the body as
+    transferred, so chunked responses without Content-Length count too.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+
+    def on_response(self, response: Response):
+        self.requests += 1
+
+    async def on_request_finished(self, request: Request):
+        try:
+            sizes = await request.sizes()
+        except Error:  # the context closed before the sizes were read
+            return
+        self.bytes += max(sizes["responseHeadersSize"], 0) + max(sizes["responseBodySize"], 0)
+
+    def log(self, label: str):
+        elapsed = time.perf_counter() - self.started
+        logger.info(
+            f"Loaded {label} in {elapsed:.2f}s: {self.requests} responses, "
+            f"{self.bytes / 1024:.0f} KiB, {self.blocked} requests blocked"
+        )
+
+
+def _is_blocked_host(url: str, blocked_domains: Iterable[str]) -> bool:
+    host = urlsplit(url).hostname or ""
+    return any(host == domain or host.endswith(f".{domain}") for domain in blocked_domains)
+
+
+async def apply_load_profile(
+    context: BrowserContext,
+    profile: str = settings.SCRAPER_PROFILE,
+    blocked_resource_types: Iterable[str] = settings.SCRAPER_BLOCKED_RESOURCE_TYPES,
+    blocked_domains: Iterable[str] = settings.SCRAPER_BLOCKED_DOMAINS,
+) -> PageLoadStats:
+    """Attach load statistics to ``context`` and, for the "light" profile, abort
+    requests the parser never reads: images, media, fonts and tracker domains."""
+    stats = PageLoadStats()
+    context.on("response", stats.on_response)
+    context.on("requestfinished", stats.on_request_finished)
+    if profile != "light":
+        return stats
+
+    blocked_resource_types = frozenset(blocked_resource_types)
+    blocked_domains = tuple(blocked_domains)
+
+    async def handle(route: Route, request: Request):
+        if request.resource_type in blocked_resource_types or _is_blocked_host(request.url, blocked_domains):
+            stats.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", handle)
+    return stats
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def domain_of(url: str) -> str:
+    return urlsplit(url).hostname or url
+
+
+class DomainRateController:
+    """Per-domain request spacing with AIMD adjustment.
+
+    Every request reserves the next free slot for its domain; slots are
+    ``delay`` seconds apart. Clean responses shave ``decrease_step`` off the
+    delay, CAPTCHAs and empty pages multiply it by ``backoff_factor``.
+    """
+
+    def __init__(
+        self,
+        min_delay: float = settings.RATE_MIN_DELAY,
+        max_delay: float = settings.RATE_MAX_DELAY,
+        initial_delay: float = settings.RATE_INITIAL_DELAY,
+        decrease_step: float = settings.RATE_DECREASE_STEP,
+        backoff_factor: float = settings.RATE_BACKOFF_FACTOR,
+        jitter: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_delay = initial_delay
+        self.decrease_step = decrease_step
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.clock = clock
+        self._delays: Dict[str, float] = {}
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def delay(self, domain: str) -> float:
+        return self._delays.get(domain, self.initial_delay)
+
+    def reserve(self, domain: str) -> float:
+        """Claim the next slot for ``domain`` and return how long to wait for it."""
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next_slot.get(domain, now))
+            delay = self.delay(domain)
+            self._next_slot[domain] = slot + delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+            return slot - now
+
+    async def wait(self, domain: str):
+        pause = self.reserve(domain)
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+    def on_success(self, domain: str):
+        with self._lock:
+            self._delays[domain] = max(self.min_delay, self.delay(domain) - self.decrease_step)
+
+    def on_failure(self, domain: str):
+        with self._lock:
+            delay = min(self.max_delay, self.delay(domain) * self.backoff_factor)
+            self._delays[domain] = delay
+            self._next_slot[domain] = max(self._next_slot.get(domain, 0), self.clock()) + delay
+        logger.warning(f"Backing off {domain}: delay is now {delay:.1f}s")
+
+
+class RedisRateController(DomainRateController):
+    """Same policy, with delay and next slot kept in Redis so every worker shares them."""
+
+    RESERVE_SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local delay = tonumber(redis.call('GET', KEYS[1]) or ARGV[2])
+    local slot = math.max(now, tonumber(redis.call('GET', KEYS[2]) or now))
+    redis.call('SET', KEYS[2], slot + delay * tonumber(ARGV[3]), 'EX', 3600)
+    return tostring(slot - now)
+    """
+    ADJUST_SCRIPT = """
+    local delay = tonumber(redis.call('GET', KEYS[1]) or ARGV[1])
+    if ARGV[2] == 'success' then
+        delay = math.max(tonumber(ARGV[3]), delay - tonumber(ARGV[4]))
+    else
+        delay = math.min(tonumber(ARGV[5]), delay * tonumber(ARGV[6]))
+        local now = tonumber(ARGV[7])
+        local slot = math.max(now, tonumber(redis.call('GET', KEYS[2]) or now))
+        redis.call('SET', KEYS[2], slot + delay, 'EX', 3600)
+    end
+    redis.call('SET', KEYS[1], delay, 'EX', 86400)
+    return tostring(delay)
+    """
+
+    def __init__(self, client, prefix: str = "rate", **kwargs):
+        super().__init__(clock=time.time, **kwargs)
+        self.client = client
+        self.prefix = prefix
+        self._reserve = client.register_script(self.RESERVE_SCRIPT)
+        self._adjust = client.register_script(self.ADJUST_SCRIPT)
+
+    def _keys(self, domain: str):
+        return [f"{self.prefix}:{domain}:delay", f"{self.prefix}:{domain}:next"]
+
+    def delay(self, domain: str) -> float:
+        value = self.client.get(self._keys(domain)[0])
+        return float(value) if value is not None else self.initial_delay
+
+    def reserve(self, domain: str) -> float:
+        factor = random.uniform(1 - self.jitter, 1 + self.jitter)
+        return float(self._reserve(keys=self._keys(domain), args=[self.clock(), self.initial_delay, factor]))
+
+    def _adjust_delay(self, domain: str, outcome: str) -> float:
+        return float(self._adjust(keys=self._keys(domain), args=[
+            self.initial_delay, outcome, self.min_delay, self.decrease_step,
+            self.max_delay, self.backoff_factor, self.clock(),
+        ]))
+
+    def on_success(self, domain: str):
+        self._adjust_delay(domain, "success")
+
+    def on_failure(self, domain: str):
+        delay = self._adjust_delay(domain, "failure")
+        logger.warning(f"Backing off {domain}: delay is now {delay:.1f}s")
+
+
+_controller: Optional[DomainRateController] = None
+_controller_lock = threading.Lock()
+
+
+def get_rate_controller() -> DomainRateController:
+    """Process-wide controller shared by every AmazonParser instance."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            if settings.RATE_LIMIT_BACKEND == "redis":
+                _controller = RedisRateController(redis.Redis.from_url(settings.REDIS_URL))
+            else:
+                _controller = DomainRateController()
+        return _controller
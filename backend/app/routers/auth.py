@@ -1,14 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.security import OAuth2PasswordRequestForm
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from  ..db import get_db
-from ..crud import create_user
-from ..services import hash_password, verify_password, create_access_token, get_current_user
-from ..crud import get_user_by_email
+from  ..db import get_async_db
+from ..crud import create_user_async, update_user_password_async
+from ..services import hash_password_async, verify_and_update_password_async, create_access_token, get_current_user
+from ..crud import get_user_by_email_async
 from .. import schemas
-from ..services import create_reset_token, reset_password
+from ..services import create_reset_token, reset_password_async
 from datetime import timedelta
 
 from app.config import settings
@@ -23,29 +23,34 @@ router = APIRouter(
 )
 
 @router.post("/register")
-async def register_user(email: str, password: str, db: Session = Depends(get_db)):
-    user_exists = get_user_by_email(db, email)
+async def register_user(email: str, password: str, db: AsyncSession = Depends(get_async_db)):
+    user_exists = await get_user_by_email_async(db, email)
     if user_exists:
         raise HTTPException(status_code=400, detail="User already exists")
 
-    hashed_password = hash_password(password)
-    user = create_user(db, email, hashed_password)
+    hashed_password = await hash_password_async(password)
+    user = await create_user_async(db, email, hashed_password)
 
     return user
 
 @router.post("/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)) -> schemas.Token:
-    user = get_user_by_email(db, form_data.username)
-    
-    if not user or not verify_password(form_data.password, user.password_hash):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)) -> schemas.Token:
+    user = await get_user_by_email_async(db, form_data.username)
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await verify_and_update_password_async(form_data.password, user.password_hash)
+
+    if not verified:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+    if new_hash:
+        await update_user_password_async(db, user, new_hash)
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(data={"sub": user.email}, expires_delta=access_token_expires)
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires)
 
     return schemas.Token(access_token=access_token, token_type="bearer")
 
@@ -54,8 +59,8 @@ async def read_users_me(current_user: schemas.User = Depends(get_current_user)):
     return current_user
 
 @router.post("/request_reset")
-async def request_password_reset(email: str, db: Session = Depends(get_db)):
-    user = get_user_by_email(db, email)
+async def request_password_reset(email: str, db: AsyncSession = Depends(get_async_db)):
+    user = await get_user_by_email_async(db, email)
     if not user:
         return {"msg": "If the email exists, a reset token will be sent"}
     
@@ -63,5 +68,5 @@ async def request_password_reset(email: str, db: Session = Depends(get_db)):
     return {"reset_token": token}
 
 @router.post("/reset_password")
-async def reset_password_endpoint(token: str = Query(...), new_password: str = Query(...), db: Session = Depends(get_db)):
-    return reset_password(db, token, new_password)
\ No newline at end of file
+async def reset_password_endpoint(token: str = Query(...), new_password: str = Query(...), db: AsyncSession = Depends(get_async_db)):
+    return await reset_password_async(db, token, new_password)
\ No newline at end of file
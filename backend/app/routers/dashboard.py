@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Optional, Union
+from datetime import datetime
 from decimal import Decimal
 
-from ..db import get_db
+from ..db import get_async_db, get_async_read_db, get_async_read_sessionmaker
 
 from ..services import get_current_user
+from ..services.alerts import create_alert_rule_async
+from ..services.export import ExportParams, export_response
 from .. import models, schemas, crud
 from app.core.celery_app import celery_app
+from app.core.pagination import as_utc_naive, decode_cursor, encode_cursor, parse_cursor_time, set_next_cursor
+from app.core.price_storage import price_history_table
 from app.tasks.update_prices import update_product_price
 
 router = APIRouter(
@@ -18,26 +25,23 @@ router = APIRouter(
 
 @router.get("/products", response_model=List[schemas.Product])
 async def get_dashboard_products(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    user_products = db.query(models.UserProducts).filter(
-        models.UserProducts.user_id == current_user.id
-    ).all()
-    
-    products = [up.product for up in user_products]
-    return products
+    return await crud.get_dashboard_products_async(db, current_user.id)
 
 @router.post("/products", response_model=schemas.Product)
 async def add_product_to_dashboard(
     product_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    existing = db.query(models.UserProducts).filter(
-        models.UserProducts.user_id == current_user.id,
-        models.UserProducts.product_id == product_id
-    ).first()
+    existing = await db.scalar(
+        select(models.UserProducts).where(
+            models.UserProducts.user_id == current_user.id,
+            models.UserProducts.product_id == product_id
+        )
+    )
     
     if existing:
         raise HTTPException(
@@ -56,77 +60,117 @@ async def add_product_to_dashboard(
         pass
     
     db.add(user_product)
-    db.commit()
-    db.refresh(user_product)
+    await db.commit()
 
-    return user_product.product
+    return await crud.get_product_with_prices_async(db, product_id)
 
 @router.delete("/products/{product_id}", status_code=204)
 async def remove_product_from_dashboard(
     product_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    exists = db.query(models.UserProducts).filter(
-        models.UserProducts.user_id == current_user.id,
-        models.UserProducts.product_id == product_id
-    ).first()
+    exists = await db.scalar(
+        select(models.UserProducts).where(
+            models.UserProducts.user_id == current_user.id,
+            models.UserProducts.product_id == product_id
+        )
+    )
     
     if not exists:
         raise HTTPException(
             status_code=400,
             detail="Product doesn't exist in dashboard"
         )
-    db.delete(exists)
-    db.commit()
+    await db.delete(exists)
+    await db.commit()
     
     return "Item removed from dashboard"
 
 @router.get("/compare", response_model=List[schemas.ProductWithPrices])
 async def compare_products(
     product_id: List[int] = Query(..., description="List of product IDs to compare"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    user_products = (
-        db.query(models.UserProducts)
-        .filter(
-            models.UserProducts.user_id == current_user.id,
-            models.UserProducts.product_id.in_(product_id)
-        )
-        .all()
-    )
+    products = await crud.get_dashboard_products_async(db, current_user.id, product_ids=product_id)
 
-    if not user_products:
+    if not products:
         raise HTTPException(status_code=404, detail="Products not found")
-    
-    products = [up.product for up in user_products]
 
     return products
 
-@router.get("/products/{product_id}/history", response_model=List[schemas.Price])
+@router.get("/products/{product_id}/history", response_model=Union[List[schemas.Price], List[schemas.PriceBucket]])
 async def get_product_price_history(
     product_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    start: Optional[datetime] = Query(None, alias="from", description="Inclusive lower bound on created_at"),
+    end: Optional[datetime] = Query(None, alias="to", description="Exclusive upper bound on created_at"),
+    resolution: Optional[str] = Query(None, description="hour, day or week", pattern="^(hour|day|week)$"),
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: Optional[str] = Query(None, description="Value of the previous page's X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    product = db.query(models.Product).filter(models.Product.id == product_id).first()
-    
+    product = await db.get(models.Product, product_id)
+
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    
-    return product.prices
+
+    dialect = db.get_bind().dialect.name
+    history = price_history_table(dialect)
+    start, end = as_utc_naive(start), as_utc_naive(end)
+
+    if resolution is None:
+        after = None
+        if cursor:
+            created_at, price_id = decode_cursor(cursor, 2)
+            if not isinstance(price_id, int):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            after = (parse_cursor_time(created_at), price_id)
+        rows = (await db.execute(crud.price_history_query(history, product_id, limit, start, end, after))).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            set_next_cursor(response, encode_cursor(rows[-1].created_at, rows[-1].id))
+        return rows
+
+    before_bucket = None
+    if cursor:
+        (before_bucket,) = decode_cursor(cursor, 1)
+        if dialect == "postgresql":
+            before_bucket = parse_cursor_time(before_bucket)
+    buckets = (await db.execute(
+        crud.price_buckets_query(history, dialect, product_id, resolution, limit, start, end, before_bucket)
+    )).all()
+    if len(buckets) > limit:
+        buckets = buckets[:limit]
+        set_next_cursor(response, encode_cursor(buckets[-1].bucket))
+    return buckets
+
+@router.get("/export")
+async def export_dashboard(
+    params: ExportParams = Depends(),
+    sessions=Depends(get_async_read_sessionmaker),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Stream the user's tracked products or their price rows as NDJSON or CSV."""
+    def build(dialect: str):
+        if params.data == "products":
+            return crud.product_export_query(params.since, user_id=current_user.id)
+        return crud.price_export_query(price_history_table(dialect), params.since, user_id=current_user.id)
+
+    return export_response(sessions, build, params)
 
 @router.get("/filter", response_model=List[schemas.Product])
-def get_filtered_products(
+async def get_filtered_products(
     title: Optional[str] = None,
     min_price: Optional[Decimal] = None,
     max_price: Optional[Decimal] = None,
     sort_by_price: Optional[str] = Query(None, description="asc or desc", regex="^(asc|desc)$"),
     only_favorites: bool = False,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    products = crud.search_dashboard_products(
+    products = await crud.search_dashboard_products_async(
         db=db,
         user_id=current_user.id,
         title=title,
@@ -141,23 +185,94 @@ def get_filtered_products(
 async def toggle_favorite(
     product_id: int,
     favorite: bool,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    user_product = (
-        db.query(models.UserProducts)
-        .filter(
+    user_product = await db.scalar(
+        select(models.UserProducts)
+        .options(joinedload(models.UserProducts.product).selectinload(models.Product.prices))
+        .where(
             models.UserProducts.user_id == current_user.id,
             models.UserProducts.product_id == product_id
         )
-        .first()
     )
 
     if not user_product:
         raise HTTPException(status_code=404, detail="Product not in dashboard")
 
     user_product.favorite = favorite
-    db.commit()
-    db.refresh(user_product)
+    await db.commit()
 
     return user_product.product
+
+@router.get("/alerts", response_model=List[schemas.AlertRule])
+async def list_alert_rules(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    rules = await db.scalars(
+        select(models.AlertRule).where(models.AlertRule.user_id == current_user.id).order_by(models.AlertRule.id)
+    )
+    return rules.all()
+
+@router.post("/products/{product_id}/alerts", response_model=schemas.AlertRule, status_code=201)
+async def create_alert_rule(
+    product_id: int,
+    rule: schemas.AlertRuleCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    user_product = await db.scalar(
+        select(models.UserProducts).where(
+            models.UserProducts.user_id == current_user.id,
+            models.UserProducts.product_id == product_id
+        )
+    )
+
+    if not user_product:
+        raise HTTPException(status_code=404, detail="Product not in dashboard")
+
+    created = await create_alert_rule_async(db, user_product, rule.kind, rule.threshold)
+    await db.commit()
+
+    return created
+
+@router.delete("/alerts/{rule_id}", status_code=204)
+async def delete_alert_rule(
+    rule_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    rule = await db.get(models.AlertRule, rule_id)
+
+    if not rule or rule.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Alert rule not found")
+
+    await db.delete(rule)
+    await db.commit()
+
+@router.get("/alerts/events", response_model=List[schemas.AlertEvent])
+async def list_alert_events(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Value of the previous page's X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Fired alerts, newest first."""
+    query = (
+        select(models.AlertEvent)
+        .where(models.AlertEvent.user_id == current_user.id)
+        .order_by(models.AlertEvent.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        (before_id,) = decode_cursor(cursor, 1)
+        if not isinstance(before_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(models.AlertEvent.id < before_id)
+    events = (await db.scalars(query)).all()
+    if len(events) > limit:
+        events = events[:limit]
+        set_next_cursor(response, encode_cursor(events[-1].id))
+    return events
@@ -2,13 +2,20 @@ import logging
 from typing import List, Optional
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
-from sqlalchemy.orm import Session
+from celery.result import AsyncResult
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import models, schemas, crud
-from ..db import get_db, SessionLocal
-from ..parsers import AmazonParser
-from ..services import save_products
+from ..db import get_async_read_db, get_async_read_sessionmaker
+from ..core.celery_app import celery_app
+from ..core.fulltext import search_terms
+from ..core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from ..core.price_storage import price_history_table
+from ..services.export import ExportParams, export_response
+from ..services.response_cache import CachedResponse, cache_key, get_response_cache
+from ..services.search_jobs import get_search_jobs, normalize_query, search_fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -17,56 +24,208 @@ router = APIRouter(
     tags=["Products"]
 )
 
-async def run_parsing_and_save(query: str, pages: int):
-    logger.info(f"Background task started for query: '{query}'")
-    db: Session = SessionLocal()
-    try:
-        async with AmazonParser(search_query=query, max_pages=pages) as parser:
-            results = await parser.run()
-        if results:
-            save_products(db, results)
-            logger.info(f"Background task finished. Saved {len(results)} results for query: '{query}'.")
-        else:
-            logger.warning(f"No results found in background for query: '{query}'")
-    except Exception as e:
-        logger.error(f"Error in background task for query '{query}': {e}", exc_info=True)
-    finally:
-        db.close()
-        logger.info(f"Database session closed for background task query: '{query}'")
-
-@router.get("/all", response_model=List[schemas.Product])
-def get_all_products(db: Session = Depends(get_db)):
-    products = db.query(models.Product).all()
-    return products
-
-@router.post("/search", status_code=202)
-async def start_products_search(
+PRODUCT_LIST = TypeAdapter(List[schemas.ProductListItem])
+
+SEARCH_STATES = {
+    "PENDING": "queued",
+    "RECEIVED": "queued",
+    "RETRY": "queued",
+    "STARTED": "running",
+    "SUCCESS": "done",
+    "FAILURE": "failed",
+}
+
+
+class ProductPage:
+    """Pagination and projection parameters shared by the product list endpoints."""
+
+    def __init__(
+        self,
+        limit: int = Query(100, ge=1, le=500),
+        cursor: Optional[str] = Query(None, description="Value of the previous page's X-Next-Cursor header"),
+        fields: Optional[str] = Query(None, description="Comma-separated subset of id,title,url,image_url"),
+        include_prices: str = Query("all", pattern="^(all|latest|none)$"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.include_prices = include_prices
+        self.fields = None
+        if fields:
+            self.fields = [f.strip() for f in fields.split(",") if f.strip()]
+            unknown = set(self.fields) - set(crud.PRODUCT_FIELDS)
+            if unknown:
+                raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    def after(self, order: str = "id") -> Optional[list]:
+        if not self.cursor:
+            return None
+        values = decode_cursor(self.cursor, 1 if order == "id" else 2)
+        try:
+            values[-1] = int(values[-1])
+            if order == "price":
+                Decimal(values[0])
+            elif order == "rank":
+                values[0] = float(values[0])
+        except (TypeError, ValueError, ArithmeticError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return values
+
+    def cursor_order(self) -> Optional[str]:
+        """Order ("rank" or "id") a title search's cursor was issued in, by its number of values."""
+        if not self.cursor:
+            return None
+        return "rank" if len(decode_cursor(self.cursor)) == 2 else "id"
+
+    def item(self, product: models.Product) -> schemas.ProductListItem:
+        data = {f: getattr(product, f) for f in self.fields or crud.PRODUCT_FIELDS}
+        if self.include_prices == "all":
+            data["prices"] = product.prices
+        elif self.include_prices == "latest":
+            latest = product.latest_price
+            data["prices"] = [schemas.Price(
+                id=latest.price_id, site=latest.site, price=latest.price, created_at=latest.created_at
+            )] if latest is not None else []
+        return schemas.ProductListItem(**data)
+
+    def cache_params(self) -> dict:
+        return {
+            "limit": self.limit,
+            "cursor": self.cursor,
+            "fields": sorted(set(self.fields)) if self.fields else None,
+            "include_prices": self.include_prices,
+        }
+
+    def respond(self, products: List[models.Product], order: str = "id") -> CachedResponse:
+        headers = {}
+        if len(products) > self.limit:
+            products = products[:self.limit]
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(*crud.page_cursor(products[-1], order))
+        body = PRODUCT_LIST.dump_json([self.item(p) for p in products], exclude_unset=True)
+        return CachedResponse(body, headers)
+
+
+async def cached_page(request: Request, namespace: str, params: dict, load) -> Response:
+    """Serve a product page from the response cache, or build it with ``load()`` and cache it.
+
+    Answers 304 when If-None-Match carries the page's current ETag.
+    """
+    cache = get_response_cache()
+    key = cache_key(namespace, params)
+    generation = await cache.generation() if cache is not None else None
+    page = await cache.get(key, generation) if generation is not None else None
+    if page is None:
+        page = await load()
+        if generation is not None:
+            await cache.set(key, generation, page)
+    return page.to_response(request.headers.get("if-none-match"))
+
+
+def normalized_decimal(value: Optional[Decimal]) -> Optional[str]:
+    return str(value.normalize()) if value is not None else None
+
+@router.get("/all", response_model=List[schemas.ProductListItem], response_model_exclude_unset=True)
+async def get_all_products(
+    request: Request,
+    page: ProductPage = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    async def load():
+        products = await crud.get_all_products_async(
+            db,
+            include_prices=page.include_prices,
+            fields=page.fields,
+            after=page.after(),
+            limit=page.limit + 1,
+        )
+        return page.respond(products)
+
+    return await cached_page(request, "all", page.cache_params(), load)
+
+@router.post("/search", status_code=202, response_model=schemas.SearchJob, response_model_exclude_none=True)
+def start_products_search(
     query: str,
-    background_tasks: BackgroundTasks,
     pages: int = Query(3, ge=1, le=10),
 ):
-    logger.info(f"Adding search task for query: '{query}' to background.")
-    background_tasks.add_task(run_parsing_and_save, query, pages)
-    return {"status": "accepted", "message": "Parsing task started in the background."}
+    """Queue a scrape job; identical searches (case and spacing ignored) share one job."""
+    fingerprint = search_fingerprint(query, pages)
+    jobs = get_search_jobs()
+    try:
+        job_id, created = jobs.claim(fingerprint)
+        if created:
+            try:
+                celery_app.send_task("app.tasks.search.run_search", args=[normalize_query(query), pages, fingerprint], task_id=job_id)
+            except Exception:
+                jobs.forget(fingerprint)
+                raise
+        job = schemas.SearchJob(job_id=job_id, status="queued") if created else get_search_job(job_id)
+    except Exception as e:
+        logger.error(f"Failed to queue search for query '{query}': {e}")
+        raise HTTPException(status_code=503, detail="Search queue unavailable")
 
+    logger.info(f"Search for '{query}' ({pages} pages) is job {job_id}{'' if created else ' (deduplicated)'}")
+    job.deduplicated = not created
+    return job
 
-@router.get("/filter", response_model=List[schemas.Product])
-def get_filtered_products(
+
+@router.get("/search/{job_id}", response_model=schemas.SearchJob, response_model_exclude_none=True)
+def get_search_job(job_id: str):
+    result = AsyncResult(job_id, app=celery_app)
+    state = result.state
+    return schemas.SearchJob(
+        job_id=job_id,
+        status=SEARCH_STATES.get(state, state.lower()),
+        result=result.result if state == "SUCCESS" else None,
+        error=str(result.result) if state == "FAILURE" else None,
+    )
+
+
+@router.get("/filter", response_model=List[schemas.ProductListItem], response_model_exclude_unset=True)
+async def get_filtered_products(
+    request: Request,
     title: Optional[str] = None,
     min_price: Optional[Decimal] = None,
     max_price: Optional[Decimal] = None,
     sort_by_price: Optional[str] = Query(None, description="asc or desc", regex="^(asc|desc)$"),
-    db: Session = Depends(get_db)
+    page: ProductPage = Depends(),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    products = crud.search_products(
-        db=db,
-        title=title,
-        min_price=min_price,
-        max_price=max_price,
-        sort_by_price=sort_by_price
-    )
-    return products
+    async def load():
+        order = crud.search_order(sort_by_price, title)
+        if order == "rank":
+            # later pages keep the order their first page was served in
+            order = page.cursor_order() or await crud.resolve_search_order_async(db, sort_by_price, title)
+        products = await crud.search_products_async(
+            db=db,
+            title=title,
+            min_price=min_price,
+            max_price=max_price,
+            sort_by_price=sort_by_price,
+            include_prices=page.include_prices,
+            fields=page.fields,
+            after=page.after(order),
+            limit=page.limit + 1,
+            order=order,
+        )
+        return page.respond(products, order)
+
+    params = {
+        **page.cache_params(),
+        "title": (title and search_terms(title)) or title,
+        "min_price": normalized_decimal(min_price),
+        "max_price": normalized_decimal(max_price),
+        "sort_by_price": sort_by_price,
+    }
+    return await cached_page(request, "filter", params, load)
+
+@router.get("/export")
+async def export_products(params: ExportParams = Depends(), sessions=Depends(get_async_read_sessionmaker)):
+    """Stream every product (``data=products``) or price row (``data=prices``) as NDJSON or CSV."""
+    def build(dialect: str):
+        if params.data == "products":
+            return crud.product_export_query(params.since)
+        return crud.price_export_query(price_history_table(dialect), params.since)
 
+    return export_response(sessions, build, params)
 
 # @router.get("/{product_id}/prices", response_model=List[schemas.Price])
 # def get_product_prices_history(product_id: int, db: Session = Depends(get_db)):
@@ -1,5 +1,6 @@
-from .product import Product, Price, ProductWithPrices
+from .product import Product, Price, PriceBucket, ProductWithPrices, ProductListItem, SearchJob
 from .auth import  UserResponse, Token
 from .user import User
+from .alert import AlertRuleCreate, AlertRule, AlertEvent
 
-__all__ = ["Product", "Price", "ProductWithPrices", "UserResponse", "Token", "User"]
\ No newline at end of file
+__all__ = ["Product", "Price", "PriceBucket", "ProductWithPrices", "ProductListItem", "SearchJob", "UserResponse", "Token", "User", "AlertRuleCreate", "AlertRule", "AlertEvent"]
\ No newline at end of file
@@ -0,0 +1,42 @@
+from pydantic import BaseModel, ConfigDict, condecimal, model_validator
+from datetime import datetime
+from decimal import Decimal
+from typing import Literal, Optional
+
+class AlertRuleCreate(BaseModel):
+    kind: Literal["target", "drop_pct", "all_time_low"]
+    threshold: Optional[condecimal(gt=0, max_digits=10, decimal_places=2)] = None  # price for target, percent for drop_pct
+
+    @model_validator(mode="after")
+    def check_threshold(self):
+        if self.kind == "all_time_low":
+            if self.threshold is not None:
+                raise ValueError("all_time_low takes no threshold")
+        elif self.threshold is None:
+            raise ValueError(f"{self.kind} needs a threshold")
+        elif self.kind == "drop_pct" and self.threshold >= 100:
+            raise ValueError("drop_pct threshold must be below 100")
+        return self
+
+class AlertRule(BaseModel):
+    id: int
+    product_id: int
+    kind: str
+    threshold: Optional[Decimal] = None
+    reference_price: Optional[Decimal] = None
+    triggered: bool
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class AlertEvent(BaseModel):
+    id: int
+    rule_id: Optional[int] = None
+    product_id: int
+    kind: str
+    price: Decimal
+    previous_price: Optional[Decimal] = None
+    created_at: datetime
+    sent_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
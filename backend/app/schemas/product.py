@@ -1,5 +1,6 @@
 from pydantic import BaseModel, HttpUrl, ConfigDict, condecimal, EmailStr
 from datetime import datetime
+from decimal import Decimal
 from typing import List, Optional
 
 class PriceBase(BaseModel):
@@ -12,9 +13,30 @@ class PriceCreate(PriceBase):
 class Price(PriceBase):
     id: int
     created_at: datetime
+    last_seen_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
 
+class PriceBucket(BaseModel):
+    bucket: datetime
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    avg: Decimal
+    count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+
+class SearchJob(BaseModel):
+    job_id: str
+    status: str  # queued, running, done or failed
+    deduplicated: Optional[bool] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
 
 
 class ProductBase(BaseModel):
@@ -34,6 +56,16 @@ class Product(ProductBase):
 class ProductWithPrices(Product):
     pass
 
+class ProductListItem(BaseModel):
+    """Projection of Product for list endpoints; only the requested fields are set."""
+    id: Optional[int] = None
+    title: Optional[str] = None
+    url: Optional[HttpUrl] = None
+    image_url: Optional[HttpUrl] = None
+    prices: Optional[List[Price]] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
 
 
 class UserBase(BaseModel):
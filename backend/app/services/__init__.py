@@ -1,4 +1,4 @@
 from .save_to_db import save_products
-from .auth_service import hash_password, verify_password, create_access_token, get_current_user, create_reset_token, reset_password
+from .auth_service import hash_password, verify_password, create_access_token, get_current_user, create_reset_token, reset_password, reset_password_async, hash_password_async, verify_and_update_password_async
 
-__all__ = ['save_products', 'hash_password', 'verify_password', 'create_access_token', 'get_current_user', 'create_reset_token', 'reset_password']
\ No newline at end of file
+__all__ = ['save_products', 'hash_password', 'verify_password', 'create_access_token', 'get_current_user', 'create_reset_token', 'reset_password', 'reset_password_async', 'hash_password_async', 'verify_and_update_password_async']
\ No newline at end of file
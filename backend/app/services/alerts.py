@@ -0,0 +1,193 @@
+"""Price-drop alerts: rules per tracked product, checked as prices are written.
+
+``evaluate_alerts`` runs inside ``record_prices``, so it only looks at the rules
+of the products in the batch (one indexed lookup per chunk of product ids) and
+writes fired alerts to the ``alert_events`` outbox in the same transaction.
+``drain_alert_outbox`` hands unsent events to a sender in batches and marks
+them sent.
+
+Rules fire when the price crosses their level: a "target" or "drop_pct" rule
+fires once when the price falls to or below it and re-arms when the price goes
+back above; "all_time_low" fires on every price below the lowest one seen.
+"""
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from typing import Callable, Optional
+
+import httpx
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.price_storage import price_history_table
+from app.models.product import AlertEvent, AlertRule, LatestPrice, Product, User, UserProducts, utc_now
+
+logger = logging.getLogger(__name__)
+
+IN_CHUNK_SIZE = 500
+
+
+def _level(rule: dict) -> Optional[Decimal]:
+    if rule["kind"] == "target":
+        return rule["threshold"]
+    if rule["reference_price"] is None:
+        return None
+    return rule["reference_price"] * (100 - rule["threshold"]) / 100
+
+
+def _check(rule: dict, price: Decimal) -> bool:
+    """Apply one new price to the rule's state; True if the rule fires."""
+    if rule["kind"] == "all_time_low":
+        if rule["reference_price"] is None or price < rule["reference_price"]:
+            fired = rule["reference_price"] is not None
+            rule["reference_price"] = price
+            return fired
+        return False
+    if rule["kind"] == "drop_pct" and rule["reference_price"] is None:
+        rule["reference_price"] = price
+        return False
+    if price > _level(rule):
+        rule["triggered"] = False
+        return False
+    if rule["triggered"]:
+        return False
+    rule["triggered"] = True
+    return True
+
+
+def evaluate_alerts(session: Session, price_rows: list[dict]) -> int:
+    """Check the alert rules of the products in price_rows; call before latest_prices is updated.
+
+    Returns the number of events written to the outbox. The caller owns the transaction.
+    """
+    by_product = {}
+    for row in sorted(price_rows, key=lambda row: row["created_at"]):
+        if row["price"] is not None:
+            by_product.setdefault(row["product_id"], []).append(row["price"])
+    product_ids = list(by_product)
+
+    events, changed = [], []
+    for i in range(0, len(product_ids), IN_CHUNK_SIZE):
+        query = (
+            select(
+                AlertRule.id, AlertRule.user_id, AlertRule.product_id, AlertRule.kind, AlertRule.threshold,
+                AlertRule.reference_price, AlertRule.triggered, LatestPrice.price.label("previous"),
+            )
+            .outerjoin(LatestPrice, LatestPrice.product_id == AlertRule.product_id)
+            .where(AlertRule.product_id.in_(product_ids[i:i + IN_CHUNK_SIZE]))
+            .order_by(AlertRule.id)
+        )
+        for row in session.execute(query):
+            rule = row._asdict()
+            state = (rule["reference_price"], rule["triggered"])
+            previous = rule.pop("previous")
+            for price in by_product[rule["product_id"]]:
+                if _check(rule, price):
+                    events.append({
+                        "rule_id": rule["id"],
+                        "user_id": rule["user_id"],
+                        "product_id": rule["product_id"],
+                        "kind": rule["kind"],
+                        "price": price,
+                        "previous_price": previous,
+                        "created_at": utc_now(),
+                    })
+                previous = price
+            if (rule["reference_price"], rule["triggered"]) != state:
+                changed.append({"id": rule["id"], "reference_price": rule["reference_price"], "triggered": rule["triggered"]})
+
+    if changed:
+        session.execute(update(AlertRule), changed)
+    if events:
+        session.execute(insert(AlertEvent), events)
+        logger.info(f"Queued {len(events)} price alerts")
+    return len(events)
+
+
+async def create_alert_rule_async(
+    db: AsyncSession, user_product: UserProducts, kind: str, threshold: Optional[Decimal]
+) -> AlertRule:
+    """Add a rule to a tracked product, seeded from its current price (and history for all_time_low)."""
+    current = await db.scalar(select(LatestPrice.price).where(LatestPrice.product_id == user_product.product_id))
+    state = {"kind": kind, "threshold": threshold, "reference_price": None, "triggered": False}
+    if kind == "drop_pct":
+        state["reference_price"] = current
+    elif kind == "all_time_low":
+        history = price_history_table(db.get_bind().dialect.name)
+        state["reference_price"] = await db.scalar(
+            select(func.min(history.c.price)).where(history.c.product_id == user_product.product_id)
+        )
+    if current is not None and kind != "all_time_low":
+        level = _level(state)
+        state["triggered"] = level is not None and current <= level  # already below: wait for the next crossing
+    rule = AlertRule(
+        user_product_id=user_product.id, user_id=user_product.user_id, product_id=user_product.product_id, **state
+    )
+    db.add(rule)
+    return rule
+
+
+def _payload(event: AlertEvent, email: str, title: str, url: str) -> dict:
+    return {
+        "id": event.id,
+        "user_id": event.user_id,
+        "email": email,
+        "product_id": event.product_id,
+        "title": title,
+        "url": url,
+        "kind": event.kind,
+        "price": str(event.price),
+        "previous_price": str(event.previous_price) if event.previous_price is not None else None,
+        "created_at": event.created_at.isoformat(),
+    }
+
+
+def send_alerts(alerts: list[dict]):
+    """POST a batch to ALERT_WEBHOOK_URL, or log it when no webhook is configured."""
+    if not settings.ALERT_WEBHOOK_URL:
+        for alert in alerts:
+            logger.info(f"Price alert for {alert['email']}: {alert['title']} is {alert['price']} ({alert['kind']})")
+        return
+    response = httpx.post(settings.ALERT_WEBHOOK_URL, json={"alerts": alerts}, timeout=settings.ALERT_WEBHOOK_TIMEOUT)
+    response.raise_for_status()
+
+
+def drain_alert_outbox(session: Session, send: Callable[[list[dict]], None] = send_alerts, batch_size: int = 100) -> int:
+    """Send unsent events oldest first, committing sent_at after each batch.
+
+    A failed send rolls the batch back and raises; its events go out on the next run.
+    """
+    sent = 0
+    while True:
+        rows = session.execute(
+            select(AlertEvent, User.email, Product.title, Product.url)
+            .join(User, User.id == AlertEvent.user_id)
+            .join(Product, Product.id == AlertEvent.product_id)
+            .where(AlertEvent.sent_at.is_(None))
+            .order_by(AlertEvent.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True, of=AlertEvent)
+        ).all()
+        if not rows:
+            return sent
+        try:
+            send([_payload(*row) for row in rows])
+        except Exception:
+            session.rollback()
+            raise
+        session.execute(
+            update(AlertEvent).where(AlertEvent.id.in_([row[0].id for row in rows])).values(sent_at=utc_now())
+        )
+        session.commit()
+        sent += len(rows)
+
+
+def prune_alert_events(session: Session, days: int) -> int:
+    """Delete sent events older than ``days``."""
+    result = session.execute(
+        delete(AlertEvent).where(AlertEvent.sent_at < utc_now() - timedelta(days=days))
+    )
+    session.commit()
+    return result.rowcount
@@ -1,3 +1,6 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 import jwt
@@ -5,20 +8,22 @@ from jwt.exceptions import InvalidTokenError
 
 from app.config import settings
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
-from ..crud import get_user_by_email, update_user_password
+from ..crud import get_user_by_email, update_user_password, get_user_by_email_async, get_user_by_id_async, update_user_password_async
 from .. import schemas
-from  ..db import get_db
+from  ..db import get_async_read_db
+from ..core.auth_cache import auth_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
 SECRET_KEY = settings.SECRET_KEY    
 ALGORITHM = settings.ALGORITHM
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -26,6 +31,45 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed_password: str) -> bool:
     return pwd_context.verify(password, hashed_password)
 
+
+class PasswordHasher:
+    """Runs bcrypt on a small thread pool so hashing never blocks the event loop.
+
+    bcrypt releases the GIL while it works. At most ``max_pending`` calls may be
+    queued or running; callers beyond that get a 503 instead of piling up.
+    """
+
+    def __init__(self, workers: int = settings.PASSWORD_HASH_WORKERS, max_pending: int = settings.PASSWORD_HASH_MAX_PENDING):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many authentication requests, try again shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+password_hasher = PasswordHasher()
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run(hash_password, password)
+
+async def verify_and_update_password_async(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify off the event loop; the second value is a new hash when the stored one uses outdated settings."""
+    return await password_hasher.run(pwd_context.verify_and_update, password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + expires_delta
@@ -58,7 +102,18 @@ def reset_password(db: Session, token: str, new_password: str):
     update_user_password(db, user, hashed_password)
     return {"msg": "Password updated successfully"}
 
-async def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+async def reset_password_async(db: AsyncSession, token: str, new_password: str):
+    email = verify_reset_token(token)
+    hashed_password = await hash_password_async(new_password)
+    user = await get_user_by_email_async(db, email)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    await update_user_password_async(db, user, hashed_password)
+    return {"msg": "Password updated successfully"}
+
+async def get_current_user(db: AsyncSession = Depends(get_async_read_db), token: str = Depends(oauth2_scheme)) -> schemas.UserResponse:
+    """Token owner as a detached UserResponse. Cached per subject for AUTH_CACHE_TTL seconds; the session
+    only opens a connection on a cache miss. Tokens carry ``uid`` so misses look the user up by primary key."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -71,8 +126,16 @@ async def get_current_user(db: Session = Depends(get_db), token: str = Depends(o
             raise credentials_exception
     except InvalidTokenError:
         raise credentials_exception
-    user = get_user_by_email(db, email)
-    if not user:
+    user = auth_cache.get(email)
+    if user is not None:
+        return user
+    user_id = payload.get("uid")
+    if user_id is not None:
+        user = await get_user_by_id_async(db, user_id)
+    else:
+        user = await get_user_by_email_async(db, email)
+    if not user or user.email != email:
         raise credentials_exception
+    user = schemas.UserResponse.model_validate(user)
+    auth_cache.set(email, user)
     return user
-
@@ -0,0 +1,73 @@
+"""Streaming NDJSON / CSV exports.
+
+The body is produced after the endpoint has returned, so the generator opens
+its own read session instead of borrowing the request's, and walks the result
+on a server-side cursor in EXPORT_BATCH_SIZE-row partitions: memory stays flat
+however many rows are exported.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Optional
+
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.config import settings
+from app.core.pagination import as_utc_naive
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+class ExportParams:
+    def __init__(
+        self,
+        data: str = Query("prices", pattern="^(prices|products)$"),
+        fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+        since: Optional[datetime] = Query(None, description="Only rows created or changed at or after this time"),
+    ):
+        self.data = data
+        self.fmt = fmt
+        self.since = as_utc_naive(since)
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _ndjson(columns: list[str], rows) -> str:
+    return "".join(json.dumps({c: _value(v) for c, v in zip(columns, row)}) + "\n" for row in rows)
+
+
+def _csv(columns: list[str], rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows([_value(v) for v in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def stream_rows(session_factory, build: Callable[[str], Select], fmt: str):
+    """Yield the rows of ``build(dialect)`` encoded as ``fmt``, one chunk per partition."""
+    encode = _csv if fmt == "csv" else _ndjson
+    async with session_factory() as db:
+        query = build(db.get_bind().dialect.name)
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        columns = list(result.keys())
+        if fmt == "csv":
+            yield ",".join(columns) + "\n"
+        async for rows in result.partitions():
+            yield encode(columns, rows)
+
+
+def export_response(session_factory, build: Callable[[str], Select], params: ExportParams) -> StreamingResponse:
+    return StreamingResponse(
+        stream_rows(session_factory, build, params.fmt),
+        media_type=MEDIA_TYPES[params.fmt],
+        headers={"Content-Disposition": f'attachment; filename="{params.data}.{params.fmt}"'},
+    )
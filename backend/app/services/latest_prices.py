@@ -0,0 +1,95 @@
+import logging
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.product import Price, LatestPrice
+from app.services.response_cache import mark_products_changed
+
+logger = logging.getLogger(__name__)
+
+
+def upsert_latest_prices(session: Session, price_rows: list[dict]):
+    """Point latest_prices at the newest row per product from ``price_rows``.
+
+    Rows need ``id``, ``product_id``, ``site``, ``price`` and ``created_at``.
+    Older rows never overwrite a newer latest price.
+    """
+    latest = {}
+    for row in price_rows:
+        current = latest.get(row["product_id"])
+        if current is None or row["created_at"] >= current["created_at"]:
+            latest[row["product_id"]] = {
+                "product_id": row["product_id"],
+                "price_id": row["id"],
+                "site": row["site"],
+                "price": row["price"],
+                "created_at": row["created_at"],
+            }
+    if not latest:
+        return
+
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = dialect_insert(LatestPrice)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LatestPrice.product_id],
+            set_={
+                "price_id": stmt.excluded.price_id,
+                "site": stmt.excluded.site,
+                "price": stmt.excluded.price,
+                "created_at": stmt.excluded.created_at,
+            },
+            where=LatestPrice.created_at <= stmt.excluded.created_at,
+        )
+        session.execute(stmt, list(latest.values()))
+        return
+
+    for row in latest.values():
+        existing = session.get(LatestPrice, row["product_id"])
+        if existing is None or existing.created_at <= row["created_at"]:
+            session.merge(LatestPrice(**row))
+
+
+def refresh_latest_prices(session: Session) -> int:
+    """Rebuild latest_prices from the full price history."""
+    latest_dates = (
+        select(Price.product_id, func.max(Price.created_at).label("latest_date"))
+        .group_by(Price.product_id)
+        .subquery()
+    )
+    latest_ids = (
+        select(func.max(Price.id))
+        .select_from(Price)
+        .join(
+            latest_dates,
+            (Price.product_id == latest_dates.c.product_id) & (Price.created_at == latest_dates.c.latest_date),
+        )
+        .group_by(Price.product_id)
+    )
+
+    session.execute(delete(LatestPrice))
+    result = session.execute(
+        insert(LatestPrice).from_select(
+            ["product_id", "price_id", "site", "price", "created_at"],
+            select(Price.product_id, Price.id, Price.site, Price.price, Price.created_at)
+            .where(Price.id.in_(latest_ids)),
+        )
+    )
+    mark_products_changed(session)
+    session.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    from app.db import SessionLocal, init_db
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    init_db()
+    db = SessionLocal()
+    try:
+        count = refresh_latest_prices(db)
+        logger.info(f"Backfilled latest prices for {count} products")
+    finally:
+        db.close()
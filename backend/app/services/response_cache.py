@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+from fastapi import Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PRODUCTS_CHANGED = "products_changed"
+
+
+def cache_key(namespace: str, params: dict) -> str:
+    """Stable key for already-normalized query parameters."""
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+class CachedResponse:
+    """Serialized JSON body plus the headers to replay; the ETag is a hash of the body."""
+
+    def __init__(self, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.body = body
+        self.headers = headers or {}
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags
+
+    def to_response(self, if_none_match: Optional[str] = None) -> Response:
+        headers = {**self.headers, "ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+    def dumps(self) -> str:
+        return json.dumps({"body": self.body.decode(), "headers": self.headers})
+
+    @classmethod
+    def loads(cls, data) -> "CachedResponse":
+        value = json.loads(data)
+        return cls(value["body"].encode(), value["headers"])
+
+
+class ResponseCache:
+    """In-process LRU of serialized responses with a TTL.
+
+    Entries are stored under the generation that was current when their query
+    started; ``invalidate`` bumps the generation, so a page computed from data
+    older than the last ingest is never served again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.RESPONSE_CACHE_MAX_ENTRIES,
+        ttl: float = settings.RESPONSE_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._generation = 0
+        self._entries: "OrderedDict[str, tuple[float, CachedResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def generation(self) -> Optional[int]:
+        """Current generation, or None when the cache is unavailable."""
+        return self._generation
+
+    def _get_local(self, key: str, generation: int) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(f"{generation}:{key}")
+            if entry is None:
+                return None
+            expires, response = entry
+            if expires <= self.clock():
+                del self._entries[f"{generation}:{key}"]
+                return None
+            self._entries.move_to_end(f"{generation}:{key}")
+            return response
+
+    def _set_local(self, key: str, generation: int, response: CachedResponse):
+        with self._lock:
+            if generation < self._generation:
+                return
+            self._entries[f"{generation}:{key}"] = (self.clock() + self.ttl, response)
+            self._entries.move_to_end(f"{generation}:{key}")
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get(self, key: str, generation: int) -> Optional[CachedResponse]:
+        return self._get_local(key, generation)
+
+    async def set(self, key: str, generation: int, response: CachedResponse):
+        self._set_local(key, generation, response)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisResponseCache(ResponseCache):
+    """Local LRU in front of a Redis tier shared by every API worker.
+
+    The generation counter lives in Redis, so an ingest committed by a Celery
+    worker invalidates the pages cached by every API process.
+    """
+
+    def __init__(self, url: str = settings.REDIS_URL, prefix: str = "cache:products", **kwargs):
+        super().__init__(**kwargs)
+        self.client = redis.Redis.from_url(url)
+        self.async_client = aioredis.Redis.from_url(url)
+        self.prefix = prefix
+        self.generation_key = f"{prefix}:generation"
+
+    async def generation(self) -> Optional[int]:
+        try:
+            generation = int(await self.async_client.get(self.generation_key) or 0)
+        except redis.RedisError as e:
+            logger.warning(f"Response cache unavailable: {e}")
+            return None
+        if generation > self._generation:
+            with self._lock:
+                self._generation = generation
+                self._entries.clear()
+        return generation
+
+    async def get(self, key: str, generation: int) -> Optional[CachedResponse]:
+        response = self._get_local(key, generation)
+        if response is not None:
+            return response
+        try:
+            data = await self.async_client.get(f"{self.prefix}:{generation}:{key}")
+        except redis.RedisError as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+        if data is None:
+            return None
+        response = CachedResponse.loads(data)
+        self._set_local(key, generation, response)
+        return response
+
+    async def set(self, key: str, generation: int, response: CachedResponse):
+        self._set_local(key, generation, response)
+        try:
+            await self.async_client.set(f"{self.prefix}:{generation}:{key}", response.dumps(), ex=int(self.ttl))
+        except redis.RedisError as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def invalidate(self):
+        super().invalidate()
+        try:
+            self.client.incr(self.generation_key)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to invalidate the response cache: {e}")
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide product response cache; None when RESPONSE_CACHE_BACKEND is "off"."""
+    global _cache
+    if settings.RESPONSE_CACHE_BACKEND == "off":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            if settings.RESPONSE_CACHE_BACKEND == "redis":
+                _cache = RedisResponseCache()
+            else:
+                _cache = ResponseCache()
+        return _cache
+
+
+def mark_products_changed(session: Session):
+    """Invalidate cached product pages once ``session`` commits."""
+    session.info[PRODUCTS_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session):
+    if session.info.pop(PRODUCTS_CHANGED, False):
+        cache = get_response_cache()
+        if cache is not None:
+            cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session):
+    session.info.pop(PRODUCTS_CHANGED, None)
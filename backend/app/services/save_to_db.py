@@ -1,61 +1,165 @@
 import logging
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from decimal import Decimal
-from app.models.product import Product, Price
-import re
+from app.config import settings
+from app.core.pagination import as_utc_naive
+from app.core.price_storage import updatable_since
+from app.core.prices import ParsedPrice, parse_price_text, parse_prices
+from app.models.product import LatestPrice, Product, Price, utc_now
+from app.services.alerts import evaluate_alerts
+from app.services.latest_prices import upsert_latest_prices
+from app.services.response_cache import mark_products_changed
 
 logger = logging.getLogger(__name__)
 
+# Keeps every IN (...) list well under SQLite's bound-parameter limit.
+IN_CHUNK_SIZE = 500
+
 def parse_price(price_str: str) -> Decimal:
-    try:
-        if not price_str or price_str.upper() == "N/A":
-            return Decimal("0.00")
-        clean_str = re.sub(r"[^\d,\.]", "", price_str)
-        if "." in clean_str and "," in clean_str:
-            clean_str = clean_str.replace(",", "")
-        elif "," in clean_str:
-            clean_str = clean_str.replace(",", ".")
-        return Decimal(clean_str)
-    except Exception as e:
-        logger.warning(f"Failed to parse price '{price_str}': {e}")
-        return Decimal("0.00")
+    """Single-string form kept for callers that want 0.00 instead of a missing price."""
+    return _price_or_zero(price_str, parse_price_text(price_str))
+
+
+def _price_or_zero(price_str: str, parsed: ParsedPrice) -> Decimal:
+    if parsed.amount is not None:
+        return parsed.amount
+    if price_str and price_str.upper() != "N/A":
+        logger.warning(f"Failed to parse price '{price_str}'")
+    return Decimal("0.00")
+
+
+def _chunks(items: list, size: int = IN_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _insert_ignore(session: Session, model, index_elements: list[str]):
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    return insert(model)
+
+
+def _get_product_ids(session: Session, urls: list[str]) -> dict[str, int]:
+    ids = {}
+    for chunk in _chunks(urls):
+        rows = session.execute(select(Product.url, Product.id).where(Product.url.in_(chunk)))
+        ids.update({url: product_id for url, product_id in rows})
+    return ids
+
+
+def _prepare_rows(products: list[dict]) -> list[dict]:
+    prices = parse_prices([p.get("price") for p in products])
+    rows = []
+    for p, parsed in zip(products, prices):
+        try:
+            price_value = None
+            if p["price"] != "N/A":
+                price_value = _price_or_zero(p["price"], parsed)
+            rows.append({
+                "title": p["title"],
+                "url": p["url"],
+                "image_url": p.get("image_url", ""),
+                "price": price_value,
+            })
+        except Exception as e:
+            logger.error(f"Error saving product {p.get('title', 'Unknown')}: {e}")
+    return rows
+
+
+def _extend_unchanged(session: Session, price_rows: list[dict]) -> list[dict]:
+    """Move last_seen_at forward on latest rows whose price did not change; return the rows to insert."""
+    since = updatable_since(session.get_bind().dialect.name)
+    latest = {}
+    for chunk in _chunks(list({row["product_id"] for row in price_rows})):
+        query = select(LatestPrice.product_id, LatestPrice.price_id, LatestPrice.price, LatestPrice.created_at).where(
+            LatestPrice.product_id.in_(chunk)
+        )
+        if since is not None:
+            query = query.where(LatestPrice.created_at >= since)
+        for product_id, price_id, price, created_at in session.execute(query):
+            latest[product_id] = {"id": price_id, "price": price, "created_at": created_at}
+
+    # Stored timestamps come back naive UTC; ingest rows usually carry aware utc_now().
+    changed, last_seen = [], {}
+    for row in sorted(price_rows, key=lambda row: as_utc_naive(row["created_at"])):
+        seen_at = as_utc_naive(row["created_at"])
+        current = latest.get(row["product_id"])
+        if current is None or current["price"] != row["price"] or as_utc_naive(current["created_at"]) > seen_at:
+            latest[row["product_id"]] = current = {**row, "last_seen_at": None}
+            changed.append(current)
+        elif "id" in current:
+            last_seen[current["id"]] = seen_at
+        else:
+            current["last_seen_at"] = seen_at  # repeated within this batch
+
+    if last_seen:
+        session.execute(update(Price), [{"id": price_id, "last_seen_at": seen} for price_id, seen in last_seen.items()])
+        mark_products_changed(session)
+    return changed
+
+
+def record_prices(session: Session, price_rows: list[dict]):
+    """Insert Price rows in one executemany and keep latest_prices in sync.
+
+    With PRICE_WRITE_MODE=changes, a price equal to the product's latest one
+    is not inserted; the latest row's last_seen_at moves forward instead.
+    Alert rules of the written products are checked before latest_prices
+    moves on. The caller owns the transaction.
+    """
+    if settings.PRICE_WRITE_MODE == "changes" and price_rows:
+        price_rows = _extend_unchanged(session, price_rows)
+    if not price_rows:
+        return
+    evaluate_alerts(session, price_rows)
+    stmt = insert(Price).returning(Price.id, sort_by_parameter_order=True)
+    ids = session.scalars(stmt, price_rows).all()
+    upsert_latest_prices(session, [{**row, "id": price_id} for row, price_id in zip(price_rows, ids)])
+    mark_products_changed(session)
 
 
 def save_products(session: Session, products: list[dict]):
     try:
-        saved_count = 0
-        for p in products:
-            try:
-                product = session.query(Product).filter_by(url=p["url"]).first()
-                if not product:
-                    product = Product(
-                        title=p["title"], 
-                        url=p["url"], 
-                        image_url=p.get("image_url", "")
-                    )
-                    session.add(product)
-                    session.flush()
-                    logger.info(f"Added new product: {p['title'][:50]}...")
-
-                price_value = None
-                if p["price"] != "N/A":
-                    price_value = parse_price(p["price"])
-
-                price = Price(
-                    product_id=product.id,
-                    site="amazon.com",
-                    price=price_value
-                )
-                session.add(price)
-                saved_count += 1
-                    
-            except Exception as e:
-                logger.error(f"Error saving product {p.get('title', 'Unknown')}: {e}")
-                continue
-        
+        rows = _prepare_rows(products)
+        urls = list(dict.fromkeys(row["url"] for row in rows))
+
+        product_ids = _get_product_ids(session, urls)
+
+        new_products = {}
+        for row in rows:
+            if row["url"] not in product_ids and row["url"] not in new_products:
+                new_products[row["url"]] = {
+                    "title": row["title"],
+                    "url": row["url"],
+                    "image_url": row["image_url"],
+                }
+        if new_products:
+            stmt = _insert_ignore(session, Product, ["url"])
+            for chunk in _chunks(list(new_products.values())):
+                session.execute(stmt, chunk)
+            product_ids.update(_get_product_ids(session, list(new_products)))
+            mark_products_changed(session)
+            logger.info(f"Added {len(new_products)} new products")
+
+        now = utc_now()
+        price_rows = [
+            {
+                "product_id": product_ids[row["url"]],
+                "site": "amazon.com",
+                "price": row["price"],
+                "created_at": now,
+            }
+            for row in rows
+        ]
+        record_prices(session, price_rows)
+
         session.commit()
-        logger.info(f"Successfully saved {saved_count} price records")
-        
+        logger.info(f"Successfully saved {len(price_rows)} price records")
+
     except Exception as e:
         logger.error(f"Error in save_products: {e}")
         session.rollback()
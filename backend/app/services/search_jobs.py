@@ -0,0 +1,90 @@
+import hashlib
+import threading
+import uuid
+from typing import Optional
+
+import redis
+
+from app.config import settings
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def search_fingerprint(query: str, pages: int) -> str:
+    return hashlib.sha1(f"{normalize_query(query)}\n{pages}".encode()).hexdigest()
+
+
+class SearchJobs:
+    """Bookkeeping for scrape jobs in Redis.
+
+    ``search:job:<fingerprint>`` holds the id of the job for a normalized
+    query and page count. It lives for SEARCH_JOB_TIMEOUT while the job is
+    queued or running and for SEARCH_RESULT_TTL after it succeeded, so an
+    identical search in that window reuses the job instead of scraping again.
+    The global concurrency cap is SEARCH_MAX_CONCURRENCY ``search:slot:<n>``
+    keys, each claimed with SET NX and expiring after SEARCH_JOB_TIMEOUT in
+    case a worker dies holding one.
+    """
+
+    def __init__(
+        self,
+        client,
+        prefix: str = "search",
+        max_concurrency: int = settings.SEARCH_MAX_CONCURRENCY,
+        job_timeout: int = settings.SEARCH_JOB_TIMEOUT,
+        result_ttl: int = settings.SEARCH_RESULT_TTL,
+    ):
+        self.client = client
+        self.prefix = prefix
+        self.max_concurrency = max_concurrency
+        self.job_timeout = job_timeout
+        self.result_ttl = result_ttl
+
+    def _job_key(self, fingerprint: str) -> str:
+        return f"{self.prefix}:job:{fingerprint}"
+
+    def _slot_key(self, slot: int) -> str:
+        return f"{self.prefix}:slot:{slot}"
+
+    def claim(self, fingerprint: str) -> tuple[str, bool]:
+        """Job id for ``fingerprint`` and whether the caller must enqueue it (False: reuse a running or recent job)."""
+        while True:
+            job_id = str(uuid.uuid4())
+            if self.client.set(self._job_key(fingerprint), job_id, nx=True, ex=self.job_timeout):
+                return job_id, True
+            existing = self.client.get(self._job_key(fingerprint))
+            if existing is not None:
+                return existing.decode() if isinstance(existing, bytes) else existing, False
+
+    def finished(self, fingerprint: str):
+        """Keep the succeeded job as the answer to identical searches for SEARCH_RESULT_TTL."""
+        self.client.expire(self._job_key(fingerprint), self.result_ttl)
+
+    def forget(self, fingerprint: str):
+        """Let the next identical search start a new job (after a failure or a failed enqueue)."""
+        self.client.delete(self._job_key(fingerprint))
+
+    def acquire_slot(self, job_id: str) -> Optional[int]:
+        for slot in range(self.max_concurrency):
+            if self.client.set(self._slot_key(slot), job_id, nx=True, ex=self.job_timeout):
+                return slot
+        return None
+
+    def release_slot(self, slot: int, job_id: str):
+        holder = self.client.get(self._slot_key(slot))
+        if holder is not None and (holder.decode() if isinstance(holder, bytes) else holder) == job_id:
+            self.client.delete(self._slot_key(slot))
+
+
+_jobs: Optional[SearchJobs] = None
+_jobs_lock = threading.Lock()
+
+
+def get_search_jobs() -> SearchJobs:
+    global _jobs
+    with _jobs_lock:
+        if _jobs is None:
+            _jobs = SearchJobs(redis.Redis.from_url(settings.REDIS_URL))
+        return _jobs
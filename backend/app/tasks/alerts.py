@@ -0,0 +1,15 @@
+from app.config import settings
+from app.core.celery_app import celery_app
+from app.db import SessionLocal
+from app.services.alerts import drain_alert_outbox, prune_alert_events
+
+
+@celery_app.task(name="app.tasks.alerts.send_price_alerts")
+def send_price_alerts():
+    db = SessionLocal()
+    try:
+        sent = drain_alert_outbox(db, batch_size=settings.ALERT_BATCH_SIZE)
+        pruned = prune_alert_events(db, settings.ALERT_EVENT_RETENTION_DAYS)
+        return {"status": "success", "sent": sent, "pruned": pruned}
+    finally:
+        db.close()
@@ -0,0 +1,17 @@
+from app.analytics.snapshots import write_snapshot
+from app.config import settings
+from app.core.celery_app import celery_app
+from app.core.price_storage import maintain_price_storage as _maintain_price_storage
+from app.db import engine, read_engine
+
+
+@celery_app.task(name="app.tasks.maintenance.maintain_price_storage")
+def maintain_price_storage():
+    _maintain_price_storage(engine)
+    return {"status": "success"}
+
+
+@celery_app.task(name="app.tasks.maintenance.write_analytics_snapshot")
+def write_analytics_snapshot():
+    counts = write_snapshot(read_engine, settings.ANALYTICS_DIR)
+    return {"status": "success", **counts}
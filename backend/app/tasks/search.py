@@ -0,0 +1,46 @@
+import logging
+
+from app.config import settings
+from app.core.celery_app import celery_app
+from app.db import SessionLocal
+from app.parsers import AmazonParser
+from app.parsers.browser_pool import get_browser_pool, run_in_worker_loop
+from app.services.save_to_db import save_products
+from app.services.search_jobs import get_search_jobs
+
+logger = logging.getLogger(__name__)
+
+
+async def scrape(query: str, pages: int):
+    pool = await get_browser_pool()
+    async with AmazonParser(search_query=query, max_pages=pages, pool=pool) as parser:
+        return await parser.run()
+
+
+@celery_app.task(bind=True, name="app.tasks.search.run_search", track_started=True, max_retries=None)
+def run_search(self, query: str, pages: int, fingerprint: str):
+    jobs = get_search_jobs()
+    slot = jobs.acquire_slot(self.request.id)
+    if slot is None:
+        logger.info(f"All {jobs.max_concurrency} search slots busy, retrying '{query}' later")
+        raise self.retry(countdown=settings.SEARCH_RETRY_SECONDS)
+
+    try:
+        results = run_in_worker_loop(scrape(query, pages))
+        if results:
+            db = SessionLocal()
+            try:
+                save_products(db, results)
+            finally:
+                db.close()
+            logger.info(f"Saved {len(results)} results for query: '{query}'")
+        else:
+            logger.warning(f"No results found for query: '{query}'")
+    except Exception:
+        jobs.forget(fingerprint)
+        raise
+    finally:
+        jobs.release_slot(slot, self.request.id)
+
+    jobs.finished(fingerprint)
+    return {"status": "success", "query": query, "pages": pages, "saved": len(results or [])}
@@ -1,8 +1,33 @@
+import asyncio
+import logging
+
+from sqlalchemy import select
+
+from app.config import settings
 from app.core.celery_app import celery_app
+from app.core.prices import parse_price_text
 from app.db import SessionLocal
 from app import models
+from app.models.product import utc_now
 from app.parsers import AmazonParser
-import asyncio
+from app.parsers.browser_pool import get_browser_pool, get_http_client, run_in_worker_loop
+from app.services.save_to_db import record_prices
+
+logger = logging.getLogger(__name__)
+
+
+async def fetch_product(url: str):
+    item = await AmazonParser.fetch_product_http(url, get_http_client())
+    if item is None:
+        pool = await get_browser_pool()
+        async with AmazonParser(search_query="", max_pages=1, pool=pool) as parser:
+            item = await parser.run_product(url)
+    return item
+
+
+def _item_price(item):
+    return parse_price_text(item.get("price")).amount if item else None
+
 
 @celery_app.task(name="app.tasks.update_prices.update_product_price")
 def update_product_price(product_id: int):
@@ -13,36 +38,70 @@ def update_product_price(product_id: int):
             if not product:
                 return {"status": "error", "message": "Product not found"}
 
-            async with AmazonParser(search_query=product.title, max_pages=1) as parser:
-                prices = await parser.run()
-
-            if prices:
-                first_result = prices[0]
-                price_value_str = first_result.get("price")
-                if price_value_str and isinstance(price_value_str, str):
-                    cleaned_price = ''.join(filter(lambda x: x.isdigit() or x in '.,', price_value_str.replace(',', '.')))
-                    if cleaned_price:
-                        price = models.Price(
-                            product_id=product.id,
-                            site="Amazon",
-                            price=cleaned_price
-                        )
-                        db.add(price)
-                        db.commit()
+            item = await fetch_product(product.url)
+
+            price = _item_price(item)
+            if price is not None:
+                record_prices(db, [{
+                    "product_id": product.id,
+                    "site": "Amazon",
+                    "price": price,
+                    "created_at": utc_now(),
+                }])
+                db.commit()
             return {"status": "success", "product_id": product_id}
         finally:
             db.close()
 
-    return asyncio.run(main())
+    return run_in_worker_loop(main())
+
+
+@celery_app.task(name="app.tasks.update_prices.refresh_batch")
+def refresh_batch(product_ids: list[int]):
+    async def main():
+        db = SessionLocal()
+        try:
+            products = db.execute(
+                select(models.Product.id, models.Product.url).where(models.Product.id.in_(product_ids))
+            ).all()
+            semaphore = asyncio.Semaphore(settings.REFRESH_CONCURRENCY)
+
+            async def refresh(product_id: int, url: str):
+                async with semaphore:
+                    try:
+                        return product_id, await fetch_product(url)
+                    except Exception as e:
+                        logger.error(f"Failed to refresh product {product_id}: {e}")
+                        return product_id, None
+
+            results = await asyncio.gather(*(refresh(product_id, url) for product_id, url in products))
+
+            now = utc_now()
+            price_rows = []
+            for product_id, item in results:
+                price = _item_price(item)
+                if price is not None:
+                    price_rows.append({"product_id": product_id, "site": "Amazon", "price": price, "created_at": now})
+            record_prices(db, price_rows)
+            db.commit()
+            logger.info(f"Refreshed {len(price_rows)} of {len(product_ids)} products")
+            return {"status": "success", "requested": len(product_ids), "refreshed": len(price_rows)}
+        finally:
+            db.close()
+
+    return run_in_worker_loop(main())
 
 
 @celery_app.task(name="app.tasks.update_prices.update_all_products")
 def update_all_products():
     db = SessionLocal()
     try:
-        products = db.query(models.Product).all()
-        for product in products:
-            update_product_price.delay(product.id)
-        return {"status": "queued", "count": len(products)}
+        batch_size = settings.REFRESH_BATCH_SIZE
+        result = db.execute(select(models.Product.id).execution_options(yield_per=batch_size))
+        count = 0
+        for product_ids in result.scalars().partitions():
+            refresh_batch.delay(list(product_ids))
+            count += len(product_ids)
+        return {"status": "queued", "count": count, "batch_size": batch_size}
     finally:
         db.close()
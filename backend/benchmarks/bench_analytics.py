@@ -0,0 +1,92 @@
+"""Analytics queries against the OLTP database vs the Parquet snapshot (app/analytics).
+
+"ORM" loads Price objects and aggregates in Python, as ad-hoc analytics
+scripts did; "SQL" pushes the aggregate into SQLite; "snapshot" reads the
+Parquet files written by app.analytics.snapshots. Also reports how long the
+initial full snapshot takes to write.
+Run from backend/:  python -m benchmarks.bench_analytics --rows 1000000
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.analytics import biggest_drops, price_over_time, price_range, write_snapshot
+from app.crud.price_history import price_history_query
+from app.models.product import Base, Price
+from benchmarks.bench_price_history import populate
+
+
+def timed(fn, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def orm_min_max(session_factory):
+    ranges = {}
+    with session_factory() as db:
+        for price in db.query(Price).yield_per(10_000):
+            low, high = ranges.get(price.product_id, (price.price, price.price))
+            ranges[price.product_id] = (min(low, price.price), max(high, price.price))
+    return ranges
+
+
+def orm_history(session_factory, product_id: int):
+    with session_factory() as db:
+        return db.query(Price).filter(Price.product_id == product_id).order_by(Price.created_at).all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        populate(engine, args.rows, args.products, args.days)
+        factory = sessionmaker(bind=engine)
+        out = os.path.join(tmp, "analytics")
+
+        start = time.perf_counter()
+        write_snapshot(engine, out)
+        print(f"full snapshot of {args.rows} rows written in {time.perf_counter() - start:.1f}s")
+
+        sql_min_max = select(Price.product_id, func.min(Price.price), func.max(Price.price)).group_by(Price.product_id)
+        rows = [
+            (
+                "min/max per product",
+                timed(lambda: orm_min_max(factory), 1),
+                timed(lambda: factory().execute(sql_min_max).all(), args.samples),
+                timed(lambda: price_range(out), args.samples),
+            ),
+            (
+                "price over time",
+                timed(lambda: orm_history(factory, 42), args.samples),
+                timed(lambda: factory().execute(price_history_query(Price.__table__, 42, 5000)).all(), args.samples),
+                timed(lambda: price_over_time(42, out), args.samples),
+            ),
+            ("biggest drops (7d)", None, None, timed(lambda: biggest_drops(out), args.samples)),
+        ]
+        print(f"{args.rows} rows, {args.products} products, median ms")
+        print(f"{'query':<22} {'ORM':>10} {'SQL':>10} {'snapshot':>10}")
+        for name, *timings in rows:
+            print(f"{name:<22} " + " ".join(f"{t:>10.1f}" if t is not None else f"{'-':>10}" for t in timings))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
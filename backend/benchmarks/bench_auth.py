@@ -0,0 +1,82 @@
+"""Authenticated request throughput with and without the auth cache.
+
+Hits GET /auth/me (authentication only) and GET /dashboard/products through
+httpx's ASGI transport with concurrent clients. "no cache" sets the cache TTL
+to 0, so every request looks the user up again, as get_current_user used to.
+
+Run from backend/:  python -m benchmarks.bench_auth --clients 50 --requests 5000
+On SQLite, --latency-ms adds a simulated round trip to every statement.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+from datetime import timedelta
+
+import httpx
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.auth_cache import auth_cache
+from app.db import async_database_url, get_async_db, get_async_read_db
+from app.main import app
+from app.models.product import Base
+from app.services import create_access_token
+from benchmarks.load_dashboard import add_latency, populate, run_load
+
+
+async def main(args):
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'auth.db')}"
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        populate(engine, args.products, args.prices)
+        with Session(engine) as db:
+            user_id = db.scalar(select(models.User.id).where(models.User.email == "load@test.com"))
+
+        async_engine = create_async_engine(async_database_url(url))
+        if args.latency_ms and url.startswith("sqlite"):
+            add_latency(async_engine.sync_engine, args.latency_ms)
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_async_db():
+            async with AsyncSessionLocal() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_async_db
+        app.dependency_overrides[get_async_read_db] = override_async_db
+        token = create_access_token({"sub": "load@test.com", "uid": user_id}, expires_delta=timedelta(hours=1))
+        headers = {"Authorization": f"Bearer {token}"}
+        ttl = auth_cache.ttl
+
+        print(f"{args.clients} clients, {args.requests} requests, {args.products} products x {args.prices} prices")
+        print(f"{'endpoint':<20} {'auth':<9} {'p50 ms':>10} {'p99 ms':>10} {'req/s':>10}")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for path in ("/api/v1/auth/me", "/api/v1/dashboard/products"):
+                for label, cache_ttl in (("no cache", 0), ("cache", ttl)):
+                    auth_cache.ttl = cache_ttl
+                    auth_cache.clear()
+                    await run_load(client, path, headers, args.clients, args.clients)
+                    p50, p99, rps = await run_load(client, path, headers, args.clients, args.requests)
+                    print(f"{path.removeprefix('/api/v1'):<20} {label:<9} {p50:>10.1f} {p99:>10.1f} {rps:>10.0f}")
+
+        auth_cache.ttl = ttl
+        app.dependency_overrides.clear()
+        await async_engine.dispose()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--prices", type=int, default=30)
+    parser.add_argument("--database-url", default="")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,72 @@
+"""Locator-per-field extraction vs a single evaluate_all call on a static results page.
+
+Needs a Playwright Chromium (playwright install chromium).
+Run from backend/:  python -m benchmarks.bench_extract_items --items 60 --repeat 20
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from pathlib import Path
+
+from playwright.async_api import async_playwright
+
+from app.parsers.amazon_parser import AmazonParser
+
+FIXTURE = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "amazon_search.html"
+
+CLONE_ITEMS_JS = """
+(count) => {
+    const slot = document.querySelector("div.s-main-slot");
+    const templates = Array.from(slot.querySelectorAll('div[data-component-type="s-search-result"]'));
+    for (let i = templates.length; i < count; i++) {
+        slot.appendChild(templates[i % templates.length].cloneNode(true));
+    }
+}
+"""
+
+
+async def timed(fn, repeat: int) -> tuple[float, int]:
+    timings, found = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = len(await fn())
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, found
+
+
+async def main(items: int, repeat: int):
+    logging.disable(logging.CRITICAL)
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.goto(FIXTURE.as_uri())
+        await page.evaluate(CLONE_ITEMS_JS, items)
+
+        parser = AmazonParser("benchmark")
+        listitems = page.locator(AmazonParser.LISTITEM_SELECTOR)
+
+        async def per_locator():
+            results = await asyncio.gather(*(parser._extract_item(item) for item in await listitems.all()))
+            return [r for r in results if r]
+
+        async def evaluate_all():
+            return await parser._extract_items(listitems)
+
+        locator_ms, locator_found = await timed(per_locator, repeat)
+        evaluate_ms, evaluate_found = await timed(evaluate_all, repeat)
+        await browser.close()
+
+    print(f"{items} result nodes, median of {repeat} runs")
+    print(f"{'mode':<14} {'ms/page':>10} {'items':>7}")
+    print(f"{'locator':<14} {locator_ms:>10.2f} {locator_found:>7}")
+    print(f"{'evaluate_all':<14} {evaluate_ms:>10.2f} {evaluate_found:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.repeat))
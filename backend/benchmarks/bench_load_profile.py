@@ -0,0 +1,92 @@
+"""Bytes and load time of a heavy local page with the "full" and "light" scraper profiles.
+
+Serves a generated page (images, fonts, a stylesheet and a "tracker" script on a
+second host name) from a local HTTP server. Needs a Playwright Chromium.
+Run from backend/:  python -m benchmarks.bench_load_profile --repeat 5
+"""
+import argparse
+import asyncio
+import functools
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from playwright.async_api import async_playwright
+
+from app.parsers.amazon_parser import AmazonParser
+from app.parsers.load_profile import apply_load_profile
+
+
+def build_site(root: str, images: int, image_kb: int, fonts: int, font_kb: int, port: int):
+    for i in range(images):
+        with open(os.path.join(root, f"img{i}.jpg"), "wb") as f:
+            f.write(os.urandom(image_kb * 1024))
+    font_faces = []
+    for i in range(fonts):
+        with open(os.path.join(root, f"font{i}.woff2"), "wb") as f:
+            f.write(os.urandom(font_kb * 1024))
+        font_faces.append(f"@font-face {{ font-family: f{i}; src: url(font{i}.woff2); }} .f{i} {{ font-family: f{i}; }}")
+    with open(os.path.join(root, "style.css"), "w") as f:
+        f.write("\n".join(font_faces))
+    with open(os.path.join(root, "tracker.js"), "w") as f:
+        f.write("window.tracked = true;" + " " * 200_000)
+
+    results = "\n".join(
+        f'<div data-component-type="s-search-result" class="f{i % max(fonts, 1)}">'
+        f'<img class="s-image" src="img{i}.jpg"><h2>Item {i}</h2></div>'
+        for i in range(images)
+    )
+    with open(os.path.join(root, "index.html"), "w") as f:
+        f.write(
+            '<html><head><link rel="stylesheet" href="style.css">'
+            f'<script src="http://127.0.0.1:{port}/tracker.js"></script></head>'
+            f'<body><div class="s-main-slot">{results}</div></body></html>'
+        )
+
+
+async def measure(browser, url: str, profile: str, repeat: int) -> tuple[float, float, int]:
+    timings, kib, blocked = [], [], 0
+    for _ in range(repeat):
+        context = await browser.new_context(**AmazonParser.context_options())
+        stats = await apply_load_profile(context, profile, ["image", "media", "font"], ["127.0.0.1"])
+        page = await context.new_page()
+        start = time.perf_counter()
+        await page.goto(url, wait_until="load")
+        timings.append(time.perf_counter() - start)
+        kib.append(stats.bytes / 1024)
+        blocked = stats.blocked
+        await context.close()
+    return statistics.median(timings) * 1000, statistics.median(kib), blocked
+
+
+async def main(args):
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as root:
+        server = ThreadingHTTPServer(("localhost", 0), functools.partial(SimpleHTTPRequestHandler, directory=root))
+        port = server.server_address[1]
+        build_site(root, args.images, args.image_kb, args.fonts, args.font_kb, port)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://localhost:{port}/index.html"
+
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=True)
+            print(f"{'profile':<8} {'load ms':>10} {'KiB':>10} {'blocked':>8}")
+            for profile in ("full", "light"):
+                ms, kib, blocked = await measure(browser, url, profile, args.repeat)
+                print(f"{profile:<8} {ms:>10.1f} {kib:>10.0f} {blocked:>8}")
+            await browser.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=60)
+    parser.add_argument("--image-kb", type=int, default=80)
+    parser.add_argument("--fonts", type=int, default=4)
+    parser.add_argument("--font-kb", type=int, default=150)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,109 @@
+"""Latency of a cheap endpoint while other clients hammer the login endpoint.
+
+"idle" probes GET / with no login traffic. "before" runs the login storm
+against the previous handler, which called bcrypt inline on the event loop;
+"after" uses the current /auth/login, which hashes on the password-hash pool.
+Probe latency counts from each probe's scheduled start, so it includes time
+spent waiting for a blocked event loop. Requests go through httpx's ASGI
+transport.
+
+Run from backend/:  python -m benchmarks.bench_login_storm --login-clients 20 --seconds 5
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.crud import get_user_by_email_async
+from app.db import async_database_url, get_async_db
+from app.main import app
+from app.models.product import Base
+from app.services import hash_password, verify_password
+
+
+async def storm(client: httpx.AsyncClient, path: str, clients: int, stop: float) -> dict:
+    statuses = {}
+
+    async def worker():
+        while time.perf_counter() < stop:
+            response = await client.post(path, data={"username": "load@test.com", "password": "secret"})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return statuses
+
+
+async def probe(client: httpx.AsyncClient, stop: float, interval: float = 0.01) -> list:
+    """GET / every ``interval`` seconds; latency counts from the scheduled start, so time
+    the probe spends waiting for a blocked event loop is included."""
+    timings = []
+    scheduled = time.perf_counter()
+    while scheduled < stop:
+        await asyncio.sleep(max(0, scheduled - time.perf_counter()))
+        (await client.get("/")).raise_for_status()
+        timings.append(time.perf_counter() - scheduled)
+        scheduled = max(scheduled + interval, time.perf_counter())
+    return timings
+
+
+async def main(args):
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'login.db')}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            db.add(models.User(email="load@test.com", password_hash=hash_password("secret")))
+            db.commit()
+
+        async_engine = create_async_engine(async_database_url(url))
+        AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        async def override_async_db():
+            async with AsyncSessionLocal() as db:
+                yield db
+
+        @app.post("/bench/blocking-login")
+        async def blocking_login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+            user = await get_user_by_email_async(db, form_data.username)
+            if not user or not verify_password(form_data.password, user.password_hash):
+                raise HTTPException(status_code=401)
+            return {"ok": True}
+
+        app.dependency_overrides[get_async_db] = override_async_db
+        print(f"bcrypt rounds {settings.BCRYPT_ROUNDS}, {args.login_clients} login clients, {args.seconds}s per run")
+        print(f"{'run':<8} {'probe p50 ms':>13} {'probe p99 ms':>13} {'probe max ms':>13} {'logins':>8} {'503s':>6}")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for label, path in (("idle", None), ("before", "/bench/blocking-login"), ("after", "/api/v1/auth/login")):
+                stop = time.perf_counter() + args.seconds
+                storming = storm(client, path, args.login_clients, stop) if path else asyncio.sleep(0, {})
+                timings, statuses = await asyncio.gather(probe(client, stop), storming)
+                timings.sort()
+                print(
+                    f"{label:<8} {statistics.median(timings) * 1000:>13.1f} "
+                    f"{timings[max(int(len(timings) * 0.99) - 1, 0)] * 1000:>13.1f} {timings[-1] * 1000:>13.1f} "
+                    f"{statuses.get(200, 0):>8} {statuses.get(503, 0):>6}"
+                )
+
+        app.dependency_overrides.clear()
+        await async_engine.dispose()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--login-clients", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=5)
+    asyncio.run(main(parser.parse_args()))
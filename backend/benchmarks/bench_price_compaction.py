@@ -0,0 +1,150 @@
+"""Storage and history-query time of append-only price history vs run-length compacted history.
+
+Synthetic multi-year dataset: every product is scraped ``--scrapes-per-day``
+times a day for ``--days`` days and its price changes on ``--change-rate`` of
+the scrapes. The database is measured as written by PRICE_WRITE_MODE=append,
+then compacted with ``python -m app.core.price_storage compact`` and measured
+again. Also times one scrape round of record_prices in both write modes.
+Run from backend/:  python -m benchmarks.bench_price_compaction --products 500 --days 1095
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.core.price_storage import compact_price_history
+from app.crud.price_history import price_buckets_query, price_history_query
+from app.models.product import Base, Price, Product
+from app.services.latest_prices import refresh_latest_prices
+from app.services.save_to_db import record_prices
+
+START = datetime(2022, 1, 1)
+
+
+def populate(engine, products: int, days: int, scrapes_per_day: int, change_rate: float) -> dict[int, Decimal]:
+    rng = random.Random(products * days)
+    step = timedelta(hours=24 / scrapes_per_day)
+    with engine.begin() as conn:
+        conn.execute(insert(Product.__table__), [
+            {"id": i, "title": f"Product {i}", "url": f"url{i}", "image_url": "", "created_at": START, "updated_at": START}
+            for i in range(1, products + 1)
+        ])
+    current = {}
+    for product_id in range(1, products + 1):
+        price = Decimal(rng.randint(500, 100_000)) / 100
+        batch = []
+        for i in range(days * scrapes_per_day):
+            if rng.random() < change_rate:
+                price = max(Decimal("1.00"), (price * Decimal(rng.uniform(0.85, 1.15))).quantize(Decimal("0.01")))
+            batch.append({"product_id": product_id, "site": "amazon.com", "price": price, "created_at": START + step * i})
+        with engine.begin() as conn:
+            conn.execute(insert(Price.__table__), batch)
+        current[product_id] = price
+    session = sessionmaker(bind=engine)()
+    refresh_latest_prices(session)
+    session.close()
+    return current
+
+
+def size_mb(engine, path: str) -> float:
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+    return os.path.getsize(path) / 1024 / 1024
+
+
+def timed(engine, build, products: int, samples: int) -> float:
+    rng = random.Random(samples)
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(samples):
+            query = build(rng.randint(1, products))
+            start = time.perf_counter()
+            conn.execute(query).all()
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def history_queries(engine, products: int, days: int, samples: int) -> dict[str, float]:
+    table = Price.__table__
+    end = START + timedelta(days=days)
+    return {
+        "newest 500 rows": timed(engine, lambda pid: price_history_query(table, pid, 500), products, samples),
+        "last 90 days": timed(
+            engine, lambda pid: price_history_query(table, pid, 5000, start=end - timedelta(days=90)), products, samples
+        ),
+        "day buckets, 1 year": timed(
+            engine,
+            lambda pid: price_buckets_query(table, "sqlite", pid, "day", 366, start=end - timedelta(days=365)),
+            products, samples,
+        ),
+        "week buckets, all": timed(
+            engine, lambda pid: price_buckets_query(table, "sqlite", pid, "week", 1000), products, samples
+        ),
+    }
+
+
+def scrape_round(engine, mode: str, current: dict[int, Decimal], at: datetime) -> float:
+    settings.PRICE_WRITE_MODE = mode
+    rows = [{"product_id": pid, "site": "amazon.com", "price": price, "created_at": at} for pid, price in current.items()]
+    session = sessionmaker(bind=engine)()
+    start = time.perf_counter()
+    record_prices(session, rows)
+    session.commit()
+    elapsed = time.perf_counter() - start
+    session.close()
+    return elapsed * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--scrapes-per-day", type=int, default=2)
+    parser.add_argument("--change-rate", type=float, default=0.02)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(engine)
+        current = populate(engine, args.products, args.days, args.scrapes_per_day, args.change_rate)
+
+        results = {}
+        for label in ("append", "compacted"):
+            if label == "compacted":
+                start = time.perf_counter()
+                runs, deleted = compact_price_history(engine)
+                print(f"compaction: {runs} runs collapsed, {deleted} rows deleted in {time.perf_counter() - start:.1f}s")
+            with engine.connect() as conn:
+                rows = conn.execute(text("SELECT count(*) FROM prices")).scalar()
+            results[label] = {"rows": rows, "size (MB)": size_mb(engine, path)}
+            results[label].update(history_queries(engine, args.products, args.days, args.samples))
+
+        at = START + timedelta(days=args.days)
+        append_ms = scrape_round(engine, "append", current, at)
+        changes_ms = scrape_round(engine, "changes", current, at + timedelta(hours=1))
+
+        print(f"{args.products} products, {args.days} days, {args.scrapes_per_day} scrapes/day, "
+              f"{args.change_rate:.0%} of scrapes change the price; query times are median ms over {args.samples}")
+        print(f"{'':<22} {'append-only':>12} {'compacted':>12}")
+        for name in results["append"]:
+            before, after = results["append"][name], results["compacted"][name]
+            fmt = ",.0f" if name == "rows" else ",.2f"
+            print(f"{name:<22} {before:>12{fmt}} {after:>12{fmt}}")
+        print(f"one scrape round of {args.products} prices: append {append_ms:.1f} ms, changes {changes_ms:.1f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Price-history query latency: single-column vs composite index, and hot/archived months.
+
+Run from backend/:  python -m benchmarks.bench_price_history --rows 50000000
+(50M rows takes a while to generate and several GB of disk; the default is 1M.)
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.core import price_storage
+from app.models.product import Base, utc_now
+
+HISTORY_SQL = "SELECT price, created_at FROM {table} WHERE product_id = :pid ORDER BY created_at DESC LIMIT 100"
+LATEST_SQL = "SELECT price FROM {table} WHERE product_id = :pid ORDER BY created_at DESC LIMIT 1"
+CURRENT_MONTH_SQL = "SELECT count(*), avg(price) FROM prices WHERE product_id = :pid AND created_at >= :since"
+
+
+def populate(engine, rows: int, products: int, days: int):
+    now = utc_now()
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO products (id, title, url, image_url, created_at, updated_at) VALUES (:id, :t, :u, '', :c, :c)"),
+            [{"id": i, "t": f"Product {i}", "u": f"url{i}", "c": now} for i in range(1, products + 1)],
+        )
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            batch.append({
+                "pid": random.randint(1, products),
+                "price": round(random.uniform(1, 1000), 2),
+                "created_at": now - timedelta(minutes=random.randint(0, days * 24 * 60)),
+            })
+            if len(batch) == 50_000:
+                conn.execute(text("INSERT INTO prices (product_id, site, price, created_at) VALUES (:pid, 'amazon', :price, :created_at)"), batch)
+                batch.clear()
+        if batch:
+            conn.execute(text("INSERT INTO prices (product_id, site, price, created_at) VALUES (:pid, 'amazon', :price, :created_at)"), batch)
+
+
+def timed(engine, sql: str, products: int, samples: int, **params) -> float:
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(samples):
+            start = time.perf_counter()
+            conn.execute(text(sql), {"pid": random.randint(1, products), **params}).all()
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--samples", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_prices_product_id_created_at"))
+            conn.execute(text("CREATE INDEX ix_prices_product_id ON prices (product_id)"))
+        populate(engine, args.rows, args.products, args.days)
+        since = (utc_now() - timedelta(days=30)).isoformat(" ")
+
+        print(f"{args.rows} rows, {args.products} products, median ms over {args.samples} queries")
+        print(f"{'query':<24} {'product_id idx':>15} {'composite idx':>15} {'archived':>15}")
+        results = {}
+        for label in ("single", "composite", "archived"):
+            if label == "composite":
+                price_storage.upgrade_price_indexes(engine)
+            if label == "archived":
+                settings.PRICE_STORAGE = "partitioned"
+                price_storage.archive_sqlite(engine, hot_months=1)
+            table = price_storage.price_history_table("sqlite").name
+            results[label] = [
+                timed(engine, LATEST_SQL.format(table=table), args.products, args.samples),
+                timed(engine, HISTORY_SQL.format(table=table), args.products, args.samples),
+                timed(engine, CURRENT_MONTH_SQL, args.products, args.samples, since=since),
+            ]
+        for i, name in enumerate(("latest price", "history (100 rows)", "current month stats")):
+            print(f"{name:<24} {results['single'][i]:>15.3f} {results['composite'][i]:>15.3f} {results['archived'][i]:>15.3f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Strings/sec of app.core.prices.parse_prices against the old per-row regex parser.
+
+Synthetic price strings in $, £, €, CHF and JPY formats with thousands
+separators. "distinct" draws amounts from a wide range (most strings are
+unique); "repeated" draws from a few thousand amounts, as a daily refresh of
+the same catalogue does. The memo cache is cleared before every run.
+Run from backend/:  python -m benchmarks.bench_price_parsing --count 1000000
+"""
+import argparse
+import random
+import re
+import time
+from decimal import Decimal
+
+from app.core.prices import parse_price_text, parse_prices
+
+FORMATS = [
+    lambda a: f"${a:,.2f}",
+    lambda a: f"£{a:,.2f}",
+    lambda a: f"{a:,.2f} €".replace(",", " ").replace(".", ","),
+    lambda a: f"{a:,.2f}€".replace(",", "X").replace(".", ",").replace("X", "."),
+    lambda a: f"CHF {a:,.2f}".replace(",", "'"),
+    lambda a: f"¥{int(a):,}",
+    lambda a: "N/A",
+]
+
+
+def legacy_parse_price(price_str: str) -> Decimal:
+    try:
+        if not price_str or price_str.upper() == "N/A":
+            return Decimal("0.00")
+        clean_str = re.sub(r"[^\d,\.]", "", price_str)
+        if "." in clean_str and "," in clean_str:
+            clean_str = clean_str.replace(",", "")
+        elif "," in clean_str:
+            clean_str = clean_str.replace(",", ".")
+        return Decimal(clean_str)
+    except Exception:
+        return Decimal("0.00")
+
+
+def make_strings(count: int, amounts: int) -> list[str]:
+    rng = random.Random(count + amounts)
+    pool = [rng.randint(100, 500_000) / 100 for _ in range(amounts)]
+    return [rng.choice(FORMATS)(rng.choice(pool)) for _ in range(count)]
+
+
+def rate(fn, strings) -> float:
+    parse_price_text.cache_clear()
+    start = time.perf_counter()
+    fn(strings)
+    return len(strings) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{args.count} strings, strings/sec")
+    print(f"{'workload':<10} {'legacy':>12} {'parse_prices':>14} {'speedup':>8}")
+    for label, amounts in (("distinct", args.count), ("repeated", 5_000)):
+        strings = make_strings(args.count, amounts)
+        legacy = rate(lambda batch: [legacy_parse_price(s) for s in batch], strings)
+        batched = rate(parse_prices, strings)
+        print(f"{label:<10} {legacy:>12,.0f} {batched:>14,.0f} {batched / legacy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
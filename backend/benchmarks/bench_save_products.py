@@ -0,0 +1,75 @@
+"""Rows/sec of save_products against the old one-query-per-item loop.
+
+Run from backend/:  python -m benchmarks.bench_save_products --sizes 1000 10000 100000
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.product import Base, Product, Price
+from app.services.save_to_db import save_products, parse_price
+
+
+def legacy_save_products(session, products):
+    for p in products:
+        product = session.query(Product).filter_by(url=p["url"]).first()
+        if not product:
+            product = Product(title=p["title"], url=p["url"], image_url=p.get("image_url", ""))
+            session.add(product)
+            session.flush()
+        price_value = None if p["price"] == "N/A" else parse_price(p["price"])
+        session.add(Price(product_id=product.id, site="amazon.com", price=price_value))
+    session.commit()
+
+
+def make_items(n: int) -> list[dict]:
+    return [
+        {
+            "title": f"Product {i}",
+            "url": f"https://www.amazon.co.uk/dp/B{i:09d}",
+            "image_url": f"https://m.media-amazon.com/images/{i}.jpg",
+            "price": f"£{i % 1000}.{i % 100:02d}",
+        }
+        for i in range(n)
+    ]
+
+
+def run(fn, items: list[dict]) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        try:
+            start = time.perf_counter()
+            # Second pass exercises the "product already exists" path.
+            fn(session, items)
+            fn(session, items)
+            elapsed = time.perf_counter() - start
+        finally:
+            session.close()
+            engine.dispose()
+    return 2 * len(items) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--skip-legacy-above", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    print(f"{'items':>10} {'legacy rows/s':>15} {'batched rows/s':>15}")
+    for size in args.sizes:
+        items = make_items(size)
+        legacy = run(legacy_save_products, items) if size <= args.skip_legacy_above else float("nan")
+        batched = run(save_products, items)
+        print(f"{size:>10} {legacy:>15.0f} {batched:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Title search latency: leading-wildcard ILIKE vs the FTS5 index, at several catalogue sizes.
+
+"fts" is the first page (100 rows) as /products/filter serves it: the capped
+match count, then a page ranked by bm25, or in id order with the LIMIT inside
+the FTS subquery when the title matches SEARCH_RANK_MAX_MATCHES or more
+products. "ilike" is the old ``title ILIKE '%term%'`` ordered by id. Broad
+terms match a large share of titles, so ILIKE stops after the first 100 hits;
+selective terms (model numbers) make ILIKE scan the table.
+Run from backend/:  python -m benchmarks.bench_title_search --sizes 10000 100000 1000000
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, select, text
+
+from app.core.fulltext import install_fulltext
+from app.crud.search import search_order, search_products_query, title_match_count_query
+from app.models.product import Base, LatestPrice, Product, utc_now
+
+BRANDS = ["Apple", "Samsung", "Sony", "Philips", "Bosch", "Logitech", "Anker", "Lenovo", "Dell", "Xiaomi"]
+NOUNS = ["phone", "laptop", "headphones", "kettle", "charger", "monitor", "keyboard", "mouse", "speaker", "camera",
+         "blender", "toaster", "router", "tablet", "watch", "drill", "lamp", "backpack", "cable", "case"]
+ADJECTIVES = ["wireless", "portable", "compact", "smart", "ultra", "pro", "mini", "gaming", "silent", "digital"]
+QUERY_SETS = {
+    "broad": ["wireless", "wireless headph", "sony pro", "kettle", "usb c charger", "gaming mouse", "lamp mini"],
+    "selective": ["4242", "bosch 777", "31337", "anker 9", "sony 123"],
+}
+
+
+def title(rng: random.Random, i: int) -> str:
+    words = [rng.choice(BRANDS), rng.choice(ADJECTIVES), rng.choice(NOUNS), rng.choice(ADJECTIVES), rng.choice(NOUNS)]
+    return f"{' '.join(words)} {rng.choice(['USB C', 'Bluetooth', 'Type 2', '2024'])} model {i}"
+
+
+def populate(engine, size: int):
+    rng = random.Random(size)
+    now = utc_now()
+    with engine.begin() as conn:
+        for start in range(0, size, 50_000):
+            ids = range(start + 1, min(size, start + 50_000) + 1)
+            conn.execute(Product.__table__.insert(), [
+                {"id": i, "title": title(rng, i), "url": f"https://example.com/{i}", "image_url": "", "created_at": now, "updated_at": now}
+                for i in ids
+            ])
+            conn.execute(LatestPrice.__table__.insert(), [
+                {"product_id": i, "price_id": i, "site": "amazon", "price": rng.randint(5, 2000), "created_at": now}
+                for i in ids
+            ])
+
+
+def ilike_search(conn, term: str):
+    conn.execute(
+        select(Product)
+        .join(LatestPrice, LatestPrice.product_id == Product.id)
+        .where(Product.title.ilike(f"%{term}%"))
+        .order_by(Product.id)
+        .limit(100)
+    ).all()
+
+
+def fts_search(conn, term: str):
+    order = search_order(title=term, matches=conn.execute(title_match_count_query(term, "sqlite")).scalar())
+    conn.execute(search_products_query(title=term, include_prices="none", limit=100, order=order)).all()
+
+
+def timed(conn, search, queries, samples: int) -> float:
+    timings = []
+    for i in range(samples):
+        start = time.perf_counter()
+        search(conn, queries[i % len(queries)])
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--samples", type=int, default=35)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    print(f"median ms per search over {args.samples} queries, first page of 100")
+    print(f"{'products':>10} {'queries':>10} {'ilike':>10} {'fts':>10} {'speedup':>8}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'search.db')}")
+            Base.metadata.create_all(engine)
+            populate(engine, size)
+            with engine.begin() as conn:
+                install_fulltext(conn, rebuild=True)
+                conn.execute(text("ANALYZE"))
+            with engine.connect() as conn:
+                for name, queries in QUERY_SETS.items():
+                    ilike_ms = timed(conn, ilike_search, queries, args.samples)
+                    fts_ms = timed(conn, fts_search, queries, args.samples)
+                    print(f"{size:>10} {name:>10} {ilike_ms:>10.2f} {fts_ms:>10.2f} {ilike_ms / fts_ms:>7.1f}x")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""p50/p99 latency of GET /dashboard/products under concurrent clients.
+
+"before" is the previous handler: an ``async def`` endpoint running a
+synchronous Session (and lazy loads) on the event loop. "after" is the
+current endpoint on AsyncSession. Requests go through httpx's ASGI transport,
+so the numbers are server-side latency without socket overhead.
+
+Run from backend/:  python -m benchmarks.load_dashboard --clients 50 --requests 2000
+Point --database-url at Postgres to measure against a networked database;
+on SQLite, --latency-ms adds a simulated round trip to every statement (it
+sleeps in whatever thread runs the statement, like a real network driver).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import httpx
+from fastapi import Depends
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.util import await_only
+
+from app import models
+from app.db import async_database_url, get_async_db, get_async_read_db
+from app.main import app
+from app.models.product import Base, utc_now
+from app.services import create_access_token, get_current_user
+from app.services.latest_prices import refresh_latest_prices
+
+
+def populate(engine, products: int, prices_per_product: int):
+    now = utc_now()
+    with Session(engine) as db:
+        user = models.User(email="load@test.com", password_hash="x")
+        db.add(user)
+        items = [
+            models.Product(title=f"Product {i}", url=f"https://example.com/{i}", image_url=f"https://example.com/{i}.jpg")
+            for i in range(products)
+        ]
+        db.add_all(items)
+        db.flush()
+        db.add_all(models.UserProducts(user_id=user.id, product_id=p.id) for p in items)
+        db.add_all(
+            models.Price(product_id=p.id, site="Amazon", price=Decimal(100 + n), created_at=now - timedelta(days=n))
+            for p in items for n in range(prices_per_product)
+        )
+        db.commit()
+        refresh_latest_prices(db)
+
+
+def add_latency(engine, latency_ms: float):
+    def round_trip(statement):
+        time.sleep(latency_ms / 1000)
+
+    if engine.dialect.is_async:
+        @event.listens_for(engine, "connect")
+        def on_async_connect(dbapi_connection, connection_record):
+            await_only(connection_record.driver_connection.set_trace_callback(round_trip))
+    else:
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            dbapi_connection.set_trace_callback(round_trip)
+
+
+async def run_load(client: httpx.AsyncClient, path: str, headers: dict, clients: int, requests: int):
+    timings = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            timings.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    timings.sort()
+    return (
+        statistics.median(timings) * 1000,
+        timings[int(len(timings) * 0.99) - 1] * 1000,
+        len(timings) / elapsed,
+    )
+
+
+async def main(args):
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'load.db')}"
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        populate(engine, args.products, args.prices)
+        SyncSession = sessionmaker(bind=engine, autoflush=False)
+
+        async_engine = create_async_engine(async_database_url(url))
+        if args.latency_ms and url.startswith("sqlite"):
+            add_latency(engine, args.latency_ms)
+            add_latency(async_engine.sync_engine, args.latency_ms)
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_async_db():
+            async with AsyncSessionLocal() as db:
+                yield db
+
+        def get_sync_db():
+            db = SyncSession()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        @app.get("/bench/blocking-dashboard")
+        async def blocking_dashboard(db: Session = Depends(get_sync_db), current_user=Depends(get_current_user)):
+            user_products = db.query(models.UserProducts).filter(
+                models.UserProducts.user_id == current_user.id
+            ).all()
+            return [
+                {"id": up.product.id, "prices": [str(p.price) for p in up.product.prices]}
+                for up in user_products
+            ]
+
+        app.dependency_overrides[get_async_db] = override_async_db
+        app.dependency_overrides[get_async_read_db] = override_async_db
+        token = create_access_token({"sub": "load@test.com"}, expires_delta=timedelta(hours=1))
+        headers = {"Authorization": f"Bearer {token}"}
+
+        print(f"{args.clients} clients, {args.requests} requests, {args.products} products x {args.prices} prices")
+        print(f"{'handler':<8} {'p50 ms':>10} {'p99 ms':>10} {'req/s':>10}")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for label, path in (("before", "/bench/blocking-dashboard"), ("after", "/api/v1/dashboard/products")):
+                await run_load(client, path, headers, args.clients, args.clients)
+                p50, p99, rps = await run_load(client, path, headers, args.clients, args.requests)
+                print(f"{label:<8} {p50:>10.1f} {p99:>10.1f} {rps:>10.0f}")
+
+        app.dependency_overrides.clear()
+        await async_engine.dispose()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--prices", type=int, default=30)
+    parser.add_argument("--database-url", default="")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,35 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine):
+    """Record every statement ``engine`` (a sync Engine or ``AsyncEngine.sync_engine``) executes."""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+
+@contextmanager
+def assert_max_queries(engine, limit: int):
+    with count_queries(engine) as counter:
+        yield counter
+    assert counter.count <= limit, (
+        f"expected at most {limit} statements, got {counter.count}:\n" + "\n".join(counter.statements)
+    )
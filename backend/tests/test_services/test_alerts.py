@@ -0,0 +1,167 @@
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.auth_cache import auth_cache
+from app.db import get_async_db, get_async_read_db
+from app.main import app
+from app.models import AlertEvent, AlertRule, Base, Product, User, UserProducts
+from app.services import create_access_token
+from app.services.alerts import drain_alert_outbox
+from app.services.save_to_db import record_prices
+from tests.query_counter import count_queries
+
+START = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'alerts.db'}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        user = User(email="user@test.com", password_hash="hash")
+        products = [Product(title=f"Lamp {i}", url=f"https://a.test/{i}", image_url="") for i in range(3)]
+        db.add(user)
+        db.add_all(products)
+        db.flush()
+        db.add_all(UserProducts(user_id=user.id, product_id=p.id) for p in products[:2])
+        db.commit()
+    yield engine
+    engine.dispose()
+
+
+def ingest(engine, prices: dict[int, str], at: datetime):
+    with sessionmaker(bind=engine)() as db:
+        record_prices(db, [
+            {"product_id": pid, "site": "Amazon", "price": Decimal(price), "created_at": at}
+            for pid, price in prices.items()
+        ])
+        db.commit()
+
+
+def add_rule(engine, product_id: int, kind: str, threshold=None, reference=None, triggered=False):
+    with sessionmaker(bind=engine)() as db:
+        user_product = db.scalar(select(UserProducts).where(UserProducts.product_id == product_id))
+        db.add(AlertRule(
+            user_product_id=user_product.id, user_id=user_product.user_id, product_id=product_id,
+            kind=kind, threshold=threshold, reference_price=reference, triggered=triggered,
+        ))
+        db.commit()
+
+
+def events(engine):
+    with sessionmaker(bind=engine)() as db:
+        return [
+            (e.product_id, e.kind, e.price, e.previous_price)
+            for e in db.scalars(select(AlertEvent).order_by(AlertEvent.id))
+        ]
+
+
+def test_target_rule_fires_on_each_crossing(engine):
+    add_rule(engine, 1, "target", Decimal("100"))
+
+    for day, price in enumerate(["120", "95", "90", "110", "99"]):
+        ingest(engine, {1: price}, START + timedelta(days=day))
+
+    assert events(engine) == [(1, "target", Decimal("95"), Decimal("120")), (1, "target", Decimal("99"), Decimal("110"))]
+
+
+def test_drop_pct_and_all_time_low(engine):
+    add_rule(engine, 1, "drop_pct", Decimal("20"), reference=Decimal("100"))
+    add_rule(engine, 2, "all_time_low", reference=Decimal("50"))
+
+    ingest(engine, {1: "85", 2: "55"}, START)
+    ingest(engine, {1: "80", 2: "49"}, START + timedelta(days=1))
+    ingest(engine, {1: "70", 2: "49.50"}, START + timedelta(days=2))
+
+    assert events(engine) == [
+        (1, "drop_pct", Decimal("80"), Decimal("85")),
+        (2, "all_time_low", Decimal("49"), Decimal("55")),
+    ]
+
+
+def test_only_rules_of_written_products_are_read(engine):
+    add_rule(engine, 1, "target", Decimal("10"))
+    add_rule(engine, 2, "target", Decimal("10"))
+
+    with count_queries(engine) as counter:
+        ingest(engine, {3: "5"}, START)
+
+    rule_reads = [s for s in counter.statements if "FROM alert_rules" in s]
+    assert len(rule_reads) == 1
+    assert events(engine) == []
+
+
+def test_drain_outbox_in_batches(engine):
+    add_rule(engine, 1, "target", Decimal("100"))
+    add_rule(engine, 2, "target", Decimal("100"))
+    ingest(engine, {1: "90", 2: "80"}, START)
+    db = sessionmaker(bind=engine)()
+
+    def fail(batch):
+        raise RuntimeError("webhook down")
+
+    with pytest.raises(RuntimeError):
+        drain_alert_outbox(db, fail, batch_size=1)
+    batches = []
+    assert drain_alert_outbox(db, batches.append, batch_size=1) == 2
+    assert drain_alert_outbox(db, batches.append, batch_size=1) == 0
+    db.close()
+
+    assert [[alert["title"] for alert in batch] for batch in batches] == [["Lamp 0"], ["Lamp 1"]]
+    assert batches[0][0]["email"] == "user@test.com"
+    assert batches[0][0]["price"] == "90.00"
+
+
+def test_alert_rule_api(engine, tmp_path):
+    ingest(engine, {1: "120"}, START)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'alerts.db'}")
+    factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override():
+        async with factory() as db:
+            yield db
+
+    async def request(method, path, **kwargs):
+        token = create_access_token({"sub": "user@test.com"}, expires_delta=timedelta(minutes=5))
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.request(
+                method, f"/api/v1/dashboard{path}", headers={"Authorization": f"Bearer {token}"}, **kwargs
+            )
+
+    def call(method, path, **kwargs):
+        return asyncio.run(request(method, path, **kwargs))
+
+    app.dependency_overrides[get_async_db] = override
+    app.dependency_overrides[get_async_read_db] = override
+    auth_cache.clear()
+    try:
+        assert call("POST", "/products/1/alerts", json={"kind": "drop_pct", "threshold": "150"}).status_code == 422
+        assert call("POST", "/products/3/alerts", json={"kind": "target", "threshold": "10"}).status_code == 404
+
+        created = call("POST", "/products/1/alerts", json={"kind": "drop_pct", "threshold": "10"})
+        assert created.status_code == 201
+        assert created.json()["reference_price"] == "120.00"
+        rule = call("POST", "/products/1/alerts", json={"kind": "target", "threshold": "100"}).json()
+        assert [r["kind"] for r in call("GET", "/alerts").json()] == ["drop_pct", "target"]
+
+        ingest(engine, {1: "95"}, START + timedelta(days=1))
+        ingest(engine, {1: "90"}, START + timedelta(days=2))
+        page = call("GET", "/alerts/events", params={"limit": 1})
+        assert [e["kind"] for e in page.json()] == ["target"]
+        rest = call("GET", "/alerts/events", params={"cursor": page.headers["X-Next-Cursor"]}).json()
+        assert [(e["kind"], e["price"], e["previous_price"]) for e in rest] == [("drop_pct", "95.00", "120.00")]
+
+        assert call("DELETE", f"/alerts/{rule['id']}").status_code == 204
+        assert len(call("GET", "/alerts").json()) == 1
+        assert call("DELETE", "/products/1").status_code == 204
+        assert call("GET", "/alerts").json() == []
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(async_engine.dispose())
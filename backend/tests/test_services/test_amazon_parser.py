@@ -63,3 +63,27 @@ def test_extract_item_missing_price(fake_item_missing_price):
     assert result["url"] == "https://www.amazon.co.uk//no-price-url"
     assert result["image_url"] == "http://image.url/no-price.jpg"
     assert result["price"] == "N/A"
+
+class FakeItemsLocator:
+    def __init__(self, raw_items):
+        self.raw_items = raw_items
+        self.calls = 0
+
+    async def evaluate_all(self, script, arg):
+        self.calls += 1
+        return self.raw_items
+
+def test_extract_items_single_evaluate_call(fake_item_basic):
+    parser = AmazonParser("laptop")
+    items = FakeItemsLocator([
+        {"title": "Test Product", "href": "/test-url", "image": "http://image.url/test.jpg",
+         "offscreen": "$123.45", "whole": "123", "fraction": "45"},
+        {"title": "Whole Only", "href": "/whole-url", "image": None,
+         "offscreen": None, "whole": "99", "fraction": None},
+        {"title": None, "href": None, "image": None, "offscreen": None, "whole": None, "fraction": None},
+    ])
+    results = asyncio.run(parser._extract_items(items))
+    assert items.calls == 1
+    assert len(results) == 2
+    assert results[0] == asyncio.run(parser._extract_item(fake_item_basic))
+    assert results[1] == {"title": "Whole Only", "image_url": "N/A", "price": "$99.00", "url": "https://www.amazon.co.uk//whole-url"}
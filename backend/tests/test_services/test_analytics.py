@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("pyarrow")
+
+from app.analytics import biggest_drops, load_prices, price_over_time, price_range, snapshots, write_snapshot
+from app.models import Base, Price, Product
+
+START = datetime(2025, 3, 1)
+
+
+@pytest.fixture
+def source(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        products = [Product(title=f"Kettle {i}", url=f"https://a.test/{i}", image_url="https://a.test/i.jpg",
+                            created_at=START, updated_at=START) for i in range(3)]
+        db.add_all(products)
+        db.flush()
+        # product i loses i per day over ten days
+        db.add_all(
+            Price(product_id=p.id, site="Amazon", price=Decimal(100 - day * i), created_at=START + timedelta(days=day))
+            for i, p in enumerate(products) for day in range(10)
+        )
+        db.commit()
+    yield engine, factory
+    engine.dispose()
+
+
+def test_snapshot_is_incremental_and_partitioned_by_month(source, tmp_path):
+    engine, factory = source
+    out = tmp_path / "analytics"
+
+    assert write_snapshot(engine, str(out), now=START + timedelta(days=10)) == {"prices": 30, "products": 3}
+    assert [p.name for p in (out / "prices").iterdir()] == ["month=2025-03"]
+
+    with factory() as db:
+        db.add(Price(product_id=1, site="Amazon", price=Decimal(60), created_at=START + timedelta(days=10, hours=1)))
+        latest = db.query(Price).filter_by(product_id=2).order_by(Price.created_at.desc()).first()
+        latest.last_seen_at = START + timedelta(days=10, hours=2)
+        db.commit()
+        extended_id = latest.id
+
+    assert write_snapshot(engine, str(out), now=START + timedelta(days=11)) == {"prices": 2, "products": 0}
+    assert write_snapshot(engine, str(out), now=START + timedelta(days=12)) == {"prices": 0, "products": 0}
+
+    prices = load_prices(str(out))
+    assert prices.num_rows == 31  # the extended row counts once, as its newest copy
+    extended = [r for r in prices.to_pylist() if r["price_id"] == extended_id]
+    assert extended[0]["last_seen_at"] == START + timedelta(days=10, hours=2)
+
+
+def test_small_parts_are_merged_without_duplicates(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, "MAX_PARTS", 1)
+    engine, factory = source
+    out = tmp_path / "analytics"
+    write_snapshot(engine, str(out), now=START + timedelta(days=10))
+    with factory() as db:
+        latest = db.query(Price).filter_by(product_id=1).order_by(Price.created_at.desc()).first()
+        latest.last_seen_at = START + timedelta(days=10, hours=2)
+        db.commit()
+
+    write_snapshot(engine, str(out), now=START + timedelta(days=11))
+
+    parts = list((out / "prices" / "month=2025-03").iterdir())
+    assert [p.name for p in parts] == ["part-20250312T000000000000-merged.parquet"]
+    assert load_prices(str(out)).num_rows == 30
+
+
+def test_snapshot_queries(source, tmp_path):
+    engine, _ = source
+    out = str(tmp_path / "analytics")
+    write_snapshot(engine, out, now=START + timedelta(days=10))
+
+    history = price_over_time(3, out, start=START + timedelta(days=8))
+    assert [r["price"] for r in history.to_pylist()] == [Decimal(84), Decimal(82)]
+
+    drops = biggest_drops(out, days=7, now=START + timedelta(days=10)).to_pylist()
+    assert [(r["title"], r["price_before"], r["price_now"], r["drop_pct"]) for r in drops] == [
+        ("Kettle 2", Decimal(94), Decimal(82), 12.77),
+        ("Kettle 1", Decimal(97), Decimal(91), 6.19),
+    ]
+
+    ranges = price_range(out, product_ids=[2, 3]).to_pylist()
+    assert [(r["product_id"], r["min_price"], r["max_price"], r["title"]) for r in ranges] == [
+        (2, Decimal(91), Decimal(100), "Kettle 1"),
+        (3, Decimal(82), Decimal(100), "Kettle 2"),
+    ]
+
+
+def test_queries_on_missing_snapshot(tmp_path):
+    assert load_prices(str(tmp_path)).num_rows == 0
+    assert biggest_drops(str(tmp_path)).num_rows == 0
@@ -1,11 +1,22 @@
+import asyncio
+import time
+import httpx
 import pytest
 from datetime import timedelta, datetime, timezone
 from unittest.mock import MagicMock
 from fastapi import HTTPException
+from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 import jwt
 
 from app.services import auth_service
 from app.config import settings
+from app.core.auth_cache import AuthCache, auth_cache
+from app.crud import update_user_password_async
+from app.db import get_async_db
+from app.main import app
+from app.models import Base, User
+from tests.query_counter import count_queries
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
@@ -67,3 +78,133 @@ def test_reset_password_user_not_found(monkeypatch):
         auth_service.reset_password(db, token, "newpassword")
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == "User not found"
+
+
+@pytest.fixture
+def user_db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'auth.db'}")
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with factory() as db:
+            db.add_all([User(email="user@test.com", password_hash="x"), User(email="other@test.com", password_hash="x")])
+            await db.commit()
+
+    asyncio.run(setup())
+    auth_cache.clear()
+    yield engine, factory
+    auth_cache.clear()
+    asyncio.run(engine.dispose())
+
+
+def test_get_current_user_caches_by_subject_until_password_reset(user_db):
+    engine, factory = user_db
+    token = auth_service.create_access_token({"sub": "user@test.com", "uid": 1}, expires_delta=timedelta(minutes=5))
+
+    async def current_user():
+        async with factory() as db:
+            return await auth_service.get_current_user(db, token)
+
+    with count_queries(engine.sync_engine) as counter:
+        first = asyncio.run(current_user())
+        second = asyncio.run(current_user())
+    assert (first.id, first.email) == (1, "user@test.com") and second == first
+    assert counter.count == 1 and "users.id = ?" in counter.statements[0]
+
+    async def reset():
+        async with factory() as db:
+            user = await db.get(User, 1)
+            await update_user_password_async(db, user, "y")
+
+    asyncio.run(reset())
+    with count_queries(engine.sync_engine) as counter:
+        asyncio.run(current_user())
+    assert counter.count == 1
+
+
+def test_get_current_user_rejects_uid_of_another_user(user_db):
+    engine, factory = user_db
+    token = auth_service.create_access_token({"sub": "user@test.com", "uid": 2}, expires_delta=timedelta(minutes=5))
+
+    async def current_user():
+        async with factory() as db:
+            return await auth_service.get_current_user(db, token)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(current_user())
+    assert exc_info.value.status_code == 401
+
+
+def test_auth_cache_expires_and_evicts():
+    now = [0.0]
+    cache = AuthCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1
+    now[0] = 11
+    assert cache.get("a") is None
+
+
+def test_password_hasher_keeps_event_loop_free_and_sheds_load():
+    hasher = auth_service.PasswordHasher(workers=1, max_pending=2)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        results = await asyncio.gather(
+            hasher.run(time.sleep, 0.2),
+            hasher.run(time.sleep, 0.2),
+            hasher.run(time.sleep, 0.2),
+            return_exceptions=True,
+        )
+        ticking.cancel()
+        return ticks, results
+
+    ticks, results = asyncio.run(scenario())
+    assert ticks > 20
+    assert results[:2] == [None, None]
+    assert isinstance(results[2], HTTPException) and results[2].status_code == 503
+
+
+def test_login_rehashes_outdated_password_hash(user_db):
+    engine, factory = user_db
+    weak_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+
+    async def scenario():
+        async with factory() as db:
+            user = await db.get(User, 1)
+            user.password_hash = weak_hash
+            await db.commit()
+
+        async def override():
+            async with factory() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                wrong = await client.post("/api/v1/auth/login", data={"username": "user@test.com", "password": "nope"})
+                right = await client.post("/api/v1/auth/login", data={"username": "user@test.com", "password": "secret"})
+        finally:
+            app.dependency_overrides.clear()
+        async with factory() as db:
+            return wrong, right, (await db.get(User, 1)).password_hash
+
+    wrong, right, stored = asyncio.run(scenario())
+    assert wrong.status_code == 401
+    assert right.status_code == 200
+    payload = jwt.decode(right.json()["access_token"], SECRET_KEY, algorithms=[ALGORITHM])
+    assert payload["sub"] == "user@test.com" and payload["uid"] == 1
+    assert stored.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert auth_service.verify_password("secret", stored)
@@ -0,0 +1,133 @@
+import asyncio
+import pytest
+
+from app.parsers import browser_pool
+from app.parsers.amazon_parser import AmazonParser
+
+
+class FakeContext:
+    def __init__(self):
+        self.cookies_added = []
+        self.closed = False
+
+    async def add_cookies(self, cookies):
+        self.cookies_added.extend(cookies)
+
+    async def cookies(self):
+        return self.cookies_added
+
+    async def new_page(self):
+        return object()
+
+    def on(self, event, callback):
+        pass
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    launched = 0
+
+    def __init__(self):
+        FakeBrowser.launched += 1
+        self.closed = False
+        self.contexts = []
+
+    def is_connected(self):
+        return not self.closed
+
+    async def new_context(self, **options):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = self
+        self.stopped = False
+
+    async def launch(self, headless=True):
+        return FakeBrowser()
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture(autouse=True)
+def fake_playwright(monkeypatch, tmp_path):
+    FakeBrowser.launched = 0
+    cookies_file = tmp_path / "cookies.json"
+    cookies_file.write_text('[{"name": "session", "value": "1", "domain": ".amazon.co.uk", "path": "/"}]')
+    monkeypatch.setattr(browser_pool, "async_playwright", FakePlaywright)
+    monkeypatch.setattr(AmazonParser, "COOKIES_FILE", str(cookies_file))
+
+
+def test_lease_loads_cookies_and_closes_context():
+    async def main():
+        pool = await browser_pool.BrowserPool(size=1, max_pages=10, max_rss_mb=0).start()
+        async with pool.lease() as context:
+            assert context.cookies_added[0]["name"] == "session"
+        assert context.closed
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_browser_recycled_after_page_limit():
+    async def main():
+        pool = await browser_pool.BrowserPool(size=1, max_pages=2, max_rss_mb=0).start()
+        first = pool._browsers[0].browser
+        for _ in range(2):
+            async with pool.lease():
+                pass
+        assert first.closed
+        assert pool._browsers[0].browser is not first
+        assert FakeBrowser.launched == 2
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_parser_uses_pool_lease():
+    async def main():
+        pool = await browser_pool.BrowserPool(size=1, max_pages=10, max_rss_mb=0).start()
+        parser = AmazonParser("laptop", pool=pool)
+        async with parser:
+            context = parser.context
+            assert parser.browser is None
+            assert context in pool._browsers[0].browser.contexts
+        assert context.closed
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_failed_pool_start_is_retried(monkeypatch):
+    launches = []
+    launch = FakePlaywright.launch
+
+    async def flaky_launch(self, headless=True):
+        launches.append(headless)
+        if len(launches) == 1:
+            raise RuntimeError("chromium crashed")
+        return await launch(self, headless)
+
+    monkeypatch.setattr(FakePlaywright, "launch", flaky_launch)
+    try:
+        with pytest.raises(RuntimeError):
+            browser_pool.run_in_worker_loop(browser_pool.get_browser_pool())
+        pool = browser_pool.run_in_worker_loop(browser_pool.get_browser_pool())
+        assert isinstance(pool, browser_pool.BrowserPool)
+    finally:
+        browser_pool.shutdown_browser_pool()
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import async_database_url, get_async_db, get_async_read_db
+from app.main import app
+from app.models import Base, LatestPrice, Price, Product, User, UserProducts
+from app.models.product import utc_now
+from app.crud import (
+    create_user_async,
+    get_user_by_email_async,
+    get_user_by_id_async,
+    search_dashboard_products_async,
+    search_products_async,
+    update_user_password_async,
+)
+from app.services import create_access_token
+from app.services.response_cache import get_response_cache
+from app.core.auth_cache import auth_cache
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+        async with factory() as db:
+            user = User(email="user@test.com", password_hash="hash")
+            phone = Product(title="Apple iPhone 13", url="https://a.test/1", image_url="https://a.test/1.jpg")
+            watch = Product(title="Apple Watch", url="https://a.test/2", image_url="https://a.test/2.jpg")
+            db.add_all([user, phone, watch])
+            await db.flush()
+            now = utc_now()
+            for product, price in ((phone, Decimal("999.00")), (watch, Decimal("399.00"))):
+                row = Price(product_id=product.id, site="Amazon", price=price, created_at=now)
+                db.add(row)
+                await db.flush()
+                db.add(LatestPrice(product_id=product.id, price_id=row.id, site="Amazon", price=price, created_at=now))
+            db.add(UserProducts(user_id=user.id, product_id=watch.id, favorite=True))
+            await db.commit()
+        return factory
+
+    factory = asyncio.run(setup())
+    yield factory
+    asyncio.run(engine.dispose())
+
+
+def test_async_database_url():
+    assert async_database_url("sqlite:///price_tracker.db") == "sqlite+aiosqlite:///price_tracker.db"
+    assert async_database_url("postgresql://u:p@db/prices") == "postgresql+asyncpg://u:p@db/prices"
+    assert async_database_url("postgresql+asyncpg://u:p@db/prices") == "postgresql+asyncpg://u:p@db/prices"
+
+
+def test_async_user_crud(session_factory):
+    async def scenario():
+        async with session_factory() as db:
+            user = await create_user_async(db, "new@test.com", "old")
+            assert (await get_user_by_email_async(db, "new@test.com")).id == user.id
+            assert (await get_user_by_id_async(db, user.id)).email == "new@test.com"
+            await update_user_password_async(db, user, "new")
+        async with session_factory() as db:
+            assert (await get_user_by_email_async(db, "new@test.com")).password_hash == "new"
+            assert await get_user_by_email_async(db, "missing@test.com") is None
+
+    asyncio.run(scenario())
+
+
+def test_async_search_loads_prices(session_factory):
+    async def scenario():
+        async with session_factory() as db:
+            products = await search_products_async(db, title="apple", sort_by_price="asc")
+            assert [p.title for p in products] == ["Apple Watch", "Apple iPhone 13"]
+            assert products[0].prices[0].price == Decimal("399.00")
+
+            user = await get_user_by_email_async(db, "user@test.com")
+            favorites = await search_dashboard_products_async(db, user.id, only_favorites=True, max_price=Decimal("500"))
+            assert [p.title for p in favorites] == ["Apple Watch"]
+
+    asyncio.run(scenario())
+
+
+def test_routers_use_async_session(session_factory):
+    async def override():
+        async with session_factory() as db:
+            yield db
+
+    async def scenario():
+        token = create_access_token({"sub": "user@test.com"}, expires_delta=timedelta(minutes=5))
+        headers = {"Authorization": f"Bearer {token}"}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            products = (await client.get("/api/v1/products/filter", params={"title": "iphone"})).json()
+            dashboard = (await client.get("/api/v1/dashboard/products", headers=headers)).json()
+            me = (await client.get("/api/v1/auth/me", headers=headers)).json()
+        return products, dashboard, me
+
+    app.dependency_overrides[get_async_db] = override
+    app.dependency_overrides[get_async_read_db] = override
+    auth_cache.clear()
+    get_response_cache().clear()
+    try:
+        products, dashboard, me = asyncio.run(scenario())
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [p["title"] for p in products] == ["Apple iPhone 13"]
+    assert [p["title"] for p in dashboard] == ["Apple Watch"]
+    assert dashboard[0]["prices"][0]["price"] == "399.00"
+    assert me["email"] == "user@test.com"
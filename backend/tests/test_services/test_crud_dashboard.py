@@ -4,6 +4,7 @@ from sqlalchemy.orm import sessionmaker
 from decimal import Decimal
 from datetime import datetime, timedelta, timezone
 
+from app.services.latest_prices import refresh_latest_prices
 from app.models import Base, Product, Price, User, UserProducts
 from app.crud.search_dashboard import search_dashboard_products
 
@@ -45,6 +46,7 @@ def sample_data(db_session):
     price7 = Price(product_id=product2.id, site="site2", price=Decimal("850"), created_at=now - timedelta(days=3))
     db_session.add_all([price1, price2, price3, price4, price5, price6, price7])
     db_session.commit()
+    refresh_latest_prices(db_session)
 
     up1 = UserProducts(user_id=user1.id, product_id=product1.id, favorite=True)
     up2 = UserProducts(user_id=user1.id, product_id=product2.id, favorite=False)
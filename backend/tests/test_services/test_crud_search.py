@@ -4,6 +4,7 @@ from sqlalchemy.orm import sessionmaker
 from decimal import Decimal
 from datetime import datetime, timedelta, timezone
 
+from app.services.latest_prices import refresh_latest_prices
 from app.models import Base, Product, Price
 from app.crud.search import search_products
 
@@ -43,6 +44,7 @@ def sample_data(db_session):
     ]
     db_session.add_all(prices)
     db_session.commit()
+    refresh_latest_prices(db_session)
 
     return [p1, p2, p3, p4, p5]
 
@@ -0,0 +1,94 @@
+import asyncio
+from datetime import timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import get_async_db, get_async_read_db
+from app.main import app
+from app.models import Base, LatestPrice, Price, Product, User, UserProducts
+from app.models.product import utc_now
+from app.services import create_access_token
+from app.core.auth_cache import auth_cache
+from tests.query_counter import assert_max_queries, count_queries
+
+
+def build_dashboard(tmp_path, products: int):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / f'dash{products}.db'}")
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+        async with factory() as db:
+            user = User(email="user@test.com", password_hash="hash")
+            items = [Product(title=f"Item {i}", url=f"https://a.test/{i}", image_url=f"https://a.test/{i}.jpg") for i in range(products)]
+            db.add(user)
+            db.add_all(items)
+            await db.flush()
+            now = utc_now()
+            for item in items:
+                db.add_all(Price(product_id=item.id, site="Amazon", price=Decimal(10 + n), created_at=now - timedelta(days=n)) for n in range(3))
+                db.add(LatestPrice(product_id=item.id, price_id=0, site="Amazon", price=Decimal(10), created_at=now))
+                db.add(UserProducts(user_id=user.id, product_id=item.id))
+            await db.commit()
+        return factory
+
+    return engine, asyncio.run(setup())
+
+
+@pytest.fixture
+def call_api():
+    engines = []
+
+    def call(engine, factory, method, path, **kwargs):
+        async def override():
+            async with factory() as db:
+                yield db
+
+        async def request():
+            token = create_access_token({"sub": "user@test.com"}, expires_delta=timedelta(minutes=5))
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.request(method, path, headers={"Authorization": f"Bearer {token}"}, **kwargs)
+
+        engines.append(engine)
+        app.dependency_overrides[get_async_db] = override
+        app.dependency_overrides[get_async_read_db] = override
+        auth_cache.clear()
+        response = asyncio.run(request())
+        assert response.status_code < 300, response.text
+        return response
+
+    yield call
+    app.dependency_overrides.clear()
+    for engine in engines:
+        asyncio.run(engine.dispose())
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/v1/dashboard/products", {}),
+    ("/api/v1/dashboard/compare", {"product_id": list(range(1, 201))}),
+    ("/api/v1/dashboard/filter", {"sort_by_price": "asc"}),
+])
+def test_statement_count_does_not_grow_with_dashboard_size(tmp_path, call_api, path, params):
+    counts = []
+    for products in (5, 200):
+        engine, factory = build_dashboard(tmp_path, products)
+        with count_queries(engine.sync_engine) as counter:
+            response = call_api(engine, factory, "GET", path, params=params)
+        assert len(response.json()) == products
+        assert all(len(p["prices"]) == 3 for p in response.json())
+        counts.append(counter.count)
+
+    assert counts[0] == counts[1]
+    assert 0 < counts[1] <= 3  # current user, products, prices
+
+
+def test_favorite_toggle_statement_count(tmp_path, call_api):
+    engine, factory = build_dashboard(tmp_path, 20)
+    with assert_max_queries(engine.sync_engine, 4):  # current user, user product + product, prices, update
+        response = call_api(engine, factory, "PATCH", "/api/v1/dashboard/products/7/favorite", params={"favorite": True})
+    assert response.json()["id"] == 7
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.database import build_async_engine, build_engine, engine_options
+from app.models import Base
+
+
+def test_sqlite_pragmas_on_connect(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -64000
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    engine.dispose()
+
+
+def test_read_only_engine_rejects_writes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'ro.db'}"
+    engine = build_engine(url)
+    Base.metadata.create_all(engine)
+    read_engine = build_engine(url, read_only=True)
+
+    with read_engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM products")).scalar() == 0
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO products (title, url, image_url) VALUES ('t', 'u', 'i')"))
+    read_engine.dispose()
+    engine.dispose()
+
+
+def test_async_sqlite_engine_gets_pragmas(tmp_path):
+    async def journal_mode():
+        engine = build_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}", read_only=True)
+        async with engine.connect() as conn:
+            mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+            query_only = (await conn.execute(text("PRAGMA query_only"))).scalar()
+        await engine.dispose()
+        return mode, query_only
+
+    assert asyncio.run(journal_mode()) == ("wal", 1)
+
+
+def test_postgres_pool_options():
+    options = engine_options("postgresql+psycopg2://u:p@db/prices")
+    assert options["pool_pre_ping"] is True
+    assert options["pool_size"] == 10 and options["max_overflow"] == 20
+    assert "connect_args" not in options
+
+    read_options = engine_options("postgresql+psycopg2://u:p@db/prices", read_only=True)
+    assert read_options["connect_args"] == {"options": "-c default_transaction_read_only=on"}
+
+    engine = build_async_engine("postgresql+asyncpg://u:p@db/prices", read_only=True)
+    assert engine.pool.size() == 10
+    assert engine.sync_engine.pool._recycle == 1800
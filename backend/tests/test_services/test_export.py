@@ -0,0 +1,105 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.core.auth_cache import auth_cache
+from app.db import get_async_read_db, get_async_read_sessionmaker
+from app.main import app
+from app.models import Base, Price, Product, User, UserProducts
+from app.services import create_access_token
+
+START = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def export_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 4)
+    sync_engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    Base.metadata.create_all(sync_engine)
+    with sessionmaker(bind=sync_engine)() as db:
+        user = User(email="user@test.com", password_hash="hash")
+        db.add(user)
+        products = [Product(title=f"Lamp, model {i}", url=f"https://a.test/{i}", image_url="https://a.test/i.jpg") for i in range(3)]
+        db.add_all(products)
+        db.flush()
+        db.add(UserProducts(user_id=user.id, product_id=products[0].id))
+        db.add_all(
+            Price(product_id=p.id, site="Amazon", price=Decimal(10 + day), created_at=START + timedelta(days=day))
+            for p in products for day in range(5)
+        )
+        db.commit()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'export.db'}")
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_read_db] = override
+    app.dependency_overrides[get_async_read_sessionmaker] = lambda: factory
+    auth_cache.clear()
+    yield
+    app.dependency_overrides.clear()
+    asyncio.run(engine.dispose())
+    sync_engine.dispose()
+
+
+def get(path, params=None, auth=False):
+    async def request():
+        headers = {}
+        if auth:
+            token = create_access_token({"sub": "user@test.com"}, expires_delta=timedelta(minutes=5))
+            headers["Authorization"] = f"Bearer {token}"
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(f"/api/v1{path}", params=params, headers=headers)
+
+    return asyncio.run(request())
+
+
+def test_price_export_streams_ndjson(export_app):
+    response = get("/products/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 15
+    assert [r["price_id"] for r in rows] == sorted(r["price_id"] for r in rows)
+    assert rows[0] == {
+        "price_id": rows[0]["price_id"], "product_id": rows[0]["product_id"], "title": "Lamp, model 0",
+        "url": "https://a.test/0", "site": "Amazon", "price": "10.00",
+        "created_at": "2025-01-01T00:00:00", "last_seen_at": None,
+    }
+
+
+def test_price_export_since_and_csv(export_app):
+    response = get("/products/export", {"format": "csv", "since": "2025-01-04T00:00:00Z"})
+
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 6
+    assert {r["price"] for r in rows} == {"13.00", "14.00"}
+    assert rows[0]["title"] == "Lamp, model 0"
+
+
+def test_product_export(export_app):
+    rows = [json.loads(line) for line in get("/products/export", {"data": "products"}).text.splitlines()]
+    assert [r["url"] for r in rows] == ["https://a.test/0", "https://a.test/1", "https://a.test/2"]
+
+
+def test_dashboard_export_only_tracked_products(export_app):
+    assert get("/dashboard/export").status_code == 401
+
+    rows = [json.loads(line) for line in get("/dashboard/export", auth=True).text.splitlines()]
+    assert len(rows) == 5
+    assert {r["url"] for r in rows} == {"https://a.test/0"}
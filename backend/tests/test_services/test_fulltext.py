@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.fulltext import FTS_TABLE, fts5_query, install_fulltext, search_terms, tsquery
+from app.crud.search import filter_by_title
+from app.models import Base, Product
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        Product(title="Apple iPhone 13 Pro", url="u1", image_url="i1"),
+        Product(title="iPhone case for iPhone 13", url="u2", image_url="i2"),
+        Product(title="Samsung Galaxy S21 (128GB)", url="u3", image_url="i3"),
+        Product(title="Crème brûlée torch", url="u4", image_url="i4"),
+    ])
+    db.commit()
+    yield db
+    db.close()
+
+
+def matching_titles(db, title):
+    query, rank = filter_by_title(select(Product), title, "sqlite")
+    if rank is not None:
+        query = query.order_by(rank, Product.id)
+    return [p.title for p in db.scalars(query).all()]
+
+
+def test_search_terms():
+    assert search_terms("  iPhone-13, PRO ") == "iphone 13 pro"
+    assert search_terms("%%") == ""
+    assert fts5_query("iphone 13") == '"iphone"* "13"*'
+    assert tsquery("iphone 13") == "iphone:* & 13:*"
+
+
+def test_prefix_match_all_terms(db_session):
+    assert matching_titles(db_session, "iph") == ["iPhone case for iPhone 13", "Apple iPhone 13 Pro"]
+    assert matching_titles(db_session, "apple iph 13") == ["Apple iPhone 13 Pro"]
+    assert matching_titles(db_session, "galaxy 128") == ["Samsung Galaxy S21 (128GB)"]
+    assert matching_titles(db_session, "creme brulee") == ["Crème brûlée torch"]
+    assert matching_titles(db_session, "phone") == []
+
+
+def test_punctuation_only_query_falls_back_to_ilike(db_session):
+    assert matching_titles(db_session, "(") == ["Samsung Galaxy S21 (128GB)"]
+
+
+def test_index_follows_inserts_updates_and_deletes(db_session):
+    product = db_session.query(Product).filter_by(url="u4").one()
+    product.title = "Kitchen blowtorch"
+    db_session.add(Product(title="Blowtorch refill", url="u5", image_url="i5"))
+    db_session.commit()
+    assert matching_titles(db_session, "creme") == []
+    assert sorted(matching_titles(db_session, "blowtorch")) == ["Blowtorch refill", "Kitchen blowtorch"]
+
+    db_session.delete(product)
+    db_session.commit()
+    assert matching_titles(db_session, "blowtorch") == ["Blowtorch refill"]
+
+
+def test_install_backfills_existing_database():
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE products (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL)"))
+        conn.execute(text("INSERT INTO products (title) VALUES ('Espresso machine'), ('Milk frother')"))
+        install_fulltext(conn)
+        install_fulltext(conn)
+        rows = conn.execute(text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH '\"espr\"*'")).all()
+    assert rows == [(1,)]
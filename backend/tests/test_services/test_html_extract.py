@@ -0,0 +1,61 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+
+from app.parsers.amazon_parser import AmazonParser
+from app.parsers.html_extract import extract_product_page, is_captcha_page
+from app.parsers.rate_control import DomainRateController
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+PRODUCT_URL = "https://www.amazon.co.uk/dp/B0B11LJ69K"
+
+
+def load_fixture(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def test_extract_product_page():
+    item = extract_product_page(load_fixture("amazon_product.html"), PRODUCT_URL)
+    assert item["title"] == "Logitech MX Master 3S Wireless Mouse, Ultra-fast Scrolling, 8K DPI"
+    assert item["price"] == "£1,299.00"
+    assert item["image_url"] == "https://m.media-amazon.com/images/I/61ni3t1ryQL._AC_SL1500_.jpg"
+    assert item["url"] == PRODUCT_URL
+
+
+def test_extract_product_page_captcha():
+    html = load_fixture("amazon_captcha.html")
+    assert is_captcha_page(html)
+    assert extract_product_page(html, PRODUCT_URL) is None
+
+
+def fetch_with(handler, rate=None):
+    rate = rate or DomainRateController(min_delay=0, initial_delay=0)
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await AmazonParser.fetch_product_http(PRODUCT_URL, client, rate_controller=rate)
+    return asyncio.run(main())
+
+
+def test_fetch_product_http():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, text=load_fixture("amazon_product.html"))
+
+    item = fetch_with(handler)
+    assert item["price"] == "£1,299.00"
+    assert requests[0].headers["user-agent"] == AmazonParser.HTTP_HEADERS["User-Agent"]
+
+
+def test_fetch_product_http_needs_fallback():
+    assert fetch_with(lambda request: httpx.Response(503)) is None
+    assert fetch_with(lambda request: httpx.Response(200, text=load_fixture("amazon_captcha.html"))) is None
+
+
+def test_fetch_product_http_backs_off_on_captcha():
+    rate = DomainRateController(min_delay=0, max_delay=10, initial_delay=0.001, backoff_factor=4)
+    fetch_with(lambda request: httpx.Response(200, text=load_fixture("amazon_captcha.html")), rate)
+    assert rate.delay("www.amazon.co.uk") == 0.004
@@ -0,0 +1,97 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.parsers.amazon_parser import AmazonParser
+from app.parsers.html_extract import parse_search_page
+from app.parsers.load_profile import PageLoadStats
+from app.parsers.rate_control import DomainRateController
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+
+
+@pytest.fixture
+def search_html():
+    return (FIXTURES / "amazon_search.html").read_text(encoding="utf-8")
+
+
+def test_parse_search_page_basic(search_html):
+    results = parse_search_page(search_html, AmazonParser.BASE_URL)
+    assert len(results) == 3
+    assert results[0] == {
+        "title": "Logitech MX Master 3S Wireless Mouse",
+        "image_url": "https://m.media-amazon.com/images/I/61ni3t1ryQL._AC_UY218_.jpg",
+        "price": "£89.99",
+        "url": "https://www.amazon.co.uk//Logitech-Master-Wireless-Mouse/dp/B0B11LJ69K",
+    }
+
+
+def test_parse_search_page_whole_and_fraction(search_html):
+    results = parse_search_page(search_html, AmazonParser.BASE_URL)
+    assert results[1]["title"] == "Logitech M185 Wireless Mouse"
+    assert results[1]["price"] == "$1,299.50"
+
+
+def test_parse_search_page_missing_price(search_html):
+    results = parse_search_page(search_html, AmazonParser.BASE_URL)
+    assert results[2]["title"] == "Razer DeathAdder Essential"
+    assert results[2]["price"] == "N/A"
+
+
+def test_parse_snapshot(tmp_path, search_html):
+    path = tmp_path / "snapshot.html"
+    path.write_text(search_html, encoding="utf-8")
+    assert AmazonParser.parse_snapshot(str(path)) == parse_search_page(search_html, AmazonParser.BASE_URL)
+
+
+class FakeLocator:
+    async def fill(self, value):
+        pass
+
+    async def count(self):
+        return 0
+
+
+class FakeKeyboard:
+    async def press(self, key):
+        pass
+
+
+class FakePage:
+    def __init__(self, html):
+        self.html = html
+        self.keyboard = FakeKeyboard()
+
+    async def goto(self, url, timeout=None):
+        pass
+
+    async def wait_for_selector(self, selector, timeout=None):
+        pass
+
+    async def wait_for_load_state(self, state):
+        pass
+
+    def locator(self, selector):
+        return FakeLocator()
+
+    async def content(self):
+        return self.html
+
+
+def test_run_html_extraction_saves_snapshot(tmp_path, search_html):
+    parser = AmazonParser(
+        "wireless mouse", max_pages=1, extraction="html", snapshot_dir=str(tmp_path),
+        rate_controller=DomainRateController(min_delay=0, initial_delay=0),
+    )
+    parser.page = FakePage(search_html)
+    parser.load_stats = PageLoadStats()
+
+    results = asyncio.run(parser.run())
+
+    assert [r["title"] for r in results] == [
+        "Logitech MX Master 3S Wireless Mouse", "Logitech M185 Wireless Mouse", "Razer DeathAdder Essential"
+    ]
+    snapshots = list(tmp_path.glob("wireless-mouse_*_p1.html"))
+    assert len(snapshots) == 1
+    assert AmazonParser.parse_snapshot(str(snapshots[0])) == results
@@ -0,0 +1,68 @@
+import pytest
+from decimal import Decimal
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Product, Price, LatestPrice
+from app.services import save_to_db
+from app.services.latest_prices import upsert_latest_prices, refresh_latest_prices
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    TestingSessionLocal = sessionmaker(bind=engine)
+    Base.metadata.create_all(engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+
+
+def test_save_products_updates_latest_price(db_session):
+    save_to_db.save_products(db_session, [{"title": "P", "url": "url1", "image_url": "img", "price": "$100"}])
+    save_to_db.save_products(db_session, [{"title": "P", "url": "url1", "image_url": "img", "price": "$80"}])
+
+    latest = db_session.query(LatestPrice).one()
+    newest = db_session.query(Price).order_by(Price.id.desc()).first()
+    assert latest.price == Decimal("80")
+    assert latest.price_id == newest.id
+
+
+def test_upsert_ignores_older_rows(db_session):
+    product = Product(title="P", url="url1", image_url="img")
+    db_session.add(product)
+    db_session.commit()
+
+    now = datetime.now(timezone.utc)
+    upsert_latest_prices(db_session, [
+        {"id": 2, "product_id": product.id, "site": "s", "price": Decimal("10"), "created_at": now},
+    ])
+    upsert_latest_prices(db_session, [
+        {"id": 1, "product_id": product.id, "site": "s", "price": Decimal("99"), "created_at": now - timedelta(days=1)},
+    ])
+    db_session.commit()
+
+    assert db_session.query(LatestPrice).one().price == Decimal("10")
+
+
+def test_refresh_latest_prices(db_session):
+    p1 = Product(title="P1", url="url1", image_url="img")
+    p2 = Product(title="P2", url="url2", image_url="img")
+    db_session.add_all([p1, p2])
+    db_session.commit()
+
+    now = datetime.now(timezone.utc)
+    db_session.add_all([
+        Price(product_id=p1.id, site="s", price=Decimal("5"), created_at=now - timedelta(days=1)),
+        Price(product_id=p1.id, site="s", price=Decimal("7"), created_at=now),
+        Price(product_id=p2.id, site="s", price=Decimal("3"), created_at=now),
+    ])
+    db_session.commit()
+
+    assert refresh_latest_prices(db_session) == 2
+    latest = {lp.product_id: lp.price for lp in db_session.query(LatestPrice).all()}
+    assert latest == {p1.id: Decimal("7"), p2.id: Decimal("3")}
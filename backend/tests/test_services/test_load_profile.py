@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.parsers.load_profile import apply_load_profile
+
+
+class FakeRoute:
+    def __init__(self):
+        self.action = None
+
+    async def abort(self):
+        self.action = "abort"
+
+    async def continue_(self):
+        self.action = "continue"
+
+
+class FakeContext:
+    def __init__(self):
+        self.handlers = {}
+        self.route_handler = None
+
+    def on(self, event, callback):
+        self.handlers[event] = callback
+
+    async def route(self, pattern, handler):
+        self.route_handler = handler
+
+
+class FakeRequest:
+    def __init__(self, headers_size, body_size):
+        self._sizes = {"responseHeadersSize": headers_size, "responseBodySize": body_size}
+
+    async def sizes(self):
+        return self._sizes
+
+
+def route_request(context, resource_type, url):
+    route = FakeRoute()
+    request = SimpleNamespace(resource_type=resource_type, url=url)
+    asyncio.run(context.route_handler(route, request))
+    return route.action
+
+
+def test_light_profile_blocks_heavy_resources_and_trackers():
+    context = FakeContext()
+    stats = asyncio.run(apply_load_profile(
+        context, "light", ["image", "media", "font"], ["google-analytics.com", "amazon-adsystem.com"]
+    ))
+
+    assert route_request(context, "document", "https://www.amazon.co.uk/s?k=mouse") == "continue"
+    assert route_request(context, "script", "https://m.media-amazon.com/images/I/app.js") == "continue"
+    assert route_request(context, "image", "https://m.media-amazon.com/images/I/1.jpg") == "abort"
+    assert route_request(context, "font", "https://m.media-amazon.com/fonts/a.woff2") == "abort"
+    assert route_request(context, "script", "https://www.google-analytics.com/analytics.js") == "abort"
+    assert route_request(context, "xhr", "https://aax-eu.amazon-adsystem.com/e/bid") == "abort"
+    assert stats.blocked == 4
+
+
+def test_full_profile_only_collects_stats():
+    context = FakeContext()
+    stats = asyncio.run(apply_load_profile(context, "full"))
+
+    assert context.route_handler is None
+    context.handlers["response"](SimpleNamespace(headers={"content-length": "2048"}))
+    context.handlers["response"](SimpleNamespace(headers={}))
+    asyncio.run(context.handlers["requestfinished"](FakeRequest(300, 2048)))
+    asyncio.run(context.handlers["requestfinished"](FakeRequest(250, 5000)))  # chunked, no Content-Length
+    assert stats.requests == 2
+    assert stats.bytes == 300 + 2048 + 250 + 5000
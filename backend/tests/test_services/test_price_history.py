@@ -0,0 +1,158 @@
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import price_buckets_query, price_history_query
+from app.db import get_async_read_db
+from app.main import app
+from app.models import Base, Price, Product, User
+from app.services import create_access_token
+from app.core.auth_cache import auth_cache
+from app.core.pagination import encode_cursor
+
+START = datetime(2025, 3, 3)  # a Monday
+
+
+def add_history(db):
+    db.add(User(email="user@test.com", password_hash="hash"))
+    product = Product(title="Kettle", url="https://a.test/k", image_url="https://a.test/k.jpg")
+    db.add(product)
+    db.flush()
+    # every 6 hours for 14 days: 4 rows a day, price climbs by 1 per row
+    db.add_all(
+        Price(product_id=product.id, site="Amazon", price=Decimal(100 + i), created_at=START + timedelta(hours=6 * i))
+        for i in range(56)
+    )
+    db.add(Price(product_id=product.id, site="Amazon", price=None, created_at=START + timedelta(hours=1)))
+    db.commit()
+    return product.id
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def test_keyset_pages_cover_history_once(db_session):
+    product_id = add_history(db_session)
+    table = Price.__table__
+    seen, after = [], None
+    while True:
+        rows = db_session.execute(price_history_query(table, product_id, 10, after=after)).all()
+        page = rows[:10]
+        seen.extend(r.id for r in page)
+        if len(rows) <= 10:
+            break
+        after = (page[-1].created_at, page[-1].id)
+    assert len(seen) == len(set(seen)) == 57
+
+
+def test_time_bounds(db_session):
+    product_id = add_history(db_session)
+    rows = db_session.execute(price_history_query(
+        Price.__table__, product_id, 100, start=START + timedelta(days=1), end=START + timedelta(days=2)
+    )).all()
+    assert [r.price for r in rows] == [Decimal(107), Decimal(106), Decimal(105), Decimal(104)]
+
+
+def test_day_buckets(db_session):
+    product_id = add_history(db_session)
+    buckets = db_session.execute(price_buckets_query(Price.__table__, "sqlite", product_id, "day", 100)).all()
+    assert len(buckets) == 14
+    first = buckets[-1]
+    assert first.bucket == "2025-03-03 00:00:00"
+    assert (first.open, first.high, first.low, first.close, first.count) == (100, 103, 100, 103, 4)
+    assert float(first.avg) == 101.5
+
+
+def test_week_buckets_start_on_monday(db_session):
+    product_id = add_history(db_session)
+    buckets = db_session.execute(price_buckets_query(Price.__table__, "sqlite", product_id, "week", 100)).all()
+    assert [b.bucket for b in buckets] == ["2025-03-10 00:00:00", "2025-03-03 00:00:00"]
+    assert [b.count for b in buckets] == [28, 28]
+    assert buckets[1].open == 100 and buckets[1].close == 127
+
+
+def test_history_endpoint_pages_with_cursor_header(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'history.db'}")
+    sync_engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    Base.metadata.create_all(sync_engine)
+    with sessionmaker(bind=sync_engine)() as db:
+        product_id = add_history(db)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override():
+        async with factory() as db:
+            yield db
+
+    async def walk(params):
+        token = create_access_token({"sub": "user@test.com"}, expires_delta=timedelta(minutes=5))
+        headers = {"Authorization": f"Bearer {token}"}
+        pages, cursor = [], None
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            while True:
+                query = dict(params, cursor=cursor) if cursor else params
+                response = await client.get(f"/api/v1/dashboard/products/{product_id}/history", params=query, headers=headers)
+                assert response.status_code == 200, response.text
+                pages.append(response.json())
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    return pages
+
+    async def status(cursor):
+        token = create_access_token({"sub": "user@test.com"}, expires_delta=timedelta(minutes=5))
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(
+                f"/api/v1/dashboard/products/{product_id}/history",
+                params={"cursor": cursor}, headers={"Authorization": f"Bearer {token}"},
+            )
+        return response.status_code
+
+    app.dependency_overrides[get_async_read_db] = override
+    auth_cache.clear()
+    try:
+        raw = asyncio.run(walk({"limit": 20}))
+        days = asyncio.run(walk({"resolution": "day", "limit": 5, "from": "2025-03-05T00:00:00Z"}))
+        bad_cursor = asyncio.run(status(encode_cursor("2025-03-10T00:00:00", "1")))
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(engine.dispose())
+        sync_engine.dispose()
+
+    assert [len(p) for p in raw] == [20, 20, 17]
+    assert bad_cursor == 400
+    assert raw[0][0]["created_at"] > raw[-1][-1]["created_at"]
+    assert [len(p) for p in days] == [5, 5, 2]
+    assert days[-1][-1] == {
+        "bucket": "2025-03-05T00:00:00", "open": "108.00", "high": "111.00", "low": "108.00",
+        "close": "111.00", "avg": "109.50", "count": 4,
+    }
+
+
+def test_time_bounds_keep_interval_covering_start(db_session):
+    product = Product(title="Kettle", url="https://a.test/k", image_url="https://a.test/k.jpg")
+    db_session.add(product)
+    db_session.flush()
+    db_session.add_all([
+        Price(product_id=product.id, site="Amazon", price=Decimal(90), created_at=START - timedelta(days=20),
+              last_seen_at=START - timedelta(days=12)),
+        Price(product_id=product.id, site="Amazon", price=Decimal(95), created_at=START - timedelta(days=10),
+              last_seen_at=START + timedelta(days=1)),
+        Price(product_id=product.id, site="Amazon", price=Decimal(99), created_at=START + timedelta(days=2)),
+    ])
+    db_session.commit()
+
+    rows = db_session.execute(price_history_query(Price.__table__, product.id, 100, start=START)).all()
+    assert [r.price for r in rows] == [Decimal(99), Decimal(95)]
+    rows = db_session.execute(price_history_query(Price.__table__, product.id, 100, start=START + timedelta(days=1, hours=1))).all()
+    assert [r.price for r in rows] == [Decimal(99)]
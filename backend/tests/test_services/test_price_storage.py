@@ -0,0 +1,96 @@
+import pytest
+from decimal import Decimal
+from datetime import timedelta
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.core import price_storage
+from app.models.product import Base, LatestPrice, Product, Price, utc_now
+from app.services import save_to_db
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    Base.metadata.create_all(engine)
+    try:
+        yield engine
+    finally:
+        Base.metadata.drop_all(engine)
+
+
+def test_upgrade_price_indexes_replaces_single_column_index(engine):
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_prices_product_id_created_at"))
+        conn.execute(text("CREATE INDEX ix_prices_product_id ON prices (product_id)"))
+
+    price_storage.upgrade_price_indexes(engine)
+
+    names = {ix["name"] for ix in inspect(engine).get_indexes("prices")}
+    assert "ix_prices_product_id_created_at" in names
+    assert "ix_prices_product_id" not in names
+
+
+def test_archive_sqlite_keeps_history_view_complete(engine, monkeypatch):
+    monkeypatch.setattr(settings, "PRICE_STORAGE", "partitioned")
+    session = sessionmaker(bind=engine)()
+    product = Product(title="P", url="url1", image_url="img")
+    session.add(product)
+    session.commit()
+
+    now = utc_now()
+    session.add_all([
+        Price(product_id=product.id, site="s", price=Decimal("1"), created_at=now - timedelta(days=400)),
+        Price(product_id=product.id, site="s", price=Decimal("2"), created_at=now - timedelta(days=200)),
+        Price(product_id=product.id, site="s", price=Decimal("3"), created_at=now),
+    ])
+    session.commit()
+    session.close()
+
+    price_storage.archive_sqlite(engine, hot_months=1)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM prices")).scalar() == 1
+        assert len(price_storage._sqlite_archive_tables(conn)) == 2
+        history = price_storage.price_history_table("sqlite")
+        prices = conn.execute(select(history.c.price).order_by(history.c.created_at)).scalars().all()
+    assert prices == [Decimal("1"), Decimal("2"), Decimal("3")]
+
+
+def test_upgrade_price_columns_adds_last_seen_at(engine):
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE prices DROP COLUMN last_seen_at"))
+
+    price_storage.upgrade_price_columns(engine)
+
+    assert "last_seen_at" in {c["name"] for c in inspect(engine).get_columns("prices")}
+
+
+def test_compact_price_history_collapses_runs(engine):
+    session = sessionmaker(bind=engine)()
+    product = Product(title="P", url="url1", image_url="img")
+    session.add(product)
+    session.commit()
+    start = utc_now().replace(tzinfo=None, microsecond=0)
+    prices = ["1", "1", "1", "2", "2", "1", "3", "3"]
+    save_to_db.record_prices(session, [
+        {"product_id": product.id, "site": "s", "price": Decimal(p), "created_at": start + timedelta(hours=i)}
+        for i, p in enumerate(prices)
+    ])
+    session.commit()
+
+    assert price_storage.compact_price_history(engine) == (3, 4)
+    assert price_storage.compact_price_history(engine) == (0, 0)
+
+    session.expire_all()
+    rows = session.query(Price).order_by(Price.created_at).all()
+    assert [(r.price, r.created_at, r.last_seen_at) for r in rows] == [
+        (Decimal("1"), start, start + timedelta(hours=2)),
+        (Decimal("2"), start + timedelta(hours=3), start + timedelta(hours=4)),
+        (Decimal("1"), start + timedelta(hours=5), None),
+        (Decimal("3"), start + timedelta(hours=6), start + timedelta(hours=7)),
+    ]
+    latest = session.get(LatestPrice, product.id)
+    assert (latest.price_id, latest.created_at) == (rows[-1].id, rows[-1].created_at)
+    session.close()
@@ -0,0 +1,61 @@
+from decimal import Decimal
+
+import pytest
+
+from app.core.prices import ParsedPrice, parse_price_text, parse_prices
+from app.tasks.update_prices import _item_price
+
+
+@pytest.mark.parametrize(
+    "text,amount,currency",
+    [
+        ("$123.45", "123.45", "USD"),
+        ("£1,299.00", "1299.00", "GBP"),
+        ("1.299,00 €", "1299.00", "EUR"),
+        ("1 299,00 €", "1299.00", "EUR"),
+        ("12,99€", "12.99", "EUR"),
+        ("CHF 1'299.50", "1299.50", "CHF"),
+        ("USD 99.99", "99.99", "USD"),
+        ("C$ 19.99", "19.99", "CAD"),
+        ("¥1,234", "1234", "JPY"),
+        ("$1,234,567", "1234567", "USD"),
+        ("123,45", "123.45", None),
+        ("2.5", "2.5", None),
+        ("$.99", "0.99", "USD"),
+        ("£.50", "0.50", "GBP"),
+        (",99 €", "0.99", "EUR"),
+        ("$1.299", "1.299", "USD"),
+        ("$0.999", "0.999", "USD"),
+        ("€0.999", "0.999", "EUR"),
+        ("1.299 €", "1299", "EUR"),
+        ("R$ 1.299", "1299", "BRL"),
+        ("$1,299", "1299", "USD"),
+        ("1.299.000", "1299000", None),
+    ],
+)
+def test_parse_price_text(text, amount, currency):
+    assert parse_price_text(text) == ParsedPrice(Decimal(amount), currency)
+
+
+@pytest.mark.parametrize("text", [None, "", "N/A", "Currently unavailable", "$", "$89..99", "1,,299", "1.,99 €"])
+def test_parse_price_text_without_number(text):
+    assert parse_price_text(text).amount is None
+
+
+def test_minor_units_and_default_currency():
+    assert parse_price_text("£1,299.99").minor_units == 129999
+    assert parse_price_text("¥1,234").minor_units == 1234
+    assert ParsedPrice(Decimal("9.995"), "USD").minor_units == 1000
+    assert parse_price_text("N/A").minor_units is None
+    assert parse_price_text("12.50", "GBP").currency == "GBP"
+    assert parse_price_text("€12.50", "GBP").currency == "EUR"
+
+
+def test_parse_prices_keeps_order():
+    assert [p.amount for p in parse_prices(["$1", "N/A", "$1", "2,50 €"])] == [Decimal("1"), None, Decimal("1"), Decimal("2.50")]
+
+
+def test_refresh_keeps_thousands_separators():
+    assert _item_price({"price": "£1,299.00"}) == Decimal("1299.00")
+    assert _item_price({"price": "N/A"}) is None
+    assert _item_price(None) is None
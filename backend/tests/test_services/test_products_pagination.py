@@ -0,0 +1,170 @@
+import asyncio
+from datetime import timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.core.pagination import decode_cursor
+from app.crud import get_all_products, search_products
+from app.db import get_async_read_db
+from app.main import app
+from app.models import Base, Price, Product
+from app.models.product import utc_now
+from app.services.latest_prices import refresh_latest_prices
+from app.services.response_cache import get_response_cache
+
+PRICES = [Decimal("30"), Decimal("10"), None, Decimal("20"), Decimal("10"), Decimal("40"), None]
+
+
+def add_catalogue(db):
+    now = utc_now()
+    products = [Product(title=f"Lamp {i}", url=f"https://a.test/{i}", image_url=f"https://a.test/{i}.jpg") for i in range(len(PRICES))]
+    db.add_all(products)
+    db.flush()
+    for product, price in zip(products, PRICES):
+        db.add(Price(product_id=product.id, site="Amazon", price=Decimal("99"), created_at=now - timedelta(days=1)))
+        db.add(Price(product_id=product.id, site="Amazon", price=price, created_at=now))
+    db.add(Product(title="Lamp without prices", url="https://a.test/none", image_url="https://a.test/none.jpg"))
+    db.commit()
+    refresh_latest_prices(db)
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    add_catalogue(db)
+    yield db
+    db.close()
+
+
+def test_price_keyset_is_stable_with_ties_and_missing_prices(db_session):
+    from app.crud import page_cursor
+
+    for direction in ("asc", "desc"):
+        expected = [p.id for p in search_products(db_session, sort_by_price=direction)]
+        seen, after = [], None
+        while True:
+            page = search_products(db_session, sort_by_price=direction, include_prices="latest", after=after, limit=2)
+            seen.extend(p.id for p in page)
+            if len(page) < 2:
+                break
+            after = page_cursor(page[-1], "price")
+        assert seen == expected
+        assert len(seen) == len(PRICES)
+    ascending = [p.latest_price.price for p in search_products(db_session, sort_by_price="asc", include_prices="latest")]
+    assert ascending == [None, None, Decimal("10"), Decimal("10"), Decimal("20"), Decimal("30"), Decimal("40")]
+
+
+def test_all_products_includes_unpriced_and_pages_by_id(db_session):
+    first = get_all_products(db_session, include_prices="none", limit=5)
+    rest = get_all_products(db_session, include_prices="none", after=[first[-1].id])
+    assert [p.id for p in first + rest] == list(range(1, len(PRICES) + 2))
+
+
+@pytest.fixture
+def client_get(tmp_path):
+    path = tmp_path / "catalogue.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    with sessionmaker(bind=sync_engine)() as db:
+        add_catalogue(db)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override():
+        async with factory() as db:
+            yield db
+
+    def get(path, **params):
+        async def request():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                return await client.get(path, params=params)
+        return asyncio.run(request())
+
+    app.dependency_overrides[get_async_read_db] = override
+    get_response_cache().clear()
+    yield get
+    app.dependency_overrides.clear()
+    asyncio.run(engine.dispose())
+    sync_engine.dispose()
+
+
+def test_all_endpoint_projection_and_cursor(client_get):
+    response = client_get("/api/v1/products/all", limit=3, fields="id,title", include_prices="latest")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 1, "title": "Lamp 0", "prices": [{"site": "Amazon", "price": "30.00", "id": 2, "created_at": response.json()[0]["prices"][0]["created_at"]}]},
+        {"id": 2, "title": "Lamp 1", "prices": [{"site": "Amazon", "price": "10.00", "id": 4, "created_at": response.json()[1]["prices"][0]["created_at"]}]},
+        {"id": 3, "title": "Lamp 2", "prices": [{"site": "Amazon", "price": None, "id": 6, "created_at": response.json()[2]["prices"][0]["created_at"]}]},
+    ]
+
+    ids, cursor = [], None
+    while True:
+        params = {"limit": 3, "include_prices": "none"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client_get("/api/v1/products/all", **params)
+        ids.extend(p["id"] for p in response.json())
+        assert all(set(p) == {"id", "title", "url", "image_url"} for p in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert ids == list(range(1, len(PRICES) + 2))
+
+
+def test_all_endpoint_defaults_keep_full_history(client_get):
+    products = client_get("/api/v1/products/all").json()
+    assert len(products) == len(PRICES) + 1
+    assert len(products[0]["prices"]) == 2 and products[-1]["prices"] == []
+
+
+def test_filter_endpoint_pages_by_price(client_get):
+    prices, cursor = [], None
+    while True:
+        params = {"sort_by_price": "desc", "limit": 3, "include_prices": "latest", "fields": "id"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client_get("/api/v1/products/filter", **params)
+        prices.extend(p["prices"][0]["price"] for p in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert prices == ["40.00", "30.00", "20.00", "10.00", "10.00", None, None]
+
+
+def filter_pages(client_get, **params):
+    ids, cursors, cursor = [], [], None
+    while True:
+        page = {**params, "cursor": cursor} if cursor else params
+        response = client_get("/api/v1/products/filter", fields="id", include_prices="none", **page)
+        ids.extend(p["id"] for p in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids, cursors
+        cursors.append(cursor)
+
+
+def test_title_search_ranks_until_too_many_matches(client_get, monkeypatch):
+    ids, cursors = filter_pages(client_get, title="lamp", limit=3)
+    assert sorted(ids) == list(range(1, len(PRICES) + 1))
+    assert len(decode_cursor(cursors[0])) == 2  # (rank, id)
+
+    monkeypatch.setattr(settings, "SEARCH_RANK_MAX_MATCHES", 3)
+    get_response_cache().clear()
+    ids, cursors = filter_pages(client_get, title="lamp", limit=3)
+    assert ids == list(range(1, len(PRICES) + 1))
+    assert len(decode_cursor(cursors[0])) == 1
+    assert filter_pages(client_get, title="lamp", min_price="15", limit=2)[0] == [1, 4, 6]
+
+
+def test_bad_parameters(client_get):
+    assert client_get("/api/v1/products/all", fields="id,password").status_code == 422
+    assert client_get("/api/v1/products/all", limit=10_000).status_code == 422
+    assert client_get("/api/v1/products/filter", sort_by_price="asc", cursor="bm9wZQ").status_code == 400
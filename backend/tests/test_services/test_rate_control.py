@@ -0,0 +1,51 @@
+import pytest
+
+from app.parsers.rate_control import DomainRateController, domain_of
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_controller(clock, **kwargs):
+    options = dict(min_delay=0.5, max_delay=8, initial_delay=2, decrease_step=0.5, backoff_factor=2, jitter=0)
+    options.update(kwargs)
+    return DomainRateController(clock=clock, **options)
+
+
+def test_reserve_spaces_requests_per_domain(clock):
+    rate = make_controller(clock)
+    assert rate.reserve("a.com") == 0
+    assert rate.reserve("a.com") == 2
+    assert rate.reserve("a.com") == 4
+    assert rate.reserve("b.com") == 0
+
+
+def test_success_decreases_delay_down_to_minimum(clock):
+    rate = make_controller(clock)
+    for _ in range(10):
+        rate.on_success("a.com")
+    assert rate.delay("a.com") == 0.5
+
+
+def test_failure_backs_off_and_pushes_next_slot(clock):
+    rate = make_controller(clock)
+    rate.on_failure("a.com")
+    assert rate.delay("a.com") == 4
+    assert rate.reserve("a.com") == 4
+    for _ in range(5):
+        rate.on_failure("a.com")
+    assert rate.delay("a.com") == 8
+
+
+def test_domain_of():
+    assert domain_of("https://www.amazon.co.uk/dp/B0") == "www.amazon.co.uk"
@@ -0,0 +1,138 @@
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import get_async_read_db
+from app.main import app
+from app.models import Base
+from app.models.product import utc_now
+from app.services.response_cache import CachedResponse, ResponseCache, cache_key, get_response_cache
+from app.services.save_to_db import record_prices, save_products
+from tests.query_counter import count_queries
+from tests.test_services.test_products_pagination import add_catalogue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def page(text: str) -> CachedResponse:
+    return CachedResponse(text.encode())
+
+
+def test_lru_evicts_least_recently_used_and_expires():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=2, ttl=10, clock=clock)
+
+    async def scenario():
+        await cache.set("a", 0, page("a"))
+        await cache.set("b", 0, page("b"))
+        assert (await cache.get("a", 0)).body == b"a"
+        await cache.set("c", 0, page("c"))
+        assert await cache.get("b", 0) is None
+        assert (await cache.get("a", 0)).body == b"a"
+        clock.now += 11
+        assert await cache.get("a", 0) is None
+
+    asyncio.run(scenario())
+
+
+def test_invalidate_drops_pages_computed_before_it():
+    cache = ResponseCache()
+
+    async def scenario():
+        generation = await cache.generation()
+        cache.invalidate()
+        await cache.set("a", generation, page("stale"))
+        assert await cache.get("a", await cache.generation()) is None
+        assert await cache.get("a", generation) is None
+
+    asyncio.run(scenario())
+
+
+def test_cache_key_ignores_param_order():
+    assert cache_key("filter", {"a": 1, "b": None}) == cache_key("filter", {"b": None, "a": 1})
+    assert cache_key("filter", {"a": 1}) != cache_key("all", {"a": 1})
+
+
+def test_etag_matching():
+    response = page("[]")
+    assert response.matches(response.etag)
+    assert response.matches(f'"other", W/{response.etag}')
+    assert response.matches("*")
+    assert not response.matches('"other"')
+    assert response.to_response(response.etag).status_code == 304
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def test_ingest_invalidates_on_commit_only(db_session):
+    cache = get_response_cache()
+    generation = asyncio.run(cache.generation())
+
+    save_products(db_session, [{"title": "Lamp", "url": "https://a.test/1", "image_url": "", "price": "$5"}])
+    assert asyncio.run(cache.generation()) == generation + 1
+
+    record_prices(db_session, [{"product_id": 1, "site": "Amazon", "price": 4, "created_at": utc_now()}])
+    db_session.rollback()
+    db_session.commit()
+    assert asyncio.run(cache.generation()) == generation + 1
+
+
+def test_filter_endpoint_serves_cached_pages_and_revalidates(tmp_path):
+    path = tmp_path / "catalogue.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    db = sessionmaker(bind=sync_engine)()
+    add_catalogue(db)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override():
+        async with factory() as session:
+            yield session
+
+    async def get(**headers):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(
+                "/api/v1/products/filter",
+                params={"title": " LAMP ", "sort_by_price": "asc", "min_price": "10.0", "include_prices": "latest"},
+                headers=headers,
+            )
+
+    app.dependency_overrides[get_async_read_db] = override
+    get_response_cache().clear()
+    try:
+        first = asyncio.run(get())
+        with count_queries(engine.sync_engine) as counter:
+            again = asyncio.run(get())
+            unchanged = asyncio.run(get(**{"If-None-Match": first.headers["ETag"]}))
+        save_products(db, [{"title": "Lamp 99", "url": "https://a.test/99", "image_url": "https://a.test/99.jpg", "price": "$15"}])
+        changed = asyncio.run(get(**{"If-None-Match": first.headers["ETag"]}))
+    finally:
+        app.dependency_overrides.clear()
+        db.close()
+        asyncio.run(engine.dispose())
+        sync_engine.dispose()
+
+    assert first.status_code == 200 and len(first.json()) == 5
+    assert counter.count == 0
+    assert again.content == first.content and again.headers["ETag"] == first.headers["ETag"]
+    assert unchanged.status_code == 304 and unchanged.content == b""
+    assert changed.status_code == 200 and len(changed.json()) == 6
+    assert changed.headers["ETag"] != first.headers["ETag"]
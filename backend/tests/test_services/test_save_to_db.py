@@ -1,8 +1,9 @@
 import pytest
+from datetime import datetime, timedelta
 from decimal import Decimal
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from app.models.product import Base, Product, Price
+from app.models.product import Base, LatestPrice, Product, Price, utc_now
 from app.services import save_to_db
 import logging
 
@@ -87,4 +88,77 @@ def test_save_products_exception_handling_and_rollback(db_session, caplog):
 
     assert db_session.query(Product).count() == 1
     assert db_session.query(Price).count() == 1
-    assert any("Error saving product" in record.message for record in caplog.records)
\ No newline at end of file
+    assert any("Error saving product" in record.message for record in caplog.records)
+
+
+def test_save_products_batch_with_duplicates(db_session):
+    existing = Product(title="Existing", url="url_existing", image_url="img")
+    db_session.add(existing)
+    db_session.commit()
+
+    products = [
+        {"title": "Existing", "url": "url_existing", "image_url": "img", "price": "$10"},
+        {"title": "New", "url": "url_new", "image_url": "img", "price": "$20"},
+        {"title": "New", "url": "url_new", "image_url": "img", "price": "$21"},
+    ]
+    save_to_db.save_products(db_session, products)
+
+    assert db_session.query(Product).count() == 2
+    new_product = db_session.query(Product).filter_by(url="url_new").one()
+    assert db_session.query(Price).filter_by(product_id=existing.id).count() == 1
+    assert sorted(p.price for p in new_product.prices) == [Decimal("20"), Decimal("21")]
+
+def test_changes_mode_extends_latest_row_instead_of_inserting(db_session, monkeypatch):
+    monkeypatch.setattr(save_to_db.settings, "PRICE_WRITE_MODE", "changes")
+    product = Product(title="P", url="url1", image_url="img")
+    db_session.add(product)
+    db_session.commit()
+    t = [datetime(2025, 1, 1) + timedelta(hours=h) for h in range(5)]
+
+    def scrape(*observations):
+        save_to_db.record_prices(db_session, [
+            {"product_id": product.id, "site": "Amazon", "price": Decimal(price), "created_at": at}
+            for price, at in observations
+        ])
+        db_session.commit()
+
+    scrape(("10", t[0]))
+    scrape(("10.00", t[1]))
+    scrape(("12", t[2]), ("12", t[3]))
+    scrape(("12", t[4]))
+
+    rows = db_session.query(Price).order_by(Price.created_at).all()
+    assert [(r.price, r.created_at, r.last_seen_at) for r in rows] == [
+        (Decimal("10"), t[0], t[1]),
+        (Decimal("12"), t[2], t[4]),
+    ]
+    latest = db_session.get(LatestPrice, product.id)
+    assert (latest.price_id, latest.created_at) == (rows[1].id, t[2])
+
+
+def test_changes_mode_with_aware_timestamps(db_session, monkeypatch):
+    monkeypatch.setattr(save_to_db.settings, "PRICE_WRITE_MODE", "changes")
+    products = [{"title": "P", "url": "url1", "image_url": "img", "price": "$10"}]
+
+    save_to_db.save_products(db_session, products)
+    save_to_db.save_products(db_session, products)
+
+    rows = db_session.query(Price).all()
+    assert len(rows) == 1
+    assert rows[0].last_seen_at is not None and rows[0].last_seen_at.tzinfo is None
+    assert rows[0].last_seen_at >= rows[0].created_at
+
+
+def test_changes_mode_marks_cache_on_last_seen_update(db_session, monkeypatch):
+    monkeypatch.setattr(save_to_db.settings, "PRICE_WRITE_MODE", "changes")
+    product = Product(title="P", url="url1", image_url="img")
+    db_session.add(product)
+    db_session.commit()
+    save_to_db.record_prices(db_session, [{"product_id": product.id, "site": "Amazon", "price": Decimal("10"), "created_at": utc_now()}])
+    db_session.commit()
+    marked = []
+    monkeypatch.setattr(save_to_db, "mark_products_changed", marked.append)
+
+    save_to_db.record_prices(db_session, [{"product_id": product.id, "site": "Amazon", "price": Decimal("10"), "created_at": utc_now()}])
+
+    assert marked == [db_session]
@@ -0,0 +1,149 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.models import Base, Product
+from app.routers import products as products_router
+from app.services.search_jobs import SearchJobs, normalize_query, search_fingerprint
+from app.tasks import search as search_task
+
+
+class FakeRedis:
+    """The four commands SearchJobs uses; expiry times are recorded, not enforced."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value.encode()
+        self.ttls[key] = ex
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def delete(self, key):
+        self.values.pop(key, None)
+        self.ttls.pop(key, None)
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    jobs = SearchJobs(FakeRedis(), max_concurrency=2, job_timeout=600, result_ttl=60)
+    monkeypatch.setattr(products_router, "get_search_jobs", lambda: jobs)
+    monkeypatch.setattr(search_task, "get_search_jobs", lambda: jobs)
+    return jobs
+
+
+def test_fingerprint_ignores_case_and_spacing():
+    assert normalize_query("  Gaming   LAPTOP ") == "gaming laptop"
+    assert search_fingerprint("Gaming laptop", 2) == search_fingerprint(" gaming  LAPTOP", 2)
+    assert search_fingerprint("gaming laptop", 2) != search_fingerprint("gaming laptop", 3)
+
+
+def test_claim_deduplicates_until_forgotten(jobs):
+    first, created = jobs.claim("abc")
+    assert created
+    assert jobs.claim("abc") == (first, False)
+    jobs.finished("abc")
+    assert jobs.client.ttls["search:job:abc"] == 60
+    jobs.forget("abc")
+    second, created = jobs.claim("abc")
+    assert created and second != first
+
+
+def test_slots_cap_concurrency(jobs):
+    assert jobs.acquire_slot("a") == 0
+    assert jobs.acquire_slot("b") == 1
+    assert jobs.acquire_slot("c") is None
+    jobs.release_slot(0, "someone-else")
+    assert jobs.acquire_slot("c") is None
+    jobs.release_slot(0, "a")
+    assert jobs.acquire_slot("c") == 0
+
+
+def test_search_endpoint_queues_one_job_per_query(jobs, monkeypatch):
+    sent = []
+    monkeypatch.setattr(products_router.celery_app, "send_task", lambda name, args, task_id: sent.append((name, args, task_id)))
+    monkeypatch.setattr(products_router, "AsyncResult", lambda job_id, app: SimpleNamespace(state="STARTED", result=None))
+    client = TestClient(app)
+
+    first = client.post("/api/v1/products/search", params={"query": "Gaming Laptop", "pages": 2})
+    second = client.post("/api/v1/products/search", params={"query": " gaming   laptop", "pages": 2})
+    other = client.post("/api/v1/products/search", params={"query": "gaming laptop", "pages": 3})
+
+    assert first.status_code == second.status_code == 202
+    assert first.json() == {"job_id": first.json()["job_id"], "status": "queued", "deduplicated": False}
+    assert second.json() == {"job_id": first.json()["job_id"], "status": "running", "deduplicated": True}
+    assert other.json()["job_id"] != first.json()["job_id"]
+    assert [(name, args) for name, args, _ in sent] == [
+        ("app.tasks.search.run_search", ["gaming laptop", 2, search_fingerprint("gaming laptop", 2)]),
+        ("app.tasks.search.run_search", ["gaming laptop", 3, search_fingerprint("gaming laptop", 3)]),
+    ]
+    assert sent[0][2] == first.json()["job_id"]
+
+    status = client.get(f"/api/v1/products/search/{first.json()['job_id']}")
+    assert status.json() == {"job_id": first.json()["job_id"], "status": "running"}
+
+
+def test_search_endpoint_releases_claim_when_queueing_fails(jobs, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(products_router.celery_app, "send_task", unavailable)
+    response = TestClient(app).post("/api/v1/products/search", params={"query": "lamp"})
+    assert response.status_code == 503
+    assert jobs.client.values == {}
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(search_task, "SessionLocal", factory)
+    monkeypatch.setattr(search_task, "run_in_worker_loop", asyncio.run)
+    return factory
+
+
+def test_run_search_saves_results_and_keeps_job_for_result_ttl(jobs, session_factory, monkeypatch):
+    async def fake_scrape(query, pages):
+        return [{"title": f"{query} {i}", "url": f"https://a.test/{i}", "image_url": "", "price": "$10"} for i in range(pages)]
+
+    monkeypatch.setattr(search_task, "scrape", fake_scrape)
+    fingerprint = search_fingerprint("lamp", 2)
+    job_id, _ = jobs.claim(fingerprint)
+
+    result = search_task.run_search.apply(args=["lamp", 2, fingerprint], task_id=job_id).get()
+
+    assert result == {"status": "success", "query": "lamp", "pages": 2, "saved": 2}
+    with session_factory() as db:
+        assert db.query(Product).count() == 2
+    assert jobs.client.ttls[f"search:job:{fingerprint}"] == 60
+    assert not any(key.startswith("search:slot") for key in jobs.client.values)
+
+
+def test_run_search_failure_lets_the_next_search_retry(jobs, session_factory, monkeypatch):
+    async def failing_scrape(query, pages):
+        raise RuntimeError("captcha")
+
+    monkeypatch.setattr(search_task, "scrape", failing_scrape)
+    fingerprint = search_fingerprint("lamp", 1)
+    job_id, _ = jobs.claim(fingerprint)
+
+    result = search_task.run_search.apply(args=["lamp", 1, fingerprint], task_id=job_id)
+
+    assert result.failed()
+    assert jobs.client.values == {}
@@ -0,0 +1,63 @@
+import pytest
+from decimal import Decimal
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import Base, Product, Price, LatestPrice
+from app.tasks import update_prices
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(update_prices, "SessionLocal", factory)
+    yield factory
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def products(session_factory):
+    db = session_factory()
+    items = [Product(title=f"P{i}", url=f"https://example.com/dp/{i}", image_url="img") for i in range(5)]
+    db.add_all(items)
+    db.commit()
+    ids = [p.id for p in items]
+    db.close()
+    return ids
+
+
+def test_refresh_batch_commits_all_prices(session_factory, products, monkeypatch):
+    async def fake_fetch(url):
+        n = int(url.rsplit("/", 1)[1])
+        if n == 3:
+            return None
+        if n == 4:
+            raise RuntimeError("boom")
+        return {"title": "t", "url": url, "image_url": "", "price": f"£{n}0.00"}
+
+    monkeypatch.setattr(update_prices, "fetch_product", fake_fetch)
+
+    result = update_prices.refresh_batch(products)
+
+    assert result == {"status": "success", "requested": 5, "refreshed": 3}
+    db = session_factory()
+    assert db.query(Price).count() == 3
+    assert db.query(LatestPrice).filter_by(product_id=products[2]).one().price == Decimal("20.00")
+    db.close()
+
+
+def test_update_all_products_chunks_ids(session_factory, products, monkeypatch):
+    batches = []
+    monkeypatch.setattr(update_prices.refresh_batch, "delay", lambda ids: batches.append(ids))
+    monkeypatch.setattr(update_prices.settings, "REFRESH_BATCH_SIZE", 2)
+
+    result = update_prices.update_all_products()
+
+    assert result["count"] == 5
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert sorted(i for b in batches for i in b) == sorted(products)
@@ -23,6 +23,15 @@ export const triggerSearch = async (query: string, pages = 3) => {
 };
 
 export const getAllProducts = async () => {
-  const res = await instance.get("/api/v1/products/all");
-  return res.data;
+  // The endpoint is paginated; follow X-Next-Cursor until the last page.
+  const products = [];
+  let cursor: string | undefined;
+  do {
+    const res = await instance.get("/api/v1/products/all", {
+      params: { include_prices: "latest", limit: 500, cursor },
+    });
+    products.push(...res.data);
+    cursor = res.headers["x-next-cursor"];
+  } while (cursor);
+  return products;
 };